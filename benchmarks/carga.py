@@ -0,0 +1,301 @@
+"""
+Gerador de carga: simula sessões simultâneas do chat de ponta a ponta, contra o Supabase
+local (fake) e um servidor mock da OpenAI com latência configurável.
+
+Cada sessão roda em uma thread com o próprio session_state, executando o main() e o
+process_user_input() de verdade sobre um Streamlit simulado (sem renderização). Os recursos
+de @st.cache_resource (cliente OpenAI, banco, coalescência) são compartilhados entre as
+sessões, como em uma instância real. O AppTest não serve aqui: ele cria um Runtime global
+por execução e não suporta scripts simultâneos no mesmo processo.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.carga --sessoes 1 5 10 20 --interacoes 6 --latencia-llm 0.5
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from benchmarks.catalogo_sintetico import gerar_catalogo, gerar_consultas
+from benchmarks.mock_openai import ServidorOpenAIMock
+
+# Pedidos sem receita no catálogo (vão para a IA)
+PEDIDOS_NOVOS = (
+    "quero algo diferente com jaca verde", "sobremesa de cupuaçu sem açúcar",
+    "lanche com ora-pro-nóbis", "prato vegano com pupunha defumada"
+)
+SAUDACOES = ("Olá, tudo bem?", "obrigada!")
+
+
+class EstadoSessao(dict):
+    """session_state de uma sessão simulada (acesso por chave ou atributo)"""
+
+    def __getattr__(self, nome: str) -> Any:
+        try:
+            return self[nome]
+        except KeyError:
+            raise AttributeError(nome) from None
+
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        self[nome] = valor
+
+
+class ElementoSimulado:
+    """Container/elemento que aceita qualquer chamada do Streamlit sem renderizar nada"""
+
+    def __enter__(self) -> 'ElementoSimulado':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def __call__(self, *args: Any, **kwargs: Any) -> 'ElementoSimulado':
+        return self
+
+    def __getattr__(self, nome: str) -> Any:
+        return getattr(StreamlitSimulado, nome, None) or self
+
+    @staticmethod
+    def columns(spec: Any, **kwargs: Any) -> List['ElementoSimulado']:
+        return [ElementoSimulado() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+    @staticmethod
+    def button(*args: Any, **kwargs: Any) -> bool:
+        return False
+
+    @staticmethod
+    def write_stream(trechos: Iterable) -> str:
+        # Consome o stream inteiro, como o st.write_stream faz ao exibir a resposta
+        return ''.join(str(t) for t in trechos)
+
+    @staticmethod
+    def stop() -> None:
+        raise InterruptedError("st.stop()")
+
+
+class StreamlitSimulado(ElementoSimulado):
+    """Substitui o módulo `st` do main: um session_state por thread e segredos compartilhados"""
+
+    def __init__(self, segredos: Dict):
+        self.secrets = segredos
+        self._local = threading.local()
+
+    @property
+    def session_state(self) -> EstadoSessao:
+        estado: Optional[EstadoSessao] = getattr(self._local, 'estado', None)
+        if estado is None:
+            estado = self._local.estado = EstadoSessao()
+        return estado
+
+    @property
+    def erros(self) -> int:
+        """Quantidade de st.error exibidos na sessão da thread atual"""
+        erros: int = getattr(self._local, 'erros', 0)
+        return erros
+
+    def error(self, *args: Any, **kwargs: Any) -> ElementoSimulado:
+        self._local.erros = self.erros + 1
+        return ElementoSimulado()
+
+    def text_input(self, *args: Any, key: Optional[str] = None, **kwargs: Any) -> str:
+        return str(self.session_state.get(key, '')) if key else ''
+
+
+def rss_atual_mb() -> float:
+    """Memória residente do processo em MB (/proc no Linux; pico via getrusage nos demais)"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for linha in f:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def preparar_banco(caminho: str, tamanho: int) -> List[Dict]:
+    """Popula o Supabase local (arquivo SQLite) com um catálogo sintético"""
+    from database_supabase import ReceitasDB
+    from supabase_fake import ClienteSupabaseFake
+
+    catalogo = gerar_catalogo(tamanho)
+    cliente = ClienteSupabaseFake(caminho)
+    ReceitasDB(cliente=cliente).adicionar_receitas_em_lote(catalogo)
+    cliente.fechar()
+    return catalogo
+
+
+def roteiro_da_sessao(indice: int, interacoes: int, consultas: List[str]) -> List[tuple]:
+    """Sequência de ações de uma sessão: mensagens no chat e buscas no expander"""
+    rng = random.Random(indice)
+    acoes = []
+    for _ in range(interacoes):
+        sorteio = rng.random()
+        if sorteio < 0.4:
+            acoes.append(('chat_busca', f"tem receita de {rng.choice(consultas)}?"))
+        elif sorteio < 0.6:
+            acoes.append(('chat_ia', rng.choice(PEDIDOS_NOVOS)))
+        elif sorteio < 0.7:
+            acoes.append(('chat_saudacao', rng.choice(SAUDACOES)))
+        else:
+            acoes.append(('busca', rng.choice(consultas)))
+    return acoes
+
+
+def executar_sessao(app: Any, acoes: List[tuple], largada: threading.Barrier) -> List[Dict]:
+    """
+    Executa uma sessão do app e mede cada interação: o on_change do campo (process_user_input)
+    seguido do rerun do main(), como o Streamlit faz quando o usuário envia o texto.
+    """
+    estado = app.st.session_state
+    estado.clear()
+
+    def rerun(erros_antes: int) -> bool:
+        try:
+            app.main()
+        except Exception:
+            return True
+        return bool(app.st.erros > erros_antes)
+
+    medicoes = []
+    largada.wait()
+    inicio = time.perf_counter()
+    erro = rerun(app.st.erros)
+    medicoes.append({'acao': 'carregamento', 'segundos': time.perf_counter() - inicio,
+                     'erro': erro})
+
+    for acao, texto in acoes:
+        erros_antes = app.st.erros
+        inicio = time.perf_counter()
+        if acao == 'busca':
+            estado.busca = texto
+        else:
+            estado.user_input = texto
+            app.process_user_input(app.init_openai_client(), app.get_database())
+        erro = rerun(erros_antes)
+        medicoes.append({'acao': acao, 'segundos': time.perf_counter() - inicio, 'erro': erro})
+    return medicoes
+
+
+def resumir(duracoes: List[float]) -> Dict:
+    return {
+        'quantidade': len(duracoes),
+        'p50_ms': round(percentil(duracoes, 50) * 1000, 1),
+        'p95_ms': round(percentil(duracoes, 95) * 1000, 1),
+        'p99_ms': round(percentil(duracoes, 99) * 1000, 1),
+        'media_ms': round(statistics.mean(duracoes) * 1000, 1)
+    }
+
+
+def aquecer(app: Any, interacoes: int, consultas: List[str]) -> None:
+    """
+    Sessão fora das medições: carrega os imports, os recursos do cache_resource, o índice
+    em memória e as conexões, que senão entrariam na memória por sessão da primeira rodada
+    """
+    executar_sessao(app, roteiro_da_sessao(-1, interacoes, consultas), threading.Barrier(1))
+
+
+def rodada(app: Any, sessoes: int, interacoes: int, consultas: List[str]) -> Dict:
+    """Executa `sessoes` sessões simultâneas e consolida latência, vazão e memória"""
+    rss_inicial = rss_atual_mb()
+    largada = threading.Barrier(sessoes)
+    roteiros = [roteiro_da_sessao(i, interacoes, consultas) for i in range(sessoes)]
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessoes) as executor:
+        resultados = list(executor.map(lambda r: executar_sessao(app, r, largada), roteiros))
+    duracao = time.perf_counter() - inicio
+    rss_final = rss_atual_mb()
+
+    medicoes = [m for resultado in resultados for m in resultado]
+    por_acao: Dict[str, List[float]] = {}
+    for medicao in medicoes:
+        por_acao.setdefault(medicao['acao'], []).append(medicao['segundos'])
+
+    relatorio = {
+        'sessoes': sessoes,
+        'interacoes': len(medicoes),
+        'erros': sum(m['erro'] for m in medicoes),
+        'duracao_s': round(duracao, 2),
+        'vazao_por_s': round(len(medicoes) / duracao, 2),
+        'latencia': resumir([m['segundos'] for m in medicoes]),
+        'latencia_por_acao': {acao: resumir(duracoes)
+                              for acao, duracoes in sorted(por_acao.items())},
+        'rss_mb': round(rss_final, 1),
+        'rss_por_sessao_mb': round(max(rss_final - rss_inicial, 0.0) / sessoes, 2)
+    }
+    latencia = relatorio['latencia']
+    print(f"{sessoes:>4} sessões | {relatorio['vazao_por_s']:>7.2f} int/s | "
+          f"p50 {latencia['p50_ms']:>8.1f}ms p95 {latencia['p95_ms']:>8.1f}ms "
+          f"p99 {latencia['p99_ms']:>8.1f}ms | "
+          f"RSS {relatorio['rss_mb']:.0f}MB (+{relatorio['rss_por_sessao_mb']:.2f}MB/sessão) | "
+          f"erros {relatorio['erros']}")
+    return relatorio
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Teste de carga do chat com sessões simultâneas')
+    parser.add_argument('--sessoes', type=int, nargs='+', default=[1, 5, 10, 20],
+                        help='quantidades de sessões simultâneas (uma rodada para cada)')
+    parser.add_argument('--interacoes', type=int, default=6, help='interações por sessão')
+    parser.add_argument('--catalogo', type=int, default=1000, help='receitas no banco local')
+    parser.add_argument('--latencia-llm', type=float, default=0.5,
+                        help='latência (s) do mock da OpenAI antes do primeiro token')
+    parser.add_argument('--tokens-por-segundo', type=float, default=0.0,
+                        help='vazão do stream do mock da OpenAI (0 = sem limite)')
+    parser.add_argument('--latencia-banco', type=float, default=0.0,
+                        help='latência (s) por consulta ao Supabase local')
+    parser.add_argument('--saida', help='arquivo JSON com os resultados')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    mock_openai = ServidorOpenAIMock(args.latencia_llm, tokens_por_segundo=args.tokens_por_segundo)
+    with tempfile.TemporaryDirectory() as diretorio, mock_openai as mock:
+        caminho_banco = os.path.join(diretorio, 'supabase_fake.db')
+        catalogo = preparar_banco(caminho_banco, args.catalogo)
+        segredos = {
+            'OPENAI_API_KEY': 'sk-carga',
+            'OPENAI_BASE_URL': mock.base_url,
+            'DATABASE_TYPE': 'supabase_fake',
+            'SUPABASE_FAKE_PATH': caminho_banco,
+            'SUPABASE_FAKE_LATENCY': args.latencia_banco,
+            'RESPONSE_CACHE_PATH': os.path.join(diretorio, 'cache_respostas.db'),
+            'SEMANTIC_CACHE_LOCAL_MODEL': False
+        }
+        consultas = gerar_consultas(catalogo, 50)
+
+        import main as app
+        st_original = app.st
+        setattr(app, 'st', StreamlitSimulado(segredos))
+        try:
+            aquecer(app, args.interacoes, consultas)
+            rodadas = [rodada(app, n, args.interacoes, consultas) for n in args.sessoes]
+        finally:
+            app.st = st_original
+        print(f"Requisições ao mock da OpenAI: {mock.requisicoes}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({'parametros': vars(args), 'rodadas': rodadas}, f,
+                      ensure_ascii=False, indent=2)
+        print(f"Resultados salvos em {args.saida}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Catálogos sintéticos de receitas, com o vocabulário do receitas_clean.json"""
+import json
+import os
+import random
+import re
+from typing import Dict, List, Set
+
+CAMINHO_RECEITAS_REAIS = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'receitas_clean.json')
+
+DIFICULDADES = ('Fácil', 'Médio', 'Difícil')
+CONECTORES = ('de', 'com', 'e', 'ao molho de', 'recheado de')
+
+# Início da quantidade em um ingrediente ("Azeite ½ xicara" -> "Azeite")
+_RE_QUANTIDADE = re.compile(r'[\d(½¼¾]')
+
+
+def carregar_vocabulario(caminho: str = CAMINHO_RECEITAS_REAIS) -> Dict[str, List[str]]:
+    """Extrai palavras de título, ingredientes e passos das receitas reais"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        receitas = json.load(f)
+
+    titulos: Set[str] = set()
+    ingredientes: Set[str] = set()
+    passos: Set[str] = set()
+    for receita in receitas:
+        titulos.update(p.capitalize() for p in receita['titulo'].split() if len(p) > 3)
+        for ingrediente in receita.get('ingredientes', []):
+            item = ingrediente.get('item', '').strip()
+            quantidade = ingrediente.get('quantidade', '').strip()
+            if item:
+                # A quantidade às vezes já repete o item: "Alho (½ dente)"
+                ingredientes.add(quantidade if quantidade.startswith(item) else f"{item} {quantidade}".strip())
+        passos.update(p.strip() for p in receita.get('modo_preparo', []) if len(p.strip()) > 10)
+
+    return {
+        'titulos': sorted(titulos),
+        'ingredientes': sorted(ingredientes),
+        'passos': sorted(passos)
+    }
+
+
+def gerar_catalogo(tamanho: int, semente: int = 42) -> List[Dict]:
+    """Gera `tamanho` receitas no formato do chat, de forma determinística pela semente"""
+    vocabulario = carregar_vocabulario()
+    rng = random.Random(semente)
+    receitas = []
+    for i in range(tamanho):
+        palavras = rng.sample(vocabulario['titulos'], 2)
+        titulo = f"{palavras[0]} {rng.choice(CONECTORES)} {palavras[1]} {i}"
+        ingredientes = rng.sample(vocabulario['ingredientes'], rng.randint(4, 12))
+        receitas.append({
+            'id': f"00000000-0000-4000-8000-{i:012d}",
+            'titulo': titulo.upper(),
+            'descricao': f"Receita funcional de {palavras[0].lower()} com {ingredientes[0].lower()}",
+            'ingredientes': ingredientes,
+            'modo_preparo': rng.sample(vocabulario['passos'], rng.randint(3, 8)),
+            'tempo_preparo': f"{rng.randint(1, 12) * 10} minutos",
+            'porcoes': str(rng.randint(1, 10)),
+            'dificuldade': rng.choice(DIFICULDADES),
+            'informacoes_nutricionais': {
+                'calorias': rng.randint(80, 700), 'proteinas': rng.randint(1, 40),
+                'carboidratos': rng.randint(1, 90), 'gorduras': rng.randint(1, 40),
+                'fibras': rng.randint(0, 15)
+            },
+            'beneficios_funcionais': [],
+            'dicas': [rng.choice(vocabulario['passos'])],
+            'harmonizacao': ''
+        })
+    return receitas
+
+
+def gerar_consultas(receitas: List[Dict], quantidade: int, semente: int = 7) -> List[str]:
+    """Consultas realistas: palavras de títulos e ingredientes do próprio catálogo"""
+    rng = random.Random(semente)
+    consultas = []
+    for _ in range(quantidade):
+        receita = rng.choice(receitas)
+        if rng.random() < 0.5:
+            consultas.append(receita['titulo'].split()[0].lower())
+        else:
+            consultas.append(_RE_QUANTIDADE.split(rng.choice(receita['ingredientes']))[0].strip().lower())
+    return consultas
+
+
+def com_erro_de_digitacao(consulta: str, rng: random.Random) -> str:
+    """Troca duas letras vizinhas, simulando um erro de digitação"""
+    if len(consulta) < 4:
+        return consulta
+    i = rng.randrange(1, len(consulta) - 2)
+    return consulta[:i] + consulta[i + 1] + consulta[i] + consulta[i + 2:]
+
+
+def para_markdown(receita: Dict) -> str:
+    """Converte a receita para o formato Markdown de docs/receitas"""
+    linhas = [f"# {receita['titulo'].title()}", "", "## Ingredientes"]
+    linhas += [f"- {ingrediente}" for ingrediente in receita['ingredientes']]
+    linhas += ["", "## Modo de preparo"]
+    linhas += [f"{n}. {passo}" for n, passo in enumerate(receita['modo_preparo'], 1)]
+    linhas += ["", "## Dicas"] + [f"- {dica}" for dica in receita['dicas']]
+    return '\n'.join(linhas)
@@ -0,0 +1,242 @@
+"""
+Servidor HTTP local compatível com o endpoint /v1/chat/completions da OpenAI (com e sem
+streaming SSE), com tempo até o primeiro token e tokens/s configuráveis.
+
+Pedidos com response_format (saídas estruturadas) recebem a receita em JSON; os demais,
+o texto da resposta. Use a base_url como OPENAI_BASE_URL do app:
+
+    python -m benchmarks.mock_openai --perfil tipico --porta 8001
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 streamlit run main.py
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+RESPOSTA_PADRAO = (
+    "✨ Receita da Chef ✨\n\nUma opção leve e funcional para o seu dia.\n\n"
+    "📝 Ingredientes:\n• 1 xícara de grão de bico\n• 1 colher de tahine\n\n"
+    "👩‍🍳 Modo de Preparo:\n1. Bata tudo.\n2. Sirva."
+)
+
+# Receita no formato do SCHEMA_RECEITA (receita_estruturada.py)
+RECEITA_PADRAO = {
+    "titulo": "Homus de Beterraba Assada",
+    "descricao": "Pasta cremosa e colorida, rica em fibras e nitratos",
+    "ingredientes": [
+        "1 beterraba média assada", "1 xícara de grão de bico cozido", "2 colheres de sopa de tahine",
+        "1 dente de alho", "Suco de ½ limão", "2 colheres de sopa de azeite", "Sal a gosto"
+    ],
+    "modo_preparo": [
+        "Asse a beterraba embrulhada em papel alumínio por 40 minutos a 200°C.",
+        "Descasque e corte a beterraba em cubos.",
+        "Bata todos os ingredientes no processador até ficar cremoso.",
+        "Acerte o sal e sirva com um fio de azeite."
+    ],
+    "tempo_preparo": "50 minutos",
+    "porcoes": "6",
+    "dificuldade": "Fácil",
+    "utensilios": "Processador de alimentos, assadeira",
+    "harmonizacao": "Pão sírio integral ou palitos de cenoura",
+    "informacoes_nutricionais": {"calorias": 140, "proteinas": 5, "carboidratos": 15,
+                                 "gorduras": 7, "fibras": 4},
+    "beneficios_funcionais": ["Nitratos da beterraba favorecem a circulação", "Fonte de proteína vegetal"],
+    "dicas": ["Congele em porções por até 3 meses"]
+}
+
+# Perfis de latência: (segundos até o primeiro token, tokens por segundo; 0 = sem limite)
+PERFIS = {
+    'instantaneo': (0.0, 0.0),
+    'rapido': (0.2, 150.0),
+    'tipico': (0.6, 60.0),
+    'lento': (2.0, 20.0),
+}
+
+
+def _dividir_em_tokens(texto: str) -> List[str]:
+    """Divide o texto em trechos parecidos com tokens (palavras com o espaço seguinte)"""
+    trechos, atual = [], ""
+    for caractere in texto:
+        atual += caractere
+        if caractere in " \n":
+            trechos.append(atual)
+            atual = ""
+    if atual:
+        trechos.append(atual)
+    return trechos
+
+
+class _ServidorHTTP(ThreadingHTTPServer):
+    """Servidor HTTP que dá aos handlers acesso à configuração do mock"""
+
+    daemon_threads = True
+
+    def __init__(self, endereco: Tuple[str, int], handler: Type[BaseHTTPRequestHandler],
+                 mock: 'ServidorOpenAIMock'):
+        super().__init__(endereco, handler)
+        self.mock = mock
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _ServidorHTTP
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+        tamanho = int(self.headers.get('Content-Length', 0))
+        corpo = json.loads(self.rfile.read(tamanho) or b'{}')
+        mock = self.server.mock
+        with mock._lock:
+            mock.requisicoes += 1
+        if corpo.get('stream'):
+            self._responder_stream(corpo)
+        else:
+            self._responder_completo(corpo)
+
+    def _uso(self, corpo: Dict, tokens: List[str]) -> Dict:
+        # Estimativa de ~4 caracteres por token, suficiente para o registro de uso do app
+        prompt = sum(len(str(m.get('content', ''))) for m in corpo.get('messages', [])) // 4
+        return {"prompt_tokens": prompt, "completion_tokens": len(tokens),
+                "total_tokens": prompt + len(tokens)}
+
+    def _responder_completo(self, corpo: Dict) -> None:
+        mock = self.server.mock
+        conteudo = mock.conteudo_para(corpo)
+        tokens = _dividir_em_tokens(conteudo)
+        time.sleep(mock.latencia + mock.duracao_geracao(len(tokens)))
+        dados = json.dumps({
+            "id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()),
+            "model": corpo.get("model", "mock"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": conteudo}}],
+            "usage": self._uso(corpo, tokens)
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _enviar_evento(self, corpo: Dict, choices: List[Dict], **extras: Any) -> None:
+        evento = {
+            "id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": corpo.get("model", "mock"), "choices": choices, **extras
+        }
+        self.wfile.write(f"data: {json.dumps(evento)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+    def _responder_stream(self, corpo: Dict) -> None:
+        mock = self.server.mock
+        tokens = _dividir_em_tokens(mock.conteudo_para(corpo))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        try:
+            inicio = time.perf_counter() + mock.latencia
+            for i, trecho in enumerate(tokens):
+                # Agenda cada token a partir do início (sem acumular o atraso dos envios)
+                espera = inicio + mock.duracao_geracao(i) - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+                self._enviar_evento(corpo, [{"index": 0, "delta": {"content": trecho}, "finish_reason": None}])
+            self._enviar_evento(corpo, [{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if (corpo.get('stream_options') or {}).get('include_usage'):
+                self._enviar_evento(corpo, [], usage=self._uso(corpo, tokens))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # O cliente abandonou o stream (ex.: resposta fora do schema)
+            pass
+        self.close_connection = True
+
+
+class ServidorOpenAIMock:
+    """Servidor mock em uma thread própria; use base_url como OPENAI_BASE_URL"""
+
+    def __init__(self, latencia: float = 0.0, resposta: str = RESPOSTA_PADRAO,
+                 host: str = '127.0.0.1', porta: int = 0, tokens_por_segundo: float = 0.0,
+                 receita: Optional[Dict] = None):
+        self.latencia = latencia
+        self.tokens_por_segundo = tokens_por_segundo
+        self.resposta = resposta
+        self.receita = receita or RECEITA_PADRAO
+        self.requisicoes = 0
+        self._lock = threading.Lock()
+        self.host = host
+        self._servidor = _ServidorHTTP((host, porta), _Handler, self)
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def do_perfil(cls, perfil: str, **kwargs: Any) -> 'ServidorOpenAIMock':
+        """Cria o servidor com a latência e a vazão de um dos PERFIS"""
+        latencia, tokens_por_segundo = PERFIS[perfil]
+        return cls(latencia=latencia, tokens_por_segundo=tokens_por_segundo, **kwargs)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self._servidor.server_address[1]}/v1"
+
+    def conteudo_para(self, corpo: Dict) -> str:
+        """Receita em JSON para saídas estruturadas; texto livre nos demais pedidos"""
+        if (corpo.get('response_format') or {}).get('type') in ('json_schema', 'json_object'):
+            return json.dumps(self.receita, ensure_ascii=False)
+        return self.resposta
+
+    def duracao_geracao(self, tokens: int) -> float:
+        """Tempo para gerar `tokens` tokens depois do primeiro"""
+        return tokens / self.tokens_por_segundo if self.tokens_por_segundo else 0.0
+
+    def iniciar(self) -> 'ServidorOpenAIMock':
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self) -> 'ServidorOpenAIMock':
+        return self.iniciar()
+
+    def __exit__(self, *args: Any) -> None:
+        self.parar()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Servidor mock da API de chat da OpenAI')
+    parser.add_argument('--perfil', choices=sorted(PERFIS), default='tipico', help='perfil de latência')
+    parser.add_argument('--ttft', type=float, help='segundos até o primeiro token (sobrescreve o perfil)')
+    parser.add_argument('--tokens-por-segundo', type=float, help='vazão do stream (sobrescreve o perfil)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8001)
+    args = parser.parse_args(argv)
+
+    mock = ServidorOpenAIMock.do_perfil(args.perfil, host=args.host, porta=args.porta)
+    if args.ttft is not None:
+        mock.latencia = args.ttft
+    if args.tokens_por_segundo is not None:
+        mock.tokens_por_segundo = args.tokens_por_segundo
+
+    print(f"Mock da OpenAI em {mock.base_url} (primeiro token em {mock.latencia}s, "
+          f"{mock.tokens_por_segundo or 'sem limite de'} tokens/s)")
+    mock.iniciar()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.parar()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Benchmarks dos caminhos quentes (conversões, normalização, formatação e buscas).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.run_benchmarks --tamanhos 1000 10000 --saida bench.json
+    python -m benchmarks.run_benchmarks --base bench_anterior.json --tolerancia 0.2
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+from benchmarks.catalogo_sintetico import (com_erro_de_digitacao, gerar_catalogo, gerar_consultas,
+                                           para_markdown)
+
+TAMANHOS_PADRAO = (1000, 10000, 100000)
+SAIDA_PADRAO = 'benchmarks/resultados.json'
+
+# Quantidade de chamadas medidas por benchmark
+CHAMADAS_FUNCOES = 2000
+CHAMADAS_BUSCA = 200
+
+PROMPTS = (
+    "Tem receita de homus?", "como fazer pão de queijo", "quero uma sopa de abóbora",
+    "Olá, tudo bem?", "me ajuda com um bolo sem glúten", "receita com beringela e tomate",
+    "obrigada!", "qual o tempo de preparo da focaccia?"
+)
+
+
+def medir(nome: str, funcao: Callable, entradas: Sequence, tamanho: Optional[int] = None) -> Dict:
+    """Executa a função para cada entrada e retorna as estatísticas de tempo (em microssegundos)"""
+    tempos = []
+    for entrada in entradas:
+        inicio = time.perf_counter_ns()
+        funcao(entrada)
+        tempos.append((time.perf_counter_ns() - inicio) / 1000)
+    tempos.sort()
+    total = sum(tempos)
+    resultado = {
+        'nome': nome,
+        'tamanho': tamanho,
+        'chamadas': len(tempos),
+        'media_us': round(total / len(tempos), 2),
+        'p50_us': round(statistics.median(tempos), 2),
+        'p95_us': round(tempos[int(len(tempos) * 0.95) - 1], 2),
+        'max_us': round(tempos[-1], 2),
+        'ops_por_s': round(len(tempos) / (total / 1e6), 1) if total else None
+    }
+    print(f"{nome:<45} {str(tamanho or ''):>7} média {resultado['media_us']:>12.1f}µs  "
+          f"p95 {resultado['p95_us']:>12.1f}µs")
+    return resultado
+
+
+def medir_uma_vez(nome: str, funcao: Callable, tamanho: int) -> Dict:
+    """Mede operações caras executadas uma única vez (carga e indexação)"""
+    return medir(nome, lambda _: funcao(), [None], tamanho)
+
+
+def amostrar(itens: List, quantidade: int) -> List:
+    """Repete os itens até completar a quantidade pedida"""
+    return [itens[i % len(itens)] for i in range(quantidade)]
+
+
+def benchmarks_funcoes(catalogo: List[Dict]) -> List[Dict]:
+    """Funções puras: adaptadores, normalização, classificação, formatação e parsing"""
+    import main
+    from database_supabase import ReceitaAdapter, clean_search_query, format_recipe_output
+    from import_md import parse_markdown_recipe
+
+    receitas = amostrar(catalogo, CHAMADAS_FUNCOES)
+    receitas_db = [ReceitaAdapter.to_db_format(r) for r in receitas]
+    for receita_db, receita in zip(receitas_db, receitas):
+        receita_db['id'] = receita['id']
+    prompts = amostrar(list(PROMPTS), CHAMADAS_FUNCOES)
+    markdowns = [para_markdown(r) for r in receitas]
+
+    return [
+        medir('ReceitaAdapter.to_db_format', ReceitaAdapter.to_db_format, receitas),
+        medir('ReceitaAdapter.to_chat_format', ReceitaAdapter.to_chat_format, receitas_db),
+        medir('clean_search_query', clean_search_query, prompts),
+        medir('extract_search_terms', main.extract_search_terms, prompts),
+        medir('classify_message', main.classify_message, prompts),
+        medir('format_recipe', main.format_recipe, receitas),
+        medir('format_recipe_output', format_recipe_output, receitas),
+        medir('parse_markdown_recipe', parse_markdown_recipe, markdowns),
+    ]
+
+
+def benchmarks_busca(catalogo: List[Dict], diretorio: str) -> List[Dict]:
+    """Buscas no índice em memória, no SQLite local e no Supabase local (fake)"""
+    from database import SQLiteDB
+    from database_supabase import ReceitasDB
+    from indice_busca import IndiceInvertido
+    from supabase_fake import ClienteSupabaseFake
+
+    tamanho = len(catalogo)
+    consultas = gerar_consultas(catalogo, CHAMADAS_BUSCA)
+    rng = random.Random(3)
+    com_erros = [com_erro_de_digitacao(c, rng) for c in consultas]
+    resultados = []
+
+    # Índice em memória
+    construidos: List[IndiceInvertido] = []
+    resultados.append(medir_uma_vez('IndiceInvertido (construção)',
+                                    lambda: construidos.append(IndiceInvertido(catalogo)), tamanho))
+    indice = construidos[0]
+    resultados.append(medir('IndiceInvertido.buscar', indice.buscar, consultas, tamanho))
+    resultados.append(medir('IndiceInvertido.ranquear', indice.ranquear, consultas, tamanho))
+    # O índice de trigramas é construído na primeira busca aproximada
+    resultados.append(medir_uma_vez('IndiceInvertido (trigramas)',
+                                    lambda: indice.aproximadas(com_erros[0]), tamanho))
+    resultados.append(medir('IndiceInvertido.aproximadas', indice.aproximadas, com_erros[:50], tamanho))
+
+    # SQLite local (FTS5)
+    sqlite_db = SQLiteDB(os.path.join(diretorio, f'receitas_{tamanho}.db'))
+    resultados.append(medir_uma_vez(
+        'SQLiteDB.adicionar_receitas_em_lote', lambda: sqlite_db.adicionar_receitas_em_lote(catalogo), tamanho
+    ))
+    resultados.append(medir('SQLiteDB.buscar_receitas', sqlite_db.buscar_receitas, consultas, tamanho))
+    resultados.append(medir('SQLiteDB.buscar_receitas_ranqueadas', sqlite_db.buscar_receitas_ranqueadas,
+                            consultas, tamanho))
+    resultados.append(medir('SQLiteDB.buscar_resumos', sqlite_db.buscar_resumos, consultas, tamanho))
+    sqlite_db.fechar()
+
+    # Supabase local: índice em memória e consulta remota (ilike)
+    cliente = ClienteSupabaseFake()
+    supabase_db = ReceitasDB(cliente=cliente)
+    supabase_db.adicionar_receitas_em_lote(catalogo)
+    resultados.append(medir_uma_vez('ReceitasDB.obter_indice (carga)', supabase_db.obter_indice, tamanho))
+    resultados.append(medir('ReceitasDB.buscar_receitas', supabase_db.buscar_receitas, consultas, tamanho))
+    resultados.append(medir('ReceitasDB.buscar_resumos', supabase_db.buscar_resumos, consultas, tamanho))
+    resultados.append(medir('ReceitasDB._buscar_receitas_remoto', supabase_db._buscar_receitas_remoto,
+                            consultas[:20], tamanho))
+    cliente.fechar()
+    return resultados
+
+
+def versao_git() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def comparar(resultados: List[Dict], caminho_base: str, tolerancia: float) -> List[str]:
+    """Compara as médias com um arquivo de resultados anterior e lista as regressões"""
+    with open(caminho_base, 'r', encoding='utf-8') as f:
+        base = {(r['nome'], r['tamanho']): r for r in json.load(f)['resultados']}
+
+    regressoes = []
+    for resultado in resultados:
+        anterior = base.get((resultado['nome'], resultado['tamanho']))
+        if not anterior or not anterior['media_us']:
+            continue
+        razao = resultado['media_us'] / anterior['media_us']
+        if razao > 1 + tolerancia:
+            regressoes.append(f"{resultado['nome']} ({resultado['tamanho']}): "
+                              f"{anterior['media_us']:.1f}µs -> {resultado['media_us']:.1f}µs ({razao:.2f}x)")
+    return regressoes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks dos caminhos quentes da Chef Virtual')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=list(TAMANHOS_PADRAO),
+                        help='tamanhos dos catálogos sintéticos')
+    parser.add_argument('--saida', default=SAIDA_PADRAO, help='arquivo JSON com os resultados')
+    parser.add_argument('--base', help='resultados anteriores para detectar regressões')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='aumento relativo da média aceito antes de acusar regressão')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    resultados = benchmarks_funcoes(gerar_catalogo(1000))
+    with tempfile.TemporaryDirectory() as diretorio:
+        for tamanho in args.tamanhos:
+            resultados.extend(benchmarks_busca(gerar_catalogo(tamanho), diretorio))
+
+    relatorio = {
+        'gerado_em': datetime.now(timezone.utc).isoformat(),
+        'commit': versao_git(),
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'resultados': resultados
+    }
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados salvos em {args.saida}")
+
+    if args.base:
+        regressoes = comparar(resultados, args.base, args.tolerancia)
+        for regressao in regressoes:
+            print(f"REGRESSÃO: {regressao}")
+        return 1 if regressoes else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
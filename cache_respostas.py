@@ -0,0 +1,119 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Validade padrão de uma resposta em cache (7 dias)
+TTL_PADRAO = 7 * 24 * 3600
+
+# Limites padrão do cache antes da remoção das entradas menos usadas (LRU)
+MAX_ENTRADAS_PADRAO = 5000
+MAX_BYTES_PADRAO = 50 * 1024 * 1024
+
+SQL_CREATE_TABLES = """
+create table if not exists respostas (
+    chave text primary key,
+    resposta text not null,
+    tamanho integer not null,
+    criado_em real not null,
+    acessado_em real not null
+);
+create index if not exists idx_respostas_acessado_em on respostas (acessado_em);
+"""
+
+
+def gerar_chave(prompt_normalizado: str, modelo: str, parametros: Dict, contexto: str = "") -> str:
+    """Gera a chave do cache a partir do prompt normalizado, do modelo e dos parâmetros"""
+    conteudo = json.dumps(
+        {'prompt': prompt_normalizado, 'modelo': modelo, 'parametros': parametros,
+         'contexto': hashlib.sha256(contexto.encode('utf-8')).hexdigest()},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+class CacheRespostas:
+    """Cache persistente (SQLite) de respostas da IA, com TTL e remoção LRU por quantidade/tamanho"""
+
+    def __init__(self, caminho: str = "cache_respostas.db", ttl: float = TTL_PADRAO,
+                 max_entradas: int = MAX_ENTRADAS_PADRAO, max_bytes: int = MAX_BYTES_PADRAO):
+        self.caminho = caminho
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.acertos = 0
+        self.falhas = 0
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.execute("pragma journal_mode=wal")
+        self._conexao.execute("pragma synchronous=normal")
+        with self._conexao:
+            self._conexao.executescript(SQL_CREATE_TABLES)
+
+    def obter(self, chave: str) -> Optional[str]:
+        """Retorna a resposta em cache, ou None se não existir ou tiver expirado"""
+        agora = time.time()
+        with self._lock, self._conexao:
+            linha = self._conexao.execute(
+                "select resposta, criado_em from respostas where chave = ?", (chave,)
+            ).fetchone()
+            if linha is None or agora - linha[1] > self.ttl:
+                if linha is not None:
+                    self._conexao.execute("delete from respostas where chave = ?", (chave,))
+                self.falhas += 1
+                return None
+
+            self._conexao.execute(
+                "update respostas set acessado_em = ? where chave = ?", (agora, chave)
+            )
+            self.acertos += 1
+            resposta: str = linha[0]
+            return resposta
+
+    def gravar(self, chave: str, resposta: str) -> None:
+        """Grava uma resposta e aplica os limites do cache"""
+        if not resposta:
+            return
+        agora = time.time()
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "insert or replace into respostas (chave, resposta, tamanho, criado_em, acessado_em) "
+                "values (?, ?, ?, ?, ?)",
+                (chave, resposta, len(resposta.encode('utf-8')), agora, agora)
+            )
+            self._remover_excedentes(agora)
+
+    def _remover_excedentes(self, agora: float) -> None:
+        """Remove as entradas expiradas e, se preciso, as menos acessadas recentemente"""
+        self._conexao.execute("delete from respostas where criado_em < ?", (agora - self.ttl,))
+        total, tamanho = self._conexao.execute(
+            "select count(*), coalesce(sum(tamanho), 0) from respostas"
+        ).fetchone()
+        if total <= self.max_entradas and tamanho <= self.max_bytes:
+            return
+
+        linhas = self._conexao.execute(
+            "select chave, tamanho from respostas order by acessado_em, rowid"
+        ).fetchall()
+        removidas = []
+        for chave, tamanho_linha in linhas:
+            if total <= self.max_entradas and tamanho <= self.max_bytes:
+                break
+            removidas.append((chave,))
+            total -= 1
+            tamanho -= tamanho_linha
+        self._conexao.executemany("delete from respostas where chave = ?", removidas)
+        logger.info(f"Cache de respostas: {len(removidas)} entradas removidas (LRU)")
+
+    def limpar(self) -> None:
+        """Remove todas as respostas do cache"""
+        with self._lock, self._conexao:
+            self._conexao.execute("delete from respostas")
+
+    def fechar(self) -> None:
+        self._conexao.close()
@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import Dict, FrozenSet, List, Optional, Protocol
+import numpy as np
+from normalizacao import STOP_WORDS, dobrar, radical, tokenizar
+
+logger = logging.getLogger(__name__)
+
+# Similaridade de cosseno mínima para considerar dois prompts equivalentes
+LIMIAR_PADRAO = 0.9
+
+# Quantidade máxima de prompts guardados antes da remoção LRU
+CAPACIDADE_PADRAO = 1000
+
+# Modelo local usado quando o sentence-transformers está instalado
+MODELO_LOCAL_PADRAO = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+_RE_PALAVRA = re.compile(r'\w+')
+
+# Palavras ignoradas pelo embedding por hashing: não mudam o que está sendo pedido
+PALAVRAS_GENERICAS = STOP_WORDS | {
+    'receita', 'receitas', 'tem', 'me', 'ensina', 'faco', 'quero', 'sabe', 'alguma',
+    'algum', 'voce', 'preparar', 'prepara', 'gostaria', 'favor'
+}
+
+# Negações e restrições alimentares: mudam o pedido mesmo com o resto do prompt igual
+# ("pão sem glúten" x "pão com glúten", "bolo vegano" x "bolo"), então precisam coincidir
+MODIFICADORES = frozenset(tokenizar(
+    "sem nao nem zero livre isento isenta vegano vegana vegetariano vegetariana vegan "
+    "diet light fit low keto cetogenico cetogenica paleo integral proteico proteica"
+))
+
+
+class Embedder(Protocol):
+    """
+    Função de embedding com a dimensão dos vetores (normalizados) que gera. Com
+    termos_exatos, o embedding não capta o sentido das palavras e um acerto exige
+    os mesmos termos de conteúdo no prompt.
+    """
+
+    dimensao: int
+    termos_exatos: bool
+
+    def __call__(self, texto: str) -> np.ndarray: ...
+
+
+def modificadores(prompt: str) -> FrozenSet[str]:
+    """Negações e restrições alimentares presentes no prompt"""
+    return frozenset(tokenizar(prompt)) & MODIFICADORES
+
+
+def termos_do_pedido(prompt: str) -> FrozenSet[str]:
+    """Termos de conteúdo do prompt (sem palavras genéricas, reduzidos ao radical)"""
+    return frozenset(radical(p) for p in _RE_PALAVRA.findall(dobrar(prompt))
+                     if p not in PALAVRAS_GENERICAS)
+
+
+class EmbedderHash:
+    """
+    Embedding determinístico por hashing de palavras e trigramas de caracteres.
+    Não precisa de rede nem de modelo, e é estável entre processos (usado nos testes).
+    Só reconhece paráfrases por palavras genéricas: "frango ao molho de mostarda e mel"
+    fica a 0.92 de "frango ao molho de mostarda", por isso exige os mesmos termos.
+    """
+
+    termos_exatos = True
+
+    def __init__(self, dimensao: int = 512):
+        self.dimensao = dimensao
+
+    def _indice(self, termo: str) -> int:
+        digest = hashlib.blake2b(termo.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') % self.dimensao
+
+    def __call__(self, texto: str) -> np.ndarray:
+        vetor = np.zeros(self.dimensao, dtype=np.float32)
+        palavras = [p for p in _RE_PALAVRA.findall(dobrar(texto)) if p not in PALAVRAS_GENERICAS]
+        for palavra in palavras:
+            vetor[self._indice(f"w:{palavra}")] += 1.0
+            preenchida = f" {palavra} "
+            for i in range(len(preenchida) - 2):
+                vetor[self._indice(f"t:{preenchida[i:i + 3]}")] += 0.5
+        norma = np.linalg.norm(vetor)
+        return vetor / norma if norma else vetor
+
+
+class EmbedderLocal:
+    """Embedding com um modelo local do sentence-transformers (dependência opcional)"""
+
+    termos_exatos = False
+
+    def __init__(self, modelo: str = MODELO_LOCAL_PADRAO):
+        from sentence_transformers import SentenceTransformer  # dependência opcional
+        self._modelo = SentenceTransformer(modelo)
+        self.dimensao: int = self._modelo.get_sentence_embedding_dimension()
+
+    def __call__(self, texto: str) -> np.ndarray:
+        vetor: np.ndarray = self._modelo.encode(texto, normalize_embeddings=True)
+        return vetor.astype(np.float32)
+
+
+def criar_embedder(usar_modelo_local: bool = False) -> Embedder:
+    """Embedding por hashing; o modelo local só com opt-in explícito (e se estiver instalado)"""
+    if usar_modelo_local:
+        try:
+            return EmbedderLocal()
+        except Exception as e:
+            logger.info(f"Modelo local de embeddings indisponível, usando hashing: {e}")
+    return EmbedderHash()
+
+
+class CacheSemantico:
+    """
+    Cache de respostas por similaridade: guarda o embedding de cada prompt em uma
+    matriz NumPy e devolve a resposta do prompt mais parecido acima do limiar.
+    O namespace separa entradas de contextos, modelos ou parâmetros diferentes.
+    """
+
+    def __init__(self, embedder: Optional[Embedder] = None, limiar: float = LIMIAR_PADRAO,
+                 capacidade: int = CAPACIDADE_PADRAO):
+        self.embedder: Embedder = embedder or EmbedderHash()
+        self.limiar = limiar
+        self.capacidade = capacidade
+        self._vetores = np.zeros((capacidade, self.embedder.dimensao), dtype=np.float32)
+        self._namespaces: List[Optional[str]] = [None] * capacidade
+        # Termos que precisam coincidir para um acerto (ver assinatura)
+        self._assinaturas: List[FrozenSet[str]] = [frozenset()] * capacidade
+        self._respostas: List[Optional[str]] = [None] * capacidade
+        self._acessos = np.zeros(capacidade, dtype=np.float64)
+        self._ocupados = 0
+        self._lock = threading.Lock()
+        self.consultas = 0
+        self.acertos = 0
+        self.remocoes = 0
+
+    def __len__(self) -> int:
+        return self._ocupados
+
+    def assinatura(self, prompt: str) -> FrozenSet[str]:
+        """Negações e restrições do prompt; com termos_exatos, todos os termos de conteúdo"""
+        restricoes = modificadores(prompt)
+        if self.embedder.termos_exatos:
+            return restricoes | termos_do_pedido(prompt)
+        return restricoes
+
+    def buscar(self, prompt: str, namespace: str = "") -> Optional[str]:
+        """Retorna a resposta de um prompt equivalente já respondido, se houver"""
+        vetor = self.embedder(prompt)
+        assinatura = self.assinatura(prompt)
+        with self._lock:
+            self.consultas += 1
+            if not self._ocupados:
+                return None
+
+            similaridades = self._vetores[:self._ocupados] @ vetor
+            for posicao in map(int, np.argsort(similaridades)[::-1]):
+                if similaridades[posicao] < self.limiar:
+                    break
+                if (self._namespaces[posicao] == namespace
+                        and self._assinaturas[posicao] == assinatura):
+                    self.acertos += 1
+                    self._acessos[posicao] = time.monotonic()
+                    return self._respostas[posicao]
+            return None
+
+    def gravar(self, prompt: str, resposta: str, namespace: str = "") -> None:
+        """Guarda o prompt e a resposta, removendo o menos usado se o cache estiver cheio"""
+        if not resposta:
+            return
+        vetor = self.embedder(prompt)
+        assinatura = self.assinatura(prompt)
+        with self._lock:
+            if self._ocupados < self.capacidade:
+                posicao = self._ocupados
+                self._ocupados += 1
+            else:
+                posicao = int(np.argmin(self._acessos))
+                self.remocoes += 1
+            self._vetores[posicao] = vetor
+            self._namespaces[posicao] = namespace
+            self._assinaturas[posicao] = assinatura
+            self._respostas[posicao] = resposta
+            self._acessos[posicao] = time.monotonic()
+
+    def metricas(self) -> Dict[str, float]:
+        """Métricas de uso do cache (consultas, acertos, taxa de acerto, remoções, tamanho)"""
+        with self._lock:
+            return {
+                'consultas': self.consultas,
+                'acertos': self.acertos,
+                'falhas': self.consultas - self.acertos,
+                'taxa_acerto': self.acertos / self.consultas if self.consultas else 0.0,
+                'remocoes': self.remocoes,
+                'entradas': self._ocupados
+            }
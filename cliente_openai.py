@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import queue
+import threading
+from types import SimpleNamespace
+from typing import Any, Coroutine, Iterator, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Gerações simultâneas permitidas no processo (as demais aguardam na fila do semáforo)
+MAX_GERACOES_SIMULTANEAS = 8
+
+# Pool de conexões keep-alive reaproveitadas entre sessões (evita novo handshake TLS)
+MAX_CONEXOES = 20
+MAX_CONEXOES_KEEPALIVE = 10
+EXPIRACAO_KEEPALIVE = 60.0
+
+# Timeouts por fase: conectar deve ser rápido; a leitura cobre o intervalo entre tokens
+TIMEOUT_CONEXAO = 5.0
+TIMEOUT_LEITURA = 60.0
+TIMEOUT_ESCRITA = 10.0
+TIMEOUT_POOL = 10.0
+
+_FIM = object()
+
+try:
+    import h2  # noqa: F401  dependência opcional para HTTP/2
+    HTTP2_DISPONIVEL = True
+except ImportError:
+    HTTP2_DISPONIVEL = False
+
+_aviso_http2 = threading.Lock()
+_http2_avisado = False
+
+
+def _avisar_sem_http2() -> None:
+    """Registra uma única vez por processo que o HTTP/2 pedido caiu para HTTP/1.1"""
+    global _http2_avisado
+    with _aviso_http2:
+        if _http2_avisado:
+            return
+        _http2_avisado = True
+    logger.error("HTTP/2 pedido, mas o pacote h2 não está instalado: usando HTTP/1.1")
+
+
+class ClienteOpenAI:
+    """
+    Cliente AsyncOpenAI único por processo, executado em um event loop em segundo plano.
+    Expõe a mesma interface síncrona usada pelo app (client.chat.completions.create),
+    limitando as gerações em andamento com um semáforo.
+    """
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None,
+                 max_simultaneas: int = MAX_GERACOES_SIMULTANEAS, http2: bool = True,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="openai-loop", daemon=True)
+        self._thread.start()
+
+        if http2 and not HTTP2_DISPONIVEL:
+            _avisar_sem_http2()
+        self.http_client = httpx.AsyncClient(
+            http2=http2 and HTTP2_DISPONIVEL,
+            limits=httpx.Limits(
+                max_connections=MAX_CONEXOES,
+                max_keepalive_connections=MAX_CONEXOES_KEEPALIVE,
+                keepalive_expiry=EXPIRACAO_KEEPALIVE
+            ),
+            timeout=httpx.Timeout(
+                connect=TIMEOUT_CONEXAO, read=TIMEOUT_LEITURA,
+                write=TIMEOUT_ESCRITA, pool=TIMEOUT_POOL
+            ),
+            follow_redirects=True,
+            transport=transport
+        )
+        self.cliente = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self.http_client)
+        self._semaforo = self._executar(self._criar_semaforo(max_simultaneas))
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.criar))
+
+    @staticmethod
+    async def _criar_semaforo(limite: int) -> asyncio.Semaphore:
+        # O semáforo precisa ser criado dentro do loop que vai usá-lo
+        return asyncio.Semaphore(limite)
+
+    def _executar(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Executa uma corrotina no loop do cliente e aguarda o resultado"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _completar(self, **kwargs: Any) -> Any:
+        async with self._semaforo:
+            return await self.cliente.chat.completions.create(**kwargs)
+
+    async def _transmitir(self, fila: queue.Queue, kwargs: dict) -> None:
+        try:
+            async with self._semaforo:
+                stream = await self.cliente.chat.completions.create(stream=True, **kwargs)
+                async for chunk in stream:
+                    fila.put(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            fila.put(e)
+        finally:
+            fila.put(_FIM)
+
+    def _iterar_stream(self, kwargs: dict) -> Iterator[Any]:
+        """Repassa os chunks do stream assíncrono para um iterador síncrono"""
+        fila: queue.Queue = queue.Queue()
+        futuro = asyncio.run_coroutine_threadsafe(self._transmitir(fila, kwargs), self._loop)
+        try:
+            while True:
+                item = fila.get()
+                if item is _FIM:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Leitura interrompida (ex.: usuário saiu da página): libera a vaga no semáforo
+            futuro.cancel()
+
+    def criar(self, stream: bool = False, **kwargs: Any) -> Any:
+        """Equivalente síncrono de chat.completions.create (com stream=True retorna um iterador)"""
+        if stream:
+            return self._iterar_stream(kwargs)
+        return self._executar(self._completar(**kwargs))
+
+    def fechar(self) -> None:
+        self._executar(self.cliente.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,71 @@
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+# Resultado entregue a quem aguarda quando o líder é interrompido por uma BaseException
+_INTERROMPIDA = object()
+
+
+class SingleFlight:
+    """
+    Coalescência de chamadas duplicadas: enquanto uma chamada para a chave estiver em
+    andamento, as chamadas concorrentes com a mesma chave aguardam o mesmo Future e
+    recebem o mesmo resultado (ou a mesma Exception), em vez de repetir o trabalho.
+    """
+
+    def __init__(self, nome: str = ""):
+        self.nome = nome
+        self._em_andamento: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.execucoes = 0
+        self.compartilhadas = 0
+
+    def executar(self, chave: Hashable, funcao: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Executa funcao(*args, **kwargs), ou aguarda a execução já em andamento para a chave"""
+        while True:
+            with self._lock:
+                existente = self._em_andamento.get(chave)
+                if existente is None:
+                    futuro: Future = Future()
+                    self._em_andamento[chave] = futuro
+                    self.execucoes += 1
+                else:
+                    self.compartilhadas += 1
+
+            if existente is None:
+                return self._liderar(chave, futuro, funcao, *args, **kwargs)
+
+            logger.info(f"SingleFlight {self.nome}: aguardando chamada em andamento")
+            resultado = existente.result()
+            if resultado is not _INTERROMPIDA:
+                return resultado
+            # O líder foi interrompido: esta chamada executa a função (ou aguarda um novo líder)
+
+    def _liderar(self, chave: Hashable, futuro: Future, funcao: Callable[..., Any],
+                 *args: Any, **kwargs: Any) -> Any:
+        try:
+            resultado = funcao(*args, **kwargs)
+        except BaseException as e:
+            self._liberar(chave)
+            if isinstance(e, Exception):
+                futuro.set_exception(e)
+            else:
+                # Interrupções da sessão do líder (KeyboardInterrupt, StopException/RerunException
+                # do Streamlit) não são repassadas a quem aguarda: eles executam a função
+                futuro.set_result(_INTERROMPIDA)
+            raise
+        self._liberar(chave)
+        futuro.set_result(resultado)
+        return resultado
+
+    def _liberar(self, chave: Hashable) -> None:
+        # Libera a chave antes de concluir o Future: quem acordar já pode liderar de novo
+        with self._lock:
+            del self._em_andamento[chave]
+
+    def em_andamento(self) -> int:
+        with self._lock:
+            return len(self._em_andamento)
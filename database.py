@@ -0,0 +1,399 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import uuid
+from database_interface import DatabaseInterface
+from database_supabase import (COLUNAS_RESUMO, TAMANHO_LOTE_PADRAO, ReceitaAdapter,
+                               clean_search_query, inserir_em_lote)
+from indice_busca import LIMIAR_SIMILARIDADE, PESOS_CAMPOS, obter_indice, invalidar_indice
+from metricas import timed
+from normalizacao import tokenizar
+
+logger = logging.getLogger(__name__)
+
+# Campos JSON (jsonb no Supabase) guardados como texto no SQLite
+CAMPOS_JSON = ('informacoes_nutricionais', 'beneficios_funcionais', 'dicas')
+
+# Colunas indexadas no FTS5, na mesma ordem dos pesos do BM25
+CAMPOS_FTS = tuple(PESOS_CAMPOS)
+
+SQL_CREATE_TABLES = """
+create table if not exists receitas (
+    seq integer primary key autoincrement,
+    id text not null unique,
+    titulo text not null,
+    descricao text,
+    utensilios text,
+    ingredientes text,
+    modo_preparo text,
+    tempo_preparo text,
+    porcoes text,
+    dificuldade text,
+    harmonizacao text,
+    informacoes_nutricionais text default '{}',
+    beneficios_funcionais text default '[]',
+    dicas text default '[]',
+    created_at text default (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+"""
+
+# Índice de texto completo (conteúdo externo, sincronizado por triggers). As colunas guardam
+# os radicais de normalizacao.radical(), como o índice em memória: "limões" acha "limão".
+# O 'delete' do FTS5 precisa dos mesmos valores inseridos, por isso os triggers também
+# passam por radicais(), registrada em cada conexão (ver _abrir_conexao)
+VERSAO_FTS = 1
+SQL_CREATE_FTS = """
+drop trigger if exists receitas_ai;
+drop trigger if exists receitas_ad;
+drop trigger if exists receitas_au;
+drop table if exists receitas_fts;
+
+create virtual table receitas_fts using fts5(
+    titulo, ingredientes, descricao, dicas, harmonizacao,
+    content='receitas', content_rowid='seq',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+create trigger receitas_ai after insert on receitas begin
+    insert into receitas_fts(rowid, titulo, ingredientes, descricao, dicas, harmonizacao)
+    values (new.seq, radicais(new.titulo), radicais(new.ingredientes), radicais(new.descricao),
+            radicais(new.dicas), radicais(new.harmonizacao));
+end;
+
+create trigger receitas_ad after delete on receitas begin
+    insert into receitas_fts(receitas_fts, rowid, titulo, ingredientes, descricao, dicas, harmonizacao)
+    values ('delete', old.seq, radicais(old.titulo), radicais(old.ingredientes),
+            radicais(old.descricao), radicais(old.dicas), radicais(old.harmonizacao));
+end;
+
+create trigger receitas_au after update on receitas begin
+    insert into receitas_fts(receitas_fts, rowid, titulo, ingredientes, descricao, dicas, harmonizacao)
+    values ('delete', old.seq, radicais(old.titulo), radicais(old.ingredientes),
+            radicais(old.descricao), radicais(old.dicas), radicais(old.harmonizacao));
+    insert into receitas_fts(rowid, titulo, ingredientes, descricao, dicas, harmonizacao)
+    values (new.seq, radicais(new.titulo), radicais(new.ingredientes), radicais(new.descricao),
+            radicais(new.dicas), radicais(new.harmonizacao));
+end;
+
+-- Reindexa as receitas existentes (o 'rebuild' leria o texto original, sem os radicais)
+insert into receitas_fts(rowid, titulo, ingredientes, descricao, dicas, harmonizacao)
+select seq, radicais(titulo), radicais(ingredientes), radicais(descricao),
+       radicais(dicas), radicais(harmonizacao)
+from receitas;
+"""
+
+# Pesos do bm25() na ordem das colunas do FTS5
+_PESOS_BM25 = ', '.join(str(PESOS_CAMPOS[campo]) for campo in CAMPOS_FTS)
+
+# Consultas fixas: parametrizadas para reaproveitar os statements preparados
+# pelo cache do sqlite3 em cada conexão
+SQL_INSERIR = """
+insert into receitas (id, titulo, descricao, utensilios, ingredientes, modo_preparo,
+    tempo_preparo, porcoes, dificuldade, harmonizacao,
+    informacoes_nutricionais, beneficios_funcionais, dicas)
+values (:id, :titulo, :descricao, :utensilios, :ingredientes, :modo_preparo,
+    :tempo_preparo, :porcoes, :dificuldade, :harmonizacao,
+    :informacoes_nutricionais, :beneficios_funcionais, :dicas)
+"""
+SQL_UPSERT = SQL_INSERIR + """
+on conflict(id) do update set
+    titulo = excluded.titulo, descricao = excluded.descricao, utensilios = excluded.utensilios,
+    ingredientes = excluded.ingredientes, modo_preparo = excluded.modo_preparo,
+    tempo_preparo = excluded.tempo_preparo, porcoes = excluded.porcoes,
+    dificuldade = excluded.dificuldade, harmonizacao = excluded.harmonizacao,
+    informacoes_nutricionais = excluded.informacoes_nutricionais,
+    beneficios_funcionais = excluded.beneficios_funcionais, dicas = excluded.dicas
+"""
+SQL_TODAS = "select * from receitas order by seq"
+SQL_POR_ID = "select * from receitas where id = ?"
+SQL_BUSCA_FTS = """
+select r.* from receitas_fts f join receitas r on r.seq = f.rowid
+where receitas_fts match ? order by r.seq
+"""
+SQL_BUSCA_RANQUEADA = f"""
+select r.*, -bm25(receitas_fts, {_PESOS_BM25}) as score
+from receitas_fts join receitas r on r.seq = receitas_fts.rowid
+where receitas_fts match ? order by score desc, r.seq limit ?
+"""
+SQL_RESUMOS_RANQUEADOS = f"""
+select {', '.join('r.' + c for c in COLUNAS_RESUMO.split(','))}
+from receitas_fts join receitas r on r.seq = receitas_fts.rowid
+where receitas_fts match ? order by bm25(receitas_fts, {_PESOS_BM25}), r.seq
+limit ?
+"""
+SQL_LIMPAR = "delete from receitas"
+
+# Conexões do pool e espera (em segundos) por uma conexão livre quando todas estão emprestadas
+TAMANHO_POOL = 4
+ESPERA_POOL = 30.0
+
+
+def _radicais(texto: Optional[str]) -> Optional[str]:
+    """Texto indexado no FTS5: os radicais dos termos, na mesma normalização da consulta"""
+    if texto is None:
+        return None
+    return ' '.join(tokenizar(texto))
+
+
+def _expressao_fts(query: str, colunas: Tuple[str, ...] = (), operador: str = ' ') -> str:
+    """Monta uma expressão MATCH do FTS5 com busca por prefixo no radical de cada termo"""
+    termos = [f'"{termo}"*' for termo in tokenizar(query)]
+    if not termos:
+        return ''
+    expressao = f"({operador.join(termos)})"
+    if colunas:
+        expressao = f"{{{' '.join(colunas)}}} : {expressao}"
+    return expressao
+
+
+class SQLiteDB(DatabaseInterface):
+    def __init__(self, caminho: str = "receitas_local.db", tamanho_pool: int = TAMANHO_POOL):
+        """Inicializa o banco SQLite local (WAL + FTS5)"""
+        self.caminho = caminho
+        # Pool limitado: cada rerun do Streamlit roda em uma thread nova, então as conexões
+        # são emprestadas por chamada em vez de ficarem presas a threads que já terminaram
+        self.tamanho_pool = tamanho_pool
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._abertas = 0
+        self._lock = threading.Lock()
+        self._chave_indice = f"sqlite:{caminho}"
+        try:
+            self.criar_tabelas()
+            logger.info(f"Banco SQLite pronto em {caminho}")
+        except Exception as e:
+            logger.error(f"Erro ao inicializar SQLite: {e}")
+            raise
+
+    def _abrir_conexao(self) -> sqlite3.Connection:
+        conexao = sqlite3.connect(self.caminho, check_same_thread=False, cached_statements=256)
+        conexao.row_factory = sqlite3.Row
+        conexao.create_function("radicais", 1, _radicais, deterministic=True)
+        conexao.execute("pragma journal_mode=wal")
+        conexao.execute("pragma synchronous=normal")
+        conexao.execute("pragma busy_timeout=5000")
+        return conexao
+
+    @contextmanager
+    def _conexao(self) -> Iterator[sqlite3.Connection]:
+        """Empresta uma conexão do pool (abrindo outra enquanto houver vaga) e a devolve ao sair"""
+        try:
+            conexao = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                abrir = self._abertas < self.tamanho_pool
+                if abrir:
+                    self._abertas += 1
+            if abrir:
+                try:
+                    conexao = self._abrir_conexao()
+                except Exception:
+                    with self._lock:
+                        self._abertas -= 1
+                    raise
+            else:
+                conexao = self._pool.get(timeout=ESPERA_POOL)
+        try:
+            yield conexao
+        finally:
+            self._pool.put(conexao)
+
+    @contextmanager
+    def _transacao(self) -> Iterator[sqlite3.Connection]:
+        """Conexão do pool dentro de uma transação (commit ao sair, rollback em erro)"""
+        with self._conexao() as conexao, conexao:
+            yield conexao
+
+    def fechar(self) -> None:
+        """Fecha as conexões ociosas do pool"""
+        while True:
+            try:
+                conexao = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conexao.close()
+            with self._lock:
+                self._abertas -= 1
+
+    def criar_tabelas(self) -> None:
+        """Cria as tabelas e o índice FTS5 com o mesmo conjunto de colunas do Supabase"""
+        with self._conexao() as conexao:
+            conexao.executescript(SQL_CREATE_TABLES)
+            versao = conexao.execute("pragma user_version").fetchone()[0]
+            if versao < VERSAO_FTS:
+                # Bancos antigos indexavam o texto sem os radicais: recria o índice em uma transação
+                conexao.executescript(
+                    f"begin;\n{SQL_CREATE_FTS}\npragma user_version = {VERSAO_FTS};\ncommit;"
+                )
+
+    def _linha_para_receita(self, linha: sqlite3.Row) -> Optional[Dict]:
+        """Converte uma linha do SQLite para o formato do chat"""
+        receita_db = dict(linha)
+        for campo in CAMPOS_JSON:
+            if isinstance(receita_db.get(campo), str):
+                receita_db[campo] = json.loads(receita_db[campo] or 'null')
+        return ReceitaAdapter.to_chat_format(receita_db)
+
+    def _consultar(self, sql: str, parametros: tuple = ()) -> List[Dict]:
+        with self._conexao() as conexao:
+            linhas = conexao.execute(sql, parametros).fetchall()
+        receitas = [self._linha_para_receita(linha) for linha in linhas]
+        return [r for r in receitas if r]
+
+    @timed
+    def adicionar_receita(self, receita: Dict) -> bool:
+        """Adiciona uma nova receita ao banco de dados"""
+        try:
+            receita_db = ReceitaAdapter.to_db_format(receita)
+            if not receita_db:
+                return False
+
+            with self._transacao() as conexao:
+                conexao.execute(SQL_INSERIR, self._preparar_linha(receita_db))
+            invalidar_indice(self._chave_indice)
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao adicionar receita: {e}")
+            return False
+
+    def _preparar_linha(self, receita_db: Dict) -> Dict:
+        """Gera o ID (se ausente) e serializa os campos JSON de uma linha no formato do banco"""
+        linha = dict(receita_db)
+        linha['id'] = linha.get('id') or str(uuid.uuid4())
+        for campo in CAMPOS_JSON:
+            linha[campo] = json.dumps(linha[campo], ensure_ascii=False)
+        return linha
+
+    def adicionar_receitas_em_lote(self, receitas: List[Dict],
+                                   batch_size: int = TAMANHO_LOTE_PADRAO,
+                                   upsert: bool = False) -> Dict:
+        """Adiciona várias receitas com executemany, uma transação por lote (upsert pelo 'id')"""
+        sql = SQL_UPSERT if upsert else SQL_INSERIR
+
+        def inserir(linhas: List[Dict]) -> None:
+            with self._transacao() as conexao:
+                conexao.executemany(sql, [self._preparar_linha(linha) for linha in linhas])
+
+        relatorio = inserir_em_lote(receitas, inserir, batch_size)
+        if relatorio['sucesso']:
+            invalidar_indice(self._chave_indice)
+        return relatorio
+
+    def limpar_banco(self) -> bool:
+        """Limpa todas as receitas do banco de dados"""
+        try:
+            with self._transacao() as conexao:
+                conexao.execute(SQL_LIMPAR)
+            invalidar_indice(self._chave_indice)
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao limpar banco: {e}")
+            return False
+
+    @timed
+    def buscar_receitas(self, query: str = "") -> list:
+        """Busca receitas no título, depois nos ingredientes, depois na descrição"""
+        try:
+            if not query or not query.strip():
+                return self._consultar(SQL_TODAS)
+
+            for campo in ('titulo', 'ingredientes', 'descricao'):
+                expressao = _expressao_fts(query, (campo,))
+                if not expressao:
+                    return []
+                receitas = self._consultar(SQL_BUSCA_FTS, (expressao,))
+                if receitas:
+                    logger.info(f"Encontradas {len(receitas)} receitas")
+                    return receitas
+            return []
+
+        except Exception as e:
+            logger.error(f"Erro na busca: {e}")
+            return []
+
+    @timed
+    def buscar_receitas_por_texto(self, query: str) -> List[Dict]:
+        """Busca receitas por texto livre no título (usado no chat)"""
+        try:
+            expressao = _expressao_fts(clean_search_query(query or ''), ('titulo',))
+            if not expressao:
+                return []
+            return self._consultar(SQL_BUSCA_FTS, (expressao,))
+        except Exception as e:
+            logger.error(f"Erro na busca: {str(e)}")
+            return []
+
+    def buscar_receitas_ranqueadas(self, query: str, limite: int = 10) -> List[Tuple[Dict, float]]:
+        """Busca receitas por texto livre, ranqueadas pelo bm25() do FTS5 com pesos por campo"""
+        try:
+            expressao = _expressao_fts(clean_search_query(query or ''), operador=' OR ')
+            if not expressao or limite <= 0:
+                return []
+
+            with self._conexao() as conexao:
+                linhas = conexao.execute(SQL_BUSCA_RANQUEADA, (expressao, limite)).fetchall()
+            resultados = []
+            for linha in linhas:
+                receita = self._linha_para_receita(linha)
+                if receita:
+                    resultados.append((receita, float(linha['score'])))
+            return resultados
+
+        except Exception as e:
+            logger.error(f"Erro na busca ranqueada: {str(e)}")
+            return []
+
+    def buscar_receitas_aproximadas(self, query: str, limiar: float = LIMIAR_SIMILARIDADE,
+                                    limite: int = 10) -> List[Tuple[Dict, float]]:
+        """Busca tolerante a erros de digitação usando o índice de trigramas em memória"""
+        try:
+            if not query:
+                return []
+            indice = obter_indice(self._chave_indice, lambda: self._consultar(SQL_TODAS))
+            return indice.aproximadas(query, limiar, limite)
+        except Exception as e:
+            logger.error(f"Erro na busca aproximada: {str(e)}")
+            return []
+
+    def buscar_resumos(self, query: str, limite: int = 30) -> List[Dict]:
+        """Modo de listagem: lê apenas as colunas da prévia e retorna os resumos das receitas"""
+        try:
+            expressao = _expressao_fts(clean_search_query(query or ''), operador=' OR ')
+            if not expressao or limite <= 0:
+                return []
+
+            with self._conexao() as conexao:
+                linhas = conexao.execute(SQL_RESUMOS_RANQUEADOS, (expressao, limite)).fetchall()
+            if linhas:
+                resumos = [ReceitaAdapter.to_resumo(dict(linha)) for linha in linhas]
+            else:
+                resumos = [ReceitaAdapter.to_resumo(r)
+                           for r, _score in self.buscar_receitas_aproximadas(query, limite=limite)]
+            return [r for r in resumos if r]
+        except Exception as e:
+            logger.error(f"Erro na busca de resumos: {str(e)}")
+            return []
+
+    @timed
+    def buscar_receita_por_id(self, receita_id: str) -> Optional[Dict]:
+        """Busca uma receita específica pelo ID"""
+        try:
+            receitas = self._consultar(SQL_POR_ID, (str(receita_id),))
+            if not receitas:
+                logger.warning(f"Receita não encontrada: {receita_id}")
+                return None
+            return receitas[0]
+        except Exception as e:
+            logger.error(f"Erro ao buscar receita: {str(e)}")
+            return None
+
+    def exportar_receitas(self) -> List[Dict]:
+        """Exporta todas as receitas do banco de dados"""
+        try:
+            return self._consultar(SQL_TODAS)
+        except Exception as e:
+            logger.error(f"Erro ao exportar receitas: {e}")
+            return []
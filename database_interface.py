@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 class DatabaseInterface(ABC):
     @abstractmethod
@@ -12,4 +12,22 @@ class DatabaseInterface(ABC):
     
     @abstractmethod
     def buscar_receita_por_id(self, receita_id: str) -> Optional[Dict]:
-        pass 
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def buscar_receitas_ranqueadas(self, query: str, limite: int = 10) -> List[Tuple[Dict, float]]:
+        pass
+
+    @abstractmethod
+    def buscar_receitas_aproximadas(self, query: str, limiar: float = 0.3,
+                                    limite: int = 10) -> List[Tuple[Dict, float]]:
+        pass
+
+    @abstractmethod
+    def buscar_resumos(self, query: str, limite: int = 30) -> List[Dict]:
+        pass
+
+    @abstractmethod
+    def adicionar_receitas_em_lote(self, receitas: List[Dict], batch_size: int = 500,
+                                   upsert: bool = False) -> Dict:
+        pass
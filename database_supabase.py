@@ -1,12 +1,17 @@
-from typing import Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple, Union
 import json
 import logging
 from datetime import datetime
-from supabase import create_client, Client
+from supabase import create_client
 import streamlit as st
 import os
-from tenacity import retry, stop_after_attempt, wait_exponential
+import threading
+from tenacity import retry, stop_after_attempt, wait_fixed
 from database_interface import DatabaseInterface
+from indice_busca import LIMIAR_SIMILARIDADE, IndiceInvertido, obter_indice, invalidar_indice
+from metricas import timed
+from rastreamento import rastreado, registrar_retentativa
+from normalizacao import STOP_WORDS, dobrar
 
 # Configurar logging
 logging.basicConfig(level=logging.ERROR)
@@ -22,30 +27,21 @@ if os.getenv('ENVIRONMENT') == 'development':
     supabase_logger.setLevel(logging.DEBUG)
 
 def normalize_text(text: str) -> str:
-    """Normaliza um texto para busca"""
+    """Normaliza um texto para busca (sem acentos e em minúsculas)"""
     if not text:
         return ""
-    return text.strip().lower()
+    return dobrar(text.strip())
 
 def clean_search_query(query: str) -> str:
     """Limpa a query de busca, removendo palavras comuns e mantendo apenas termos relevantes"""
-    # Palavras para remover
-    stop_words = {
-        'o', 'que', 'os', 'as', 'um', 'uns', 'uma', 'umas', 'com', 'para',
-        'por', 'em', 'no', 'na', 'nos', 'nas', 'do', 'da', 'dos', 'das',
-        'posso', 'pode', 'fazer', 'como', 'onde', 'quando', 'qual', 'quais',
-        'aonde', 'porque', 'por que', 'usar', 'uso', 'de', 'e', 'ou', 'mas',
-        'porem', 'entao', 'assim', 'pois'
-    }
-    
     # Remove pontuação
     query = ''.join(c for c in query if c.isalnum() or c.isspace())
     
     # Normaliza e divide em palavras
     words = normalize_text(query).split()
     
-    # Remove stop words
-    cleaned_words = [word for word in words if word not in stop_words]
+    # Remove stop words (a lista e as palavras já estão sem acentos)
+    cleaned_words = [word for word in words if word not in STOP_WORDS]
     
     # Se ficou vazio após limpeza, retorna a query original normalizada
     if not cleaned_words:
@@ -113,23 +109,117 @@ def format_recipe_output(recipe: Dict) -> str:
     
     return "\n".join(output)
 
+# Colunas usadas pela listagem de resultados (render_recipe_preview)
+COLUNAS_RESUMO = 'id,titulo,descricao,ingredientes,tempo_preparo,porcoes,dificuldade'
+
+# Quantidade de ingredientes mostrada na prévia da receita
+LIMITE_PREVIEW_INGREDIENTES = 5
+
+# Tamanho padrão dos lotes de inserção em massa
+TAMANHO_LOTE_PADRAO = 500
+
+def inserir_em_lote(receitas: List[Dict[str, Any]],
+                    inserir: Callable[[List[Dict[str, Any]]], None],
+                    batch_size: int = TAMANHO_LOTE_PADRAO) -> Dict[str, Any]:
+    """
+    Converte as receitas com ReceitaAdapter.to_db_format e as envia em lotes
+    usando `inserir` (que recebe uma lista de linhas). Se um lote falha, suas
+    linhas são reenviadas uma a uma para identificar exatamente quais falharam.
+    Retorna um relatório com o total, os sucessos e as falhas por linha.
+    """
+    sucesso = 0
+    falhas: List[Dict[str, Any]] = []
+
+    def registrar_falha(indice: int, erro: str) -> None:
+        titulo = str((receitas[indice] or {}).get('titulo', '')).strip() or 'Sem título'
+        falhas.append({'indice': indice, 'titulo': titulo, 'erro': erro})
+
+    # Converte tudo antes, registrando as linhas inválidas
+    pendentes: List[Tuple[int, Dict[str, Any]]] = []
+    for indice, receita in enumerate(receitas):
+        receita_db = ReceitaAdapter.to_db_format(receita) if receita else None
+        if receita_db:
+            pendentes.append((indice, receita_db))
+        else:
+            registrar_falha(indice, "Receita inválida para o formato do banco")
+
+    tamanho_lote = max(1, batch_size)
+    for inicio in range(0, len(pendentes), tamanho_lote):
+        lote = pendentes[inicio:inicio + tamanho_lote]
+        try:
+            inserir([linha for _, linha in lote])
+            sucesso += len(lote)
+        except Exception as e:
+            logger.warning(f"Falha no lote iniciado em {lote[0][0]}, reenviando linha a linha: {e}")
+            for indice, linha in lote:
+                try:
+                    inserir([linha])
+                    sucesso += 1
+                except Exception as erro_linha:
+                    registrar_falha(indice, str(erro_linha))
+
+    return {'total': len(receitas), 'sucesso': sucesso, 'falhas': falhas}
+
 class DatabaseError(Exception):
     """Exceção customizada para erros do banco de dados"""
     pass
 
+# Falhas transitórias do Supabase: as buscas repetem a chamada remota (que propaga o erro)
+# e anotam as tentativas no span atual; o tratamento fica fora do retry. As buscas estão no
+# caminho interativo (o chat faz várias por turno), então a política é curta: uma nova
+# tentativa após uma pausa breve, em vez de segundos de espera antes da resposta
+TENTATIVAS_BUSCA = 2
+ESPERA_RETENTATIVA = 0.1
+
+_com_retentativas = retry(stop=stop_after_attempt(TENTATIVAS_BUSCA),
+                          wait=wait_fixed(ESPERA_RETENTATIVA),
+                          after=registrar_retentativa, reraise=True)
+
+
+class ClienteSupabase(Protocol):
+    """O que o ReceitasDB usa do cliente supabase-py (também atendido pelo ClienteSupabaseFake)"""
+
+    supabase_url: str
+
+    def table(self, nome: str, /) -> Any: ...
+
+
 class ReceitasDB(DatabaseInterface):
-    def __init__(self):
-        """Inicializa a conexão com o Supabase"""
+    # Instância compartilhada pelo processo (ver shared())
+    _compartilhada: Optional['ReceitasDB'] = None
+    _lock_compartilhada = threading.Lock()
+
+    def __init__(self, cliente: Optional[ClienteSupabase] = None):
+        """
+        Inicializa a conexão com o Supabase. Um cliente compatível pode ser injetado
+        (ex.: ClienteSupabaseFake, para testes e benchmarks sem rede).
+        """
         try:
-            url = st.secrets["SUPABASE_URL"]
-            key = st.secrets["SUPABASE_KEY"]
-            self.supabase: Client = create_client(url, key)
+            if cliente is None:
+                url = st.secrets["SUPABASE_URL"]
+                key = st.secrets["SUPABASE_KEY"]
+                cliente = create_client(url, key)
+            self.supabase: ClienteSupabase = cliente
+            # Chave do índice em memória compartilhado pelo processo
+            self._chave_indice = cliente.supabase_url
             logger.info("Conexão estabelecida com Supabase")
             self.criar_tabelas()
         except Exception as e:
             logger.error(f"Erro ao conectar com Supabase: {e}")
             raise
 
+    @classmethod
+    def shared(cls) -> 'ReceitasDB':
+        """
+        Retorna a instância compartilhada pelo processo, criando-a na primeira chamada.
+        Reaproveita o mesmo cliente Supabase (e suas conexões HTTP) entre reruns e sessões.
+        """
+        if cls._compartilhada is None:
+            with cls._lock_compartilhada:
+                if cls._compartilhada is None:
+                    cls._compartilhada = cls()
+        return cls._compartilhada
+
     def criar_tabelas(self):
         """
         Verifica se as tabelas existem.
@@ -206,6 +296,7 @@ class ReceitasDB(DatabaseInterface):
         """Converte o formato do banco para o formato da aplicação"""
         return ReceitaAdapter.to_chat_format(receita_db)
 
+    @timed
     def adicionar_receita(self, receita: Dict) -> bool:
         """Adiciona uma nova receita ao banco de dados"""
         try:
@@ -216,11 +307,31 @@ class ReceitasDB(DatabaseInterface):
             
             # Insere no banco
             data = self.supabase.table('receitas').insert(receita_db).execute()
+            invalidar_indice(self._chave_indice)
             return True
         except Exception as e:
             logger.error(f"Erro ao adicionar receita: {e}")
             return False
 
+    def adicionar_receitas_em_lote(self, receitas: List[Dict],
+                                   batch_size: int = TAMANHO_LOTE_PADRAO,
+                                   upsert: bool = False) -> Dict:
+        """
+        Adiciona várias receitas com inserts de múltiplas linhas (um request HTTP por lote).
+        Com upsert=True, receitas com 'id' existente são atualizadas em vez de duplicadas.
+        """
+        def inserir(linhas: List[Dict[str, Any]]) -> None:
+            tabela = self.supabase.table('receitas')
+            if upsert:
+                tabela.upsert(linhas, on_conflict='id').execute()
+            else:
+                tabela.insert(linhas).execute()
+
+        relatorio = inserir_em_lote(receitas, inserir, batch_size)
+        if relatorio['sucesso']:
+            invalidar_indice(self._chave_indice)
+        return relatorio
+
     def verificar_estrutura(self):
         """Verifica a estrutura atual dos dados no Supabase"""
         try:
@@ -246,45 +357,60 @@ class ReceitasDB(DatabaseInterface):
         try:
             # Deleta todas as receitas usando um filtro que sempre é verdadeiro
             self.supabase.table('receitas').delete().gte('created_at', '2000-01-01').execute()
+            invalidar_indice(self._chave_indice)
             return True
         except Exception as e:
             logger.error(f"Erro ao limpar banco: {e}")
             return False
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def buscar_receitas(self, query: str = "") -> list:
-        """Busca receitas no banco de dados"""
-        try:
-            if not query:
-                data = self.supabase.table("receitas").select("*").execute()
-            else:
-                # Normaliza a query
-                query_upper = query.strip().upper()
-                
-                # Busca usando ilike para case-insensitive
+    def _carregar_receitas_indice(self) -> List[Dict]:
+        """Carrega todas as receitas para o índice em memória (propaga erros)"""
+        data = self.supabase.table('receitas').select('*').execute()
+        receitas = [ReceitaAdapter.to_chat_format(r) for r in data.data if r]
+        return [r for r in receitas if r]
+
+    def obter_indice(self) -> IndiceInvertido:
+        """Retorna o índice em memória do catálogo, construindo-o se necessário"""
+        return obter_indice(self._chave_indice, self._carregar_receitas_indice)
+
+    def _buscar_receitas_remoto(self, query: str) -> list:
+        """Busca receitas diretamente no Supabase via ilike (título, ingredientes, descrição)"""
+        if not query:
+            data = self.supabase.table("receitas").select("*").execute()
+        else:
+            # Termos da query limpa, na ordem, com qualquer texto entre eles
+            query_upper = '%'.join(query.split()).upper()
+
+            # Busca usando ilike para case-insensitive
+            data = (self.supabase.table("receitas")
+                   .select("*")
+                   .ilike("titulo", f"%{query_upper}%")
+                   .execute())
+
+            # Se não encontrou nada, tenta buscar nos ingredientes
+            if not data.data:
                 data = (self.supabase.table("receitas")
                        .select("*")
-                       .ilike("titulo", f"%{query_upper}%")
+                       .ilike("ingredientes", f"%{query_upper}%")
                        .execute())
 
-                # Se não encontrou nada, tenta buscar nos ingredientes
-                if not data.data:
-                    data = (self.supabase.table("receitas")
-                           .select("*")
-                           .ilike("ingredientes", f"%{query_upper}%")
-                           .execute())
-
-                # Se ainda não encontrou, tenta buscar na descrição
-                if not data.data:
-                    data = (self.supabase.table("receitas")
-                           .select("*")
-                           .ilike("descricao", f"%{query_upper}%")
-                           .execute())
-
-            # Converte para o formato do chat e filtra valores None
-            receitas = [ReceitaAdapter.to_chat_format(r) for r in data.data if r]
-            receitas = [r for r in receitas if r]  # Remove None values
-            
+            # Se ainda não encontrou, tenta buscar na descrição
+            if not data.data:
+                data = (self.supabase.table("receitas")
+                       .select("*")
+                       .ilike("descricao", f"%{query_upper}%")
+                       .execute())
+
+        # Converte para o formato do chat e filtra valores None
+        receitas = [ReceitaAdapter.to_chat_format(r) for r in data.data if r]
+        return [r for r in receitas if r]  # Remove None values
+
+    @timed
+    @rastreado(nome="db.buscar_receitas")
+    def buscar_receitas(self, query: str = "") -> list:
+        """Busca receitas no banco de dados"""
+        try:
+            receitas = self._buscar(query)
             logger.info(f"Encontradas {len(receitas)} receitas")
             return receitas
 
@@ -292,6 +418,80 @@ class ReceitasDB(DatabaseInterface):
             logger.error(f"Erro na busca: {e}")
             return []
 
+    @_com_retentativas
+    def _buscar(self, query: str) -> list:
+        try:
+            # Responde pelo índice em memória, sem ida ao banco
+            return self.obter_indice().buscar(query)
+        except Exception as e:
+            logger.warning(f"Índice em memória indisponível, buscando no Supabase: {e}")
+            return self._buscar_receitas_remoto(clean_search_query(query) if query else query)
+
+    @timed
+    @rastreado(nome="db.buscar_receitas_ranqueadas")
+    def buscar_receitas_ranqueadas(self, query: str, limite: int = 10) -> List[Tuple[Dict, float]]:
+        """Busca receitas por texto livre, ranqueadas por BM25 em todos os campos"""
+        try:
+            if not query:
+                return []
+
+            # Limpa e normaliza a query
+            query_limpa = clean_search_query(query)
+            logger.info(f"Ranqueando receitas com query: {query_limpa}")
+
+            resultados = self._ranquear(query_limpa, limite)
+            logger.info(f"Encontradas {len(resultados)} receitas")
+            return resultados
+
+        except Exception as e:
+            logger.error(f"Erro na busca ranqueada: {str(e)}")
+            return []
+
+    @_com_retentativas
+    def _ranquear(self, query_limpa: str, limite: int) -> List[Tuple[Dict, float]]:
+        try:
+            return self.obter_indice().ranquear(query_limpa, limite)
+        except Exception as e:
+            logger.warning(f"Índice em memória indisponível, buscando no Supabase: {e}")
+            return [(r, 0.0) for r in self._buscar_receitas_remoto(query_limpa)[:limite]]
+
+    @timed
+    @rastreado(nome="db.buscar_receitas_aproximadas")
+    def buscar_receitas_aproximadas(self, query: str, limiar: float = LIMIAR_SIMILARIDADE,
+                                    limite: int = 10) -> List[Tuple[Dict, float]]:
+        """Busca tolerante a erros de digitação por similaridade de trigramas (sem ir ao banco)"""
+        try:
+            if not query:
+                return []
+
+            resultados = self._indice_com_retentativas().aproximadas(query, limiar, limite)
+            logger.info(f"Encontradas {len(resultados)} receitas aproximadas para: {query}")
+            return resultados
+
+        except Exception as e:
+            logger.error(f"Erro na busca aproximada: {str(e)}")
+            return []
+
+    @_com_retentativas
+    def _indice_com_retentativas(self) -> IndiceInvertido:
+        return self.obter_indice()
+
+    def _buscar_titulo_remoto(self, query: str) -> List[Dict]:
+        """Busca receitas pelo título diretamente no Supabase"""
+        query_upper = '%'.join(query.split()).upper()
+
+        # Busca usando filter com operador SQL LIKE
+        data = (self.supabase.table('receitas')
+               .select('*')
+               .filter('titulo', 'like', f'%{query_upper}%')
+               .execute())
+
+        # Converte para o formato do chat
+        receitas = [ReceitaAdapter.to_chat_format(r) for r in data.data if r]
+        return [r for r in receitas if r]  # Remove None values
+
+    @timed
+    @rastreado(nome="db.buscar_receitas_por_texto")
     def buscar_receitas_por_texto(self, query: str) -> List[Dict]:
         """Busca receitas por texto livre (usado no chat)"""
         try:
@@ -299,21 +499,10 @@ class ReceitasDB(DatabaseInterface):
                 return []
             
             # Limpa e normaliza a query
-            query = clean_search_query(query)
-            logger.info(f"Buscando receitas com query: {query}")
+            query_limpa = clean_search_query(query)
+            logger.info(f"Buscando receitas com query: {query_limpa}")
             
-            # Busca usando a sintaxe correta do Supabase
-            query_upper = query.strip().upper()
-            
-            # Busca usando filter com operador SQL LIKE
-            data = (self.supabase.table('receitas')
-                   .select('*')
-                   .filter('titulo', 'like', f'%{query_upper}%')
-                   .execute())
-            
-            # Converte para o formato do chat
-            receitas = [ReceitaAdapter.to_chat_format(r) for r in data.data if r]
-            receitas = [r for r in receitas if r]  # Remove None values
+            receitas = self._buscar_por_titulo(query_limpa)
             
             logger.info(f"Encontradas {len(receitas)} receitas")
             return receitas
@@ -323,49 +512,64 @@ class ReceitasDB(DatabaseInterface):
             st.error(f"Erro ao buscar receitas: {str(e)}")
             return []
 
+    @_com_retentativas
+    def _buscar_por_titulo(self, query_limpa: str) -> List[Dict]:
+        try:
+            # Busca no título pelo índice em memória (sem acentos e sem caixa)
+            indice = self.obter_indice()
+            return [indice.receitas[rid] for rid in indice.buscar_ids(query_limpa, 'titulo')]
+        except Exception as e:
+            logger.warning(f"Índice em memória indisponível, buscando no Supabase: {e}")
+            return self._buscar_titulo_remoto(query_limpa)
+
     def _criar_resumo_receita(self, receita: Dict) -> Optional[Dict]:
         """Cria um resumo da receita com apenas as informações essenciais"""
+        return ReceitaAdapter.to_resumo(receita)
+
+    def _buscar_resumos_remoto(self, query: str, limite: int) -> List[Dict]:
+        """Busca resumos no Supabase trazendo apenas as colunas da listagem, em uma única consulta"""
+        consulta = self.supabase.table('receitas').select(COLUNAS_RESUMO)
+        termo = ''.join(c for c in query if c.isalnum() or c.isspace()).strip()
+        if termo:
+            consulta = consulta.or_(
+                f"titulo.ilike.%{termo}%,ingredientes.ilike.%{termo}%,descricao.ilike.%{termo}%"
+            )
+        data = consulta.limit(limite).execute()
+        resumos = [self._criar_resumo_receita(r) for r in data.data if r]
+        return [r for r in resumos if r]
+
+    @timed
+    @rastreado(nome="db.buscar_resumos")
+    def buscar_resumos(self, query: str, limite: int = 30) -> List[Dict]:
+        """
+        Modo de listagem: retorna apenas os resumos (formato de _criar_resumo_receita)
+        das receitas encontradas. A receita completa deve ser obtida com buscar_receita_por_id.
+        """
         try:
-            # Extrai e valida o ID
-            receita_id = receita.get('id')
-            
-            # Validação do ID
-            if not receita_id:  # Verifica se é None ou vazio
-                logger.warning("Receita sem ID encontrada")
-                return None
-            
-            # Mantém o ID no formato original
-            receita_id = str(receita_id).strip()
+            if not query:
+                return []
 
-            # Validação do título
-            titulo = str(receita.get('titulo', '')).strip().upper()
-            if not titulo:
-                logger.warning(f"Receita {receita_id} sem título encontrada")
-                return None
+            resumos = self._resumir(query, limite)
+            logger.info(f"Encontrados {len(resumos)} resumos de receitas")
+            return resumos
 
-            # Extrai os ingredientes para preview
-            ingredientes_raw = receita.get('ingredientes', '')
-            
-            if isinstance(ingredientes_raw, str):
-                ingredientes = [ing.strip() for ing in ingredientes_raw.split('\n') if ing.strip()][:3]
-                if len(ingredientes_raw.split('\n')) > 3:
-                    ingredientes.append('...')
-            else:
-                ingredientes = []
+        except Exception as e:
+            logger.error(f"Erro na busca de resumos: {str(e)}")
+            return []
 
-            resumo = {
-                'id': receita_id,
-                'titulo': titulo,
-                'descricao': str(receita.get('descricao', '')).strip(),
-                'preview_ingredientes': ingredientes
-            }
-            
-            return resumo
-            
+    @_com_retentativas
+    def _resumir(self, query: str, limite: int) -> List[Dict]:
+        try:
+            indice = self.obter_indice()
+            resultados = (indice.ranquear(clean_search_query(query), limite)
+                          or indice.aproximadas(query, limite=limite))
+            resumos = [self._criar_resumo_receita(r) for r, _score in resultados]
+            return [r for r in resumos if r]
         except Exception as e:
-            logger.error(f"Erro ao criar resumo da receita: {str(e)}")
-            return None
+            logger.warning(f"Índice em memória indisponível, buscando no Supabase: {e}")
+            return self._buscar_resumos_remoto(query, limite)
 
+    @timed
     def buscar_receita_por_id(self, receita_id: str) -> Optional[Dict]:
         """Busca uma receita específica pelo ID (UUID)"""
         try:
@@ -390,7 +594,7 @@ class ReceitasDB(DatabaseInterface):
     def buscar_receitas_cached(query: str) -> List[Dict]:
         """Versão cacheada da busca de receitas"""
         try:
-            db = ReceitasDB()
+            db = ReceitasDB.shared()
             return db.buscar_receitas(query)
         except Exception as e:
             logger.error(f"Erro na busca cacheada: {str(e)}")
@@ -410,8 +614,7 @@ class ReceitasDB(DatabaseInterface):
     def exportar_receitas_cached() -> List[Dict]:
         """Exporta todas as receitas do banco de dados com cache"""
         try:
-            # Cria uma nova instância para cada exportação
-            db = ReceitasDB()
+            db = ReceitasDB.shared()
             return db.exportar_receitas()
         except Exception as e:
             logger.error(f"Erro ao exportar receitas: {e}")
@@ -420,6 +623,51 @@ class ReceitasDB(DatabaseInterface):
 class ReceitaAdapter:
     """Adaptador para converter entre o formato rico do chat e o formato simples do banco"""
     
+    @staticmethod
+    def to_resumo(receita: Dict) -> Optional[Dict]:
+        """Converte uma receita (formato do banco ou do chat) para o resumo usado na listagem"""
+        try:
+            # Extrai e valida o ID
+            receita_id = receita.get('id')
+            
+            # Validação do ID
+            if not receita_id:  # Verifica se é None ou vazio
+                logger.warning("Receita sem ID encontrada")
+                return None
+            
+            # Mantém o ID no formato original
+            receita_id = str(receita_id).strip()
+
+            # Validação do título
+            titulo = str(receita.get('titulo', '')).strip().upper()
+            if not titulo:
+                logger.warning(f"Receita {receita_id} sem título encontrada")
+                return None
+
+            # Extrai os ingredientes para preview (string do banco ou lista do chat)
+            ingredientes_raw = receita.get('ingredientes') or ''
+            if isinstance(ingredientes_raw, str):
+                ingredientes = [ing.strip() for ing in ingredientes_raw.split('\n') if ing.strip()]
+            elif isinstance(ingredientes_raw, list):
+                ingredientes = [str(ing).strip() for ing in ingredientes_raw if str(ing).strip()]
+            else:
+                ingredientes = []
+
+            return {
+                'id': receita_id,
+                'titulo': titulo,
+                'descricao': str(receita.get('descricao') or '').strip(),
+                'preview_ingredientes': ingredientes[:LIMITE_PREVIEW_INGREDIENTES],
+                'total_ingredientes': len(ingredientes),
+                'tempo_preparo': str(receita.get('tempo_preparo') or '').strip(),
+                'porcoes': str(receita.get('porcoes') or '').strip(),
+                'dificuldade': str(receita.get('dificuldade') or '').strip()
+            }
+            
+        except Exception as e:
+            logger.error(f"Erro ao criar resumo da receita: {str(e)}")
+            return None
+    
     @staticmethod
     def to_db_format(receita_chat: Dict) -> Dict:
         """Converte do formato rico do chat para o formato do banco"""
@@ -461,7 +709,7 @@ class ReceitaAdapter:
             if isinstance(receita_chat.get('dicas'), list):
                 dicas = [str(d).strip() for d in receita_chat['dicas'] if d]
             
-            return {
+            receita_db = {
                 'titulo': titulo,
                 'descricao': str(receita_chat.get('descricao', '')).strip(),
                 'ingredientes': '\n'.join(ingredientes),
@@ -475,6 +723,12 @@ class ReceitaAdapter:
                 'beneficios_funcionais': beneficios,
                 'dicas': dicas
             }
+            
+            # Mantém o ID quando informado (chave estável para upsert)
+            if receita_chat.get('id'):
+                receita_db['id'] = str(receita_chat['id']).strip()
+            
+            return receita_db
         except Exception as e:
             logger.error(f"Erro ao converter para formato DB: {str(e)}")
             return None
@@ -1,12 +1,28 @@
+import argparse
+import hashlib
+import json
 import os
 import re
-from typing import Dict, List
-from database_supabase import ReceitasDB
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from database_interface import DatabaseInterface
+from database_supabase import TAMANHO_LOTE_PADRAO, ReceitasDB
+
+# Manifesto com hash e mtime de cada arquivo já importado
+MANIFEST_PATH = '.import_manifest.json'
+
+# Passos numerados ("1. Misture..."), pré-compilado uma única vez
+NUMBERED_STEP_RE = re.compile(r'^\d+\. ')
+
+# Quantidade de arquivos enviada a cada worker por vez
+CHUNK_SIZE = 64
 
 def parse_markdown_recipe(content: str) -> Dict:
     """Converte o conteúdo Markdown em um dicionário de receita"""
     lines = content.split('\n')
-    recipe = {
+    recipe: Dict[str, Any] = {
         'titulo': '',
         'descricao': '',
         'ingredientes': [],
@@ -56,8 +72,8 @@ def parse_markdown_recipe(content: str) -> Dict:
                 item = line[2:].strip()
                 if current_section in ['ingredientes', 'modo_preparo', 'dicas']:
                     recipe[current_section].append(item)
-            elif line.startswith('1. ') or re.match(r'^\d+\. ', line):
-                item = re.sub(r'^\d+\. ', '', line).strip()
+            elif NUMBERED_STEP_RE.match(line):
+                item = NUMBERED_STEP_RE.sub('', line, count=1).strip()
                 if current_section == 'modo_preparo':
                     recipe['modo_preparo'].append(item)
             else:
@@ -70,35 +86,167 @@ def parse_markdown_recipe(content: str) -> Dict:
     
     return recipe
 
-def import_recipes():
-    """Importa todas as receitas da pasta docs/receitas"""
-    db = ReceitasDB()
-    recipes_dir = 'docs/receitas'
+def stable_recipe_id(md_file: str) -> str:
+    """ID estável (UUID5) derivado do nome do arquivo, usado como chave de upsert"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"chef-michelle/receitas/{md_file}"))
+
+def load_manifest(manifest_path: str) -> Dict[str, Dict[str, Any]]:
+    """Carrega o manifesto de importação (hash e mtime de cada arquivo)"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest: Dict[str, Dict[str, Any]] = json.load(f)
+            return manifest
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"AVISO: manifesto ilegível ({e}), reimportando tudo")
+        return {}
+
+def save_manifest(manifest_path: str, manifest: Dict[str, Dict[str, Any]]) -> None:
+    """Grava o manifesto de forma atômica"""
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def process_file(path: str, md_file: str, previous_hash: Optional[str]) -> Dict:
+    """
+    Lê, calcula o hash e converte um arquivo Markdown (executado nos workers).
+    Só faz o parse se o conteúdo mudou em relação ao hash anterior.
+    """
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        raw = f.read()
+    content_hash = hashlib.sha256(raw).hexdigest()
+    result = {
+        'md_file': md_file,
+        'bytes': len(raw),
+        'manifest': {'mtime': stat.st_mtime, 'tamanho': stat.st_size, 'hash': content_hash,
+                     'id': stable_recipe_id(md_file)},
+        'recipe': None
+    }
+    if content_hash != previous_hash:
+        result['recipe'] = parse_markdown_recipe(raw.decode('utf-8'))
+    return result
+
+def process_chunk(chunk: List[Tuple[str, str, Optional[str]]]) -> List[Dict]:
+    """Processa um bloco de arquivos em um worker"""
+    return [process_file(path, md_file, previous_hash) for path, md_file, previous_hash in chunk]
+
+def _iter_results(candidates: List[Tuple[str, str, Optional[str]]], workers: int) -> Iterator[Dict]:
+    """Gera os resultados à medida que ficam prontos (em série ou com um pool de processos)"""
+    chunks = [candidates[i:i + CHUNK_SIZE] for i in range(0, len(candidates), CHUNK_SIZE)]
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield from process_chunk(chunk)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(process_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+def import_recipes(recipes_dir: str = 'docs/receitas', manifest_path: str = MANIFEST_PATH,
+                   db: Optional[DatabaseInterface] = None, workers: int = 1,
+                   batch_size: int = TAMANHO_LOTE_PADRAO) -> None:
+    """
+    Importa as receitas da pasta docs/receitas de forma incremental.
+    Só arquivos novos ou alterados (mtime/tamanho e, em seguida, hash do conteúdo)
+    são lidos e convertidos, em paralelo quando workers > 1; as receitas são gravadas
+    em lotes, à medida que ficam prontas, por upsert com um ID estável.
+    """
+    start_time = time.perf_counter()
+    banco = db or ReceitasDB.shared()
+    manifest = load_manifest(manifest_path)
+    
+    unchanged = 0
+    imported = 0
+    total_bytes = 0
+    seen: Set[str] = set()
+    candidates: List[Tuple[str, str, Optional[str]]] = []
     
     # Lista todos os arquivos .md
-    md_files = [f for f in os.listdir(recipes_dir) if f.endswith('.md')]
+    with os.scandir(recipes_dir) as entries:
+        md_entries = sorted((e for e in entries if e.name.endswith('.md')), key=lambda e: e.name)
     
-    print(f"Encontrados {len(md_files)} arquivos Markdown")
+    print(f"Encontrados {len(md_entries)} arquivos Markdown")
     
-    for md_file in md_files:
-        print(f"\nProcessando {md_file}...")
+    for entry in md_entries:
+        seen.add(entry.name)
+        stat = entry.stat()
+        previous = manifest.get(entry.name)
         
-        # Lê o arquivo
-        with open(os.path.join(recipes_dir, md_file), 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Mesmo mtime e tamanho: nem abre o arquivo
+        if previous and previous['mtime'] == stat.st_mtime and previous['tamanho'] == stat.st_size:
+            unchanged += 1
+            continue
+        candidates.append((entry.path, entry.name, previous['hash'] if previous else None))
+    
+    # Arquivos removidos saem do manifesto (a receita permanece no banco)
+    for md_file in set(manifest) - seen:
+        print(f"AVISO: {md_file} foi removido da pasta; a receita não foi apagada do banco")
+        del manifest[md_file]
+    
+    batch: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
+    
+    def flush() -> None:
+        """Grava o lote atual por upsert e registra no manifesto o que foi gravado"""
+        nonlocal imported
+        relatorio = banco.adicionar_receitas_em_lote([recipe for _, _, recipe in batch],
+                                                     batch_size=batch_size, upsert=True)
+        failed = {falha['indice'] for falha in relatorio['falhas']}
+        for falha in relatorio['falhas']:
+            print(f"✗ Erro ao adicionar receita '{falha['titulo']}': {falha['erro']}")
+        # Só registra no manifesto o que foi gravado (falhas são tentadas de novo)
+        for indice, (md_file, entry_manifest, _) in enumerate(batch):
+            if indice not in failed:
+                manifest[md_file] = entry_manifest
+        imported += relatorio['sucesso']
+        batch.clear()
+    
+    for result in _iter_results(candidates, workers):
+        md_file = result['md_file']
+        total_bytes += result['bytes']
+        recipe = result['recipe']
         
-        # Converte para o formato de receita
-        recipe = parse_markdown_recipe(content)
+        # Só o mtime mudou: atualiza o manifesto sem reimportar
+        if recipe is None:
+            manifest[md_file] = result['manifest']
+            unchanged += 1
+            continue
         
         if not recipe['titulo']:
+            # Registra o hash para não reprocessar o arquivo até que ele mude
             print(f"AVISO: Receita sem título em {md_file}")
+            manifest[md_file] = result['manifest']
             continue
         
-        # Adiciona ao banco
-        if db.adicionar_receita(recipe):
-            print(f"✓ Receita '{recipe['titulo']}' adicionada com sucesso")
-        else:
-            print(f"✗ Erro ao adicionar receita '{recipe['titulo']}'")
+        print(f"Processado {md_file}")
+        recipe['id'] = result['manifest']['id']
+        batch.append((md_file, result['manifest'], recipe))
+        if len(batch) >= batch_size:
+            flush()
+    
+    if batch:
+        flush()
+    
+    save_manifest(manifest_path, manifest)
+    
+    elapsed = max(time.perf_counter() - start_time, 1e-9)
+    print(f"\n✓ {imported} receitas importadas/atualizadas; "
+          f"{unchanged} arquivos sem alterações ignorados")
+    print(f"Throughput: {len(md_entries)} arquivos em {elapsed:.2f}s "
+          f"({len(md_entries) / elapsed:.1f} arquivos/s, "
+          f"{total_bytes / (1024 * 1024) / elapsed:.2f} MB/s lidos, {workers} workers)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importa receitas em Markdown para o banco")
+    parser.add_argument('--dir', default='docs/receitas', help="Pasta com os arquivos .md")
+    parser.add_argument('--manifest', default=MANIFEST_PATH, help="Caminho do manifesto de importação")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processos usados no parse (1 = em série)")
+    args = parser.parse_args()
+    import_recipes(args.dir, args.manifest, workers=args.workers)
 
 if __name__ == '__main__':
-    import_recipes() 
\ No newline at end of file
+    main()
\ No newline at end of file
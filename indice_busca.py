@@ -0,0 +1,304 @@
+import bisect
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from normalizacao import STOP_WORDS, dobrar, normalizar_consulta, tokenizar
+
+logger = logging.getLogger(__name__)
+
+_RE_PALAVRA = re.compile(r'\w+')
+
+# Campos consultados pela busca simples, na ordem de prioridade
+CAMPOS_INDEXADOS = ('titulo', 'ingredientes', 'descricao')
+
+# Pesos por campo usados no ranqueamento BM25
+PESOS_CAMPOS = {
+    'titulo': 3.0,
+    'ingredientes': 2.0,
+    'descricao': 1.0,
+    'dicas': 0.5,
+    'harmonizacao': 0.5
+}
+
+# Parâmetros clássicos do BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Tempo de vida do índice em memória (segundos), igual ao cache das buscas
+TTL_INDICE = 3600
+
+# Similaridade mínima (0 a 1) para a busca aproximada, mesmo padrão do pg_trgm
+LIMIAR_SIMILARIDADE = 0.3
+
+
+def _texto_campo(valor: Any) -> str:
+    """Converte o valor de um campo (string ou lista) em texto corrido"""
+    if isinstance(valor, list):
+        return '\n'.join(str(v) for v in valor if v)
+    return str(valor or '')
+
+
+class IndiceInvertido:
+    """Índice invertido em memória: token -> campo -> ids das receitas (com frequências)"""
+
+    def __init__(self, receitas: List[Dict]):
+        self.receitas: Dict[str, Dict] = {}
+        self._ordem: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._tamanhos: Dict[str, Dict[str, int]] = {campo: {} for campo in PESOS_CAMPOS}
+
+        for receita in receitas:
+            if not receita or not receita.get('id'):
+                continue
+            receita_id = str(receita['id'])
+            self.receitas[receita_id] = receita
+            self._ordem.setdefault(receita_id, len(self._ordem))
+            for campo in PESOS_CAMPOS:
+                tokens = tokenizar(_texto_campo(receita.get(campo)))
+                self._tamanhos[campo][receita_id] = len(tokens)
+                for token in tokens:
+                    frequencias = self._postings.setdefault(token, {}).setdefault(campo, {})
+                    frequencias[receita_id] = frequencias.get(receita_id, 0) + 1
+
+        # Vocabulário ordenado para busca por prefixo com bisect
+        self._vocabulario = sorted(self._postings)
+
+        # Índice de trigramas, construído sob demanda na primeira busca aproximada
+        self._trigramas: Optional['IndiceTrigramas'] = None
+        self._lock_trigramas = threading.Lock()
+
+        # Tamanho médio de cada campo, usado na normalização do BM25
+        self._tamanho_medio = {
+            campo: (sum(tamanhos.values()) / len(tamanhos)) if tamanhos else 0.0
+            for campo, tamanhos in self._tamanhos.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.receitas)
+
+    def _tokens_por_prefixo(self, prefixo: str) -> List[str]:
+        """Retorna os tokens do vocabulário iniciados pelo prefixo"""
+        inicio = bisect.bisect_left(self._vocabulario, prefixo)
+        tokens = []
+        for token in self._vocabulario[inicio:]:
+            if not token.startswith(prefixo):
+                break
+            tokens.append(token)
+        return tokens
+
+    def _ids_por_prefixo(self, prefixo: str, campo: str) -> Set[str]:
+        """Retorna os ids cujo campo contém algum token iniciado pelo prefixo"""
+        ids: Set[str] = set()
+        for token in self._tokens_por_prefixo(prefixo):
+            ids.update(self._postings[token].get(campo, {}))
+        return ids
+
+    def buscar_ids(self, query: str, campo: str) -> List[str]:
+        """Retorna os ids cujo campo contém todos os termos da query"""
+        termos = normalizar_consulta(query)
+        if not termos:
+            return []
+
+        resultado = self._ids_por_prefixo(termos[0], campo)
+        for termo in termos[1:]:
+            if not resultado:
+                break
+            resultado &= self._ids_por_prefixo(termo, campo)
+        if not resultado:
+            return []
+
+        # Mantém a ordem de carga das receitas
+        return sorted(resultado, key=self._ordem.__getitem__)
+
+    def buscar(self, query: str = "") -> List[Dict]:
+        """
+        Busca receitas no índice.
+        Consulta título, depois ingredientes, depois descrição, parando no
+        primeiro campo com resultados (mesma semântica das buscas via ilike).
+        """
+        if not query or not query.strip():
+            return list(self.receitas.values())
+
+        for campo in CAMPOS_INDEXADOS:
+            ids = self.buscar_ids(query, campo)
+            if ids:
+                return [self.receitas[rid] for rid in ids]
+        return []
+
+    def _idf(self, token: str) -> float:
+        """IDF do BM25, considerando a presença do token em qualquer campo"""
+        documentos: Set[str] = set()
+        for frequencias in self._postings[token].values():
+            documentos.update(frequencias)
+        total = len(self.receitas)
+        df = len(documentos)
+        return math.log(1 + (total - df + 0.5) / (df + 0.5))
+
+    def ranquear(self, query: str, limite: int = 10) -> List[Tuple[Dict, float]]:
+        """
+        Ranqueia as receitas pela query usando BM25 com pesos por campo.
+        Retorna as `limite` melhores como (receita, score), em ordem decrescente.
+        """
+        termos = normalizar_consulta(query)
+        if not termos or limite <= 0:
+            return []
+
+        scores: Dict[str, float] = {}
+        for termo in dict.fromkeys(termos):
+            for token in self._tokens_por_prefixo(termo):
+                idf = self._idf(token)
+                for campo, frequencias in self._postings[token].items():
+                    peso = PESOS_CAMPOS[campo]
+                    media = self._tamanho_medio[campo] or 1.0
+                    tamanhos = self._tamanhos[campo]
+                    for receita_id, tf in frequencias.items():
+                        norma = BM25_K1 * (1 - BM25_B + BM25_B * tamanhos[receita_id] / media)
+                        parcial = peso * idf * tf * (BM25_K1 + 1) / (tf + norma)
+                        scores[receita_id] = scores.get(receita_id, 0.0) + parcial
+
+        # Top-k via heap, sem ordenar todos os candidatos
+        melhores = heapq.nlargest(
+            limite, scores.items(),
+            key=lambda item: (item[1], -self._ordem[item[0]])
+        )
+        return [(self.receitas[rid], score) for rid, score in melhores]
+
+    def aproximadas(self, query: str, limiar: float = LIMIAR_SIMILARIDADE,
+                    limite: int = 10) -> List[Tuple[Dict, float]]:
+        """Busca tolerante a erros de digitação, ranqueada por similaridade de trigramas"""
+        indice_trigramas = self._trigramas
+        if indice_trigramas is None:
+            # Várias sessões podem chegar juntas: só uma constrói o índice de trigramas
+            with self._lock_trigramas:
+                if self._trigramas is None:
+                    self._trigramas = IndiceTrigramas(self.receitas.values())
+                indice_trigramas = self._trigramas
+        return [
+            (self.receitas[rid], score)
+            for rid, score in indice_trigramas.buscar(query, limiar, limite)
+        ]
+
+
+def trigramas(palavra: str) -> Set[str]:
+    """Trigramas de uma palavra, com o mesmo preenchimento usado pelo pg_trgm"""
+    texto = f"  {palavra} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceTrigramas:
+    """Índice de trigramas sobre as palavras dos títulos e das linhas de ingredientes"""
+
+    def __init__(self, receitas: Iterable[Dict]) -> None:
+        self._ids_por_palavra: Dict[str, Set[str]] = {}
+        self._trigramas_por_palavra: Dict[str, Set[str]] = {}
+        self._palavras_por_trigrama: Dict[str, Set[str]] = {}
+        self._ordem: Dict[str, int] = {}
+
+        for receita in receitas:
+            receita_id = str(receita['id'])
+            self._ordem.setdefault(receita_id, len(self._ordem))
+            linhas = [str(receita.get('titulo') or '')]
+            ingredientes = receita.get('ingredientes') or []
+            if isinstance(ingredientes, str):
+                ingredientes = ingredientes.split('\n')
+            linhas.extend(str(ing) for ing in ingredientes)
+
+            for linha in linhas:
+                for palavra in _RE_PALAVRA.findall(dobrar(linha)):
+                    if len(palavra) < 3 or palavra.isdigit():
+                        continue
+                    self._ids_por_palavra.setdefault(palavra, set()).add(receita_id)
+
+        for palavra in self._ids_por_palavra:
+            grams = trigramas(palavra)
+            self._trigramas_por_palavra[palavra] = grams
+            for gram in grams:
+                self._palavras_por_trigrama.setdefault(gram, set()).add(palavra)
+
+    def palavras_similares(self, palavra: str, limiar: float) -> Dict[str, float]:
+        """Retorna as palavras do vocabulário com similaridade >= limiar"""
+        grams = trigramas(palavra)
+        compartilhados: Dict[str, int] = {}
+        for gram in grams:
+            for candidata in self._palavras_por_trigrama.get(gram, ()):
+                compartilhados[candidata] = compartilhados.get(candidata, 0) + 1
+
+        similares = {}
+        for candidata, comum in compartilhados.items():
+            total = len(grams) + len(self._trigramas_por_palavra[candidata]) - comum
+            similaridade = comum / total
+            if similaridade >= limiar:
+                similares[candidata] = similaridade
+        return similares
+
+    def buscar(self, query: str, limiar: float = LIMIAR_SIMILARIDADE,
+               limite: int = 10) -> List[Tuple[str, float]]:
+        """
+        Retorna (id, score) das receitas mais parecidas com a query.
+        O score é a média, entre as palavras da query, da melhor similaridade
+        encontrada em cada receita.
+        """
+        palavras = [
+            p for p in _RE_PALAVRA.findall(dobrar(query))
+            if len(p) >= 3 and p not in STOP_WORDS
+        ]
+        if not palavras or limite <= 0:
+            return []
+
+        melhores_por_receita: Dict[str, List[float]] = {}
+        for posicao, palavra in enumerate(palavras):
+            for similar, similaridade in self.palavras_similares(palavra, limiar).items():
+                for receita_id in self._ids_por_palavra[similar]:
+                    notas = melhores_por_receita.setdefault(receita_id, [0.0] * len(palavras))
+                    notas[posicao] = max(notas[posicao], similaridade)
+
+        scores = {
+            receita_id: sum(notas) / len(notas)
+            for receita_id, notas in melhores_por_receita.items()
+        }
+        candidatos = [(rid, score) for rid, score in scores.items() if score >= limiar]
+        return heapq.nlargest(limite, candidatos,
+                              key=lambda item: (item[1], -self._ordem[item[0]]))
+
+
+class _EntradaIndice:
+    def __init__(self, indice: IndiceInvertido):
+        self.indice = indice
+        self.criado_em = time.monotonic()
+
+
+_indices: Dict[str, _EntradaIndice] = {}
+_lock_indices = threading.Lock()
+
+
+def obter_indice(chave: str, carregar: Callable[[], List[Dict]],
+                 ttl: float = TTL_INDICE) -> IndiceInvertido:
+    """
+    Retorna o índice da chave informada, construindo-o com `carregar` se ainda
+    não existir ou se tiver expirado. O índice fica quente durante todo o processo.
+    """
+    with _lock_indices:
+        entrada = _indices.get(chave)
+        if entrada and time.monotonic() - entrada.criado_em < ttl:
+            return entrada.indice
+
+        inicio = time.perf_counter()
+        indice = IndiceInvertido(carregar())
+        _indices[chave] = _EntradaIndice(indice)
+        logger.info(f"Índice de busca construído com {len(indice)} receitas "
+                    f"em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        return indice
+
+
+def invalidar_indice(chave: Optional[str] = None) -> None:
+    """Descarta o índice da chave (ou todos), forçando reconstrução na próxima busca"""
+    with _lock_indices:
+        if chave is None:
+            _indices.clear()
+        else:
+            _indices.pop(chave, None)
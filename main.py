@@ -1,15 +1,28 @@
 import streamlit as st
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
-from database_supabase import ReceitasDB, SupabaseDB
+from database_supabase import ReceitaAdapter, ReceitasDB, SupabaseDB, clean_search_query
 from database_interface import DatabaseInterface
+from cliente_openai import MAX_GERACOES_SIMULTANEAS, ClienteOpenAI
+from cache_respostas import CacheRespostas, gerar_chave
+from cache_semantico import LIMIAR_PADRAO as LIMIAR_SEMANTICO_PADRAO, CacheSemantico, criar_embedder
+from receita_estruturada import (INSTRUCAO_JSON, RESPONSE_FORMAT_RECEITA, ParserReceitaIncremental,
+                                 ReceitaInvalida)
+from coalescencia import SingleFlight
+from metricas import (REGISTRO, habilitar_metricas, iniciar_servidor_metricas, metricas_habilitadas,
+                      resumo_funcoes, timed)
+from rastreamento import configurar_rastreamento, rastreado, rastreamento_ativo, span, span_atual
+from perfilamento import DIRETORIO_PADRAO as PROFILING_DIR_DEFAULT, MODOS as PROFILING_MODES, PerfilExecucao
+from normalizacao import normalizar_consulta
+from orcamento_tokens import (ajustar_historico, compactar_prompt, contar_tokens,
+                              contar_tokens_mensagens, registrar_uso)
+import hmac
+from http.server import ThreadingHTTPServer
 import json
 from datetime import datetime
-import httpx
-from typing import List, Dict, Optional
-from abc import ABC, abstractmethod
+from typing import Callable, Iterator, List, Dict, Optional
 import logging
+import time
 
 # Configurar logging
 logging.basicConfig(level=logging.ERROR)
@@ -27,28 +40,28 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-class DatabaseInterface(ABC):
-    @abstractmethod
-    def buscar_receitas(self, query: str) -> List[Dict]:
-        pass
-    
-    @abstractmethod
-    def adicionar_receita(self, receita: Dict) -> bool:
-        pass
+def secret_flag(nome: str, padrao: bool = False) -> bool:
+    """Lê uma flag dos secrets: booleano do TOML ou texto ("1", "true", "sim", "yes")"""
+    valor = st.secrets.get(nome, padrao)
+    if isinstance(valor, str):
+        return valor.strip().lower() in ("1", "true", "sim", "yes")
+    return bool(valor)
+
+@st.cache_resource
+def get_openai_client() -> ClienteOpenAI:
+    """Cliente OpenAI compartilhado pelo processo (pool de conexões e limite de gerações simultâneas)"""
+    return ClienteOpenAI(
+        api_key=st.secrets["OPENAI_API_KEY"],
+        # Endpoint compatível com a OpenAI (ex.: python -m benchmarks.mock_openai para testes offline)
+        base_url=st.secrets.get("OPENAI_BASE_URL") or os.getenv("OPENAI_BASE_URL"),
+        max_simultaneas=int(st.secrets.get("OPENAI_MAX_CONCURRENCY", MAX_GERACOES_SIMULTANEAS)),
+        http2=secret_flag("OPENAI_HTTP2", True)
+    )
 
-def init_openai_client() -> Optional[OpenAI]:
-    """Inicializa o cliente OpenAI com configuração HTTP personalizada"""
+def init_openai_client() -> Optional[ClienteOpenAI]:
+    """Inicializa (uma única vez por processo) o cliente OpenAI"""
     try:
-        http_client = httpx.Client(
-            base_url="https://api.openai.com/v1",
-            follow_redirects=True,
-            timeout=60.0
-        )
-        
-        return OpenAI(
-            api_key=st.secrets["OPENAI_API_KEY"],
-            http_client=http_client
-        )
+        return get_openai_client()
     except Exception as e:
         st.error(f"Erro ao inicializar OpenAI: {str(e)}")
         return None
@@ -141,15 +154,16 @@ def format_recipe(recipe: Dict) -> str:
     texto += "---\n"
     return texto
 
-def render_recipe_preview(receita: dict):
-    """Renderiza uma prévia da receita"""
+@timed
+def render_recipe_preview(receita: dict, db: Optional[DatabaseInterface] = None, key_prefix: str = "btn"):
+    """Renderiza uma prévia da receita (key_prefix separa os botões do chat e da busca na mesma página)"""
     
     if not receita.get('id'):
         st.warning("Receita sem ID")
         return
         
-    # Instancia o banco de dados
-    db = ReceitasDB()
+    # Reaproveita o banco compartilhado pelo processo
+    db = db or get_database()
         
     col1, col2 = st.columns([3,1])
     
@@ -159,17 +173,23 @@ def render_recipe_preview(receita: dict):
             st.markdown(f"_{receita['descricao']}_")
             
         st.markdown("### 📝 Ingredientes")
-        # Trata ingredientes como string ou lista
-        ingredientes = receita['ingredientes']
-        if isinstance(ingredientes, str):
-            ingredientes = ingredientes.split('\n')
-        elif isinstance(ingredientes, list):
-            ingredientes = [ing.strip() for ing in ingredientes if ing.strip()]
+        if 'preview_ingredientes' in receita:
+            # Resumo da listagem: já traz só os primeiros ingredientes e o total
+            ingredientes = receita['preview_ingredientes']
+            total_ingredientes = receita.get('total_ingredientes', len(ingredientes))
+        else:
+            # Trata ingredientes como string ou lista
+            ingredientes = receita['ingredientes']
+            if isinstance(ingredientes, str):
+                ingredientes = ingredientes.split('\n')
+            elif isinstance(ingredientes, list):
+                ingredientes = [ing.strip() for ing in ingredientes if ing.strip()]
+            total_ingredientes = len(ingredientes)
             
         for i, ing in enumerate(ingredientes[:5]):
             st.markdown(f"• {ing}")
-        if len(ingredientes) > 5:
-            st.markdown(f"_...e mais {len(ingredientes)-5} ingredientes_")
+        if total_ingredientes > 5:
+            st.markdown(f"_...e mais {total_ingredientes-5} ingredientes_")
             
         if receita.get('tempo_preparo'):
             st.markdown(f"⏱️ **Tempo de Preparo**: {receita['tempo_preparo']}")
@@ -179,7 +199,7 @@ def render_recipe_preview(receita: dict):
             st.markdown(f"📊 **Dificuldade**: {receita['dificuldade']}")
             
     with col2:
-        if st.button("Ver receita completa", key=f"btn_{receita['id']}"):
+        if st.button("Ver receita completa", key=f"{key_prefix}_{receita['id']}"):
             try:
                 receita_completa = db.buscar_receita_por_id(receita['id'])
                 if receita_completa:
@@ -242,17 +262,18 @@ def search_recipes():
     query = st.text_input("Digite sua busca:")
     
     if query:
-        # Cria uma nova instância do ReceitasDB
-        db = ReceitasDB()
-        receitas = db.buscar_receitas(query)
+        # Reaproveita o banco compartilhado pelo processo
+        db = get_database()
+        receitas = coalesced_search(db, "buscar_receitas", query)
         if receitas:
             st.write(f"Encontradas {len(receitas)} receitas:")
             for receita in receitas:
-                render_recipe_preview(receita)
+                render_recipe_preview(receita, db)
                 st.divider()
         else:
             st.info("Nenhuma receita encontrada. Que tal me perguntar diretamente? Posso criar uma receita especialmente para você!")
 
+@timed
 def render_recipe_card(recipe: Dict) -> None:
     """Renderiza uma receita completa em formato de card"""
     try:
@@ -345,6 +366,8 @@ def export_history():
         mime="text/markdown"
     )
 
+@timed
+@rastreado(nome="render.historico")
 def render_message_history():
     """Renderiza o histórico de mensagens"""
     for message in st.session_state.messages:
@@ -404,65 +427,53 @@ def classify_message(text: str) -> str:
     # Padrão: assume que é uma busca por receita
     return "recipe_search"
 
-def gerar_receita(client: OpenAI, prompt: str) -> Optional[Dict]:
-    """Gera uma nova receita usando a API da OpenAI"""
-    try:
-        # Prepara o contexto para a IA
-        messages = prepare_ai_context(prompt)
-        
-        # Faz a chamada à API
-        response = call_openai_api(client, messages)
-        
+# Tentativas de geração estruturada (a leitura é interrompida na primeira violação do schema)
+STRUCTURED_MAX_ATTEMPTS = 2
+
+@timed
+@rastreado(nome="llm.receita_estruturada")
+def gerar_receita(client: ClienteOpenAI, messages: List[Dict],
+                  on_event: Optional[Callable[[str, str], None]] = None) -> Optional[Dict]:
+    """
+    Gera uma nova receita com saída estruturada (JSON schema), lendo o stream de forma
+    incremental: on_event recebe cada campo/item assim que chega, e uma resposta fora
+    do schema é abandonada imediatamente em vez de esperar a geração inteira
+    """
+    # O contexto já preparado (prepare_ai_context) recebe a instrução do formato JSON
+    messages = messages[:-1] + [{"role": "system", "content": INSTRUCAO_JSON}, messages[-1]]
+    
+    for tentativa in range(1, STRUCTURED_MAX_ATTEMPTS + 1):
+        span_atual().set_attribute("llm.tentativas", tentativa)
+        parser = ParserReceitaIncremental()
+        stream = None
         try:
-            # Limpa a resposta da API
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]  # Remove ```json
-            if response.endswith("```"):
-                response = response[:-3]  # Remove ```
-            response = response.strip()
-            
-            # Converte a resposta para dict
-            receita_dict = json.loads(response)
-            
-            # Valida campos obrigatórios
-            campos_obrigatorios = ['titulo', 'ingredientes', 'modo_preparo']
-            campos_faltantes = [campo for campo in campos_obrigatorios if campo not in receita_dict]
-            
-            if campos_faltantes:
-                logger.error(f"Receita gerada não contém os campos obrigatórios: {', '.join(campos_faltantes)}")
-                logger.error(f"Resposta da API: {response}")
-                return None
-                
-            # Valida tipos de dados
-            if not isinstance(receita_dict['ingredientes'], list):
-                logger.error("Campo 'ingredientes' não é uma lista")
-                return None
-                
-            if not isinstance(receita_dict['modo_preparo'], list):
-                logger.error("Campo 'modo_preparo' não é uma lista")
-                return None
-                
-            # Valida conteúdo mínimo
-            if not receita_dict['ingredientes']:
-                logger.error("Lista de ingredientes está vazia")
-                return None
-                
-            if not receita_dict['modo_preparo']:
-                logger.error("Modo de preparo está vazio")
-                return None
-                
-            return receita_dict
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Erro ao decodificar resposta da API: {str(e)}")
-            logger.error(f"Resposta da API: {response}")
+            stream = client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                stream=True,
+                response_format=RESPONSE_FORMAT_RECEITA,
+                **completion_params(messages)
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    for campo, valor in parser.alimentar(chunk.choices[0].delta.content):
+                        if on_event:
+                            on_event(campo, valor)
+            return parser.finalizar()
+        
+        except ReceitaInvalida as e:
+            logger.error(f"Receita gerada fora do schema (tentativa {tentativa}): {str(e)}")
+        except Exception as e:
+            logger.error(f"Erro ao gerar receita: {str(e)}")
             return None
-            
-    except Exception as e:
-        logger.error(f"Erro ao gerar receita: {str(e)}")
-        return None
+        finally:
+            # Interrompe o stream abandonado (libera a conexão e a vaga de geração)
+            if stream is not None and hasattr(stream, "close"):
+                stream.close()
+    return None
 
+@timed
+@rastreado(nome="chat.turno")
 def process_user_input(client, db):
     """Processa a entrada do usuário e retorna uma resposta"""
     try:
@@ -471,14 +482,18 @@ def process_user_input(client, db):
         if not prompt:
             return
             
-        # Limpa o input após processar
+        # Limpa o input após processar (e a oferta de criar a receita do pedido anterior)
         st.session_state.user_input = ""
+        st.session_state.pop("recipe_request", None)
         
-        # Adiciona a mensagem do usuário ao histórico
+        # Adiciona a mensagem do usuário ao histórico (guardando a conversa anterior para a IA)
+        history = list(st.session_state.messages)
         st.session_state.messages.append({"role": "user", "content": prompt})
         
         # Classifica o tipo de mensagem
-        msg_type = classify_message(prompt)
+        with span("classificar"):
+            msg_type = classify_message(prompt)
+        span_atual().set_attribute("mensagem.tipo", msg_type)
         
         if msg_type == "greeting":
             st.session_state.messages.append({
@@ -506,19 +521,36 @@ Basta me dizer o que você precisa! 🌟"""
         # Extrai termos de busca
         termos_busca = extract_search_terms(prompt)
         
-        # Busca receitas relacionadas
-        receitas = db.buscar_receitas_por_texto(termos_busca)
+        # Busca receitas relacionadas, ranqueadas por relevância
+        with span("busca") as etapa:
+            resultados = coalesced_search(db, "buscar_receitas_ranqueadas", termos_busca)
+            receitas = [receita for receita, _score in resultados]
+            
+            # Sem resultado exato, tenta a busca tolerante a erros de digitação antes da IA
+            aproximadas = False
+            if not receitas:
+                resultados = coalesced_search(db, "buscar_receitas_aproximadas", termos_busca)
+                receitas = [receita for receita, _score in resultados]
+                aproximadas = bool(receitas)
+            etapa.set_attributes({"busca.termos": termos_busca, "busca.resultados": len(receitas),
+                                  "busca.aproximada": aproximadas})
         
         if receitas:
             # Encontrou receitas - mostra os resultados
+            if aproximadas:
+                conteudo = f"Não achei exatamente \"{termos_busca}\", mas encontrei {len(receitas)} {'receita parecida' if len(receitas) == 1 else 'receitas parecidas'}! 🔎"
+            else:
+                conteudo = f"Encontrei {len(receitas)} {'receita' if len(receitas) == 1 else 'receitas'} que podem te ajudar! 🎉"
             st.session_state.messages.append({
                 "role": "assistant",
-                "content": f"Encontrei {len(receitas)} {'receita' if len(receitas) == 1 else 'receitas'} que podem te ajudar! 🎉"
+                "content": conteudo
             })
             
             # Renderiza cada receita encontrada
-            for receita in receitas:
-                render_recipe_preview(receita)
+            with span("render") as etapa:
+                etapa.set_attribute("render.receitas", len(receitas))
+                for receita in receitas:
+                    render_recipe_preview(receita, db, key_prefix="chat")
                 
         else:
             # Não encontrou receitas - gera uma nova
@@ -527,30 +559,64 @@ Basta me dizer o que você precisa! 🌟"""
                 "content": "Não encontrei nenhuma receita com esses ingredientes, mas posso criar uma nova receita para você! 👩‍🍳 Aguarde um momento..."
             })
             
-            # Faz a chamada à API
-            response = call_openai_api(client, prepare_ai_context(prompt))
+            # Perguntas repetidas são respondidas pelo cache; senão, faz a chamada
+            # à API em streaming, exibindo os tokens à medida que chegam
+            with span("busca.contexto") as etapa:
+                context_recipes = retrieve_context_recipes(db, prompt)
+                etapa.set_attribute("busca.resultados", len(context_recipes))
+            messages = prepare_ai_context(prompt, context_recipes, history)
+            response = call_openai_api(client, messages, render=render_streaming_response)
             
-            # Adiciona a resposta ao histórico
+            # Adiciona a resposta completa ao histórico
             st.session_state.messages.append({
                 "role": "assistant",
                 "content": response
             })
+            
+            # A receita estruturada só é gerada se o usuário pedir (botão abaixo do chat)
+            st.session_state.recipe_request = messages
                 
     except Exception as e:
         st.error(f"Erro ao processar mensagem: {str(e)}")
         logger.error(f"Erro ao processar mensagem: {str(e)}")
 
-def generate_new_recipe(client: OpenAI, prompt: str, db: DatabaseInterface) -> str:
-    """Gera uma nova receita usando a API da OpenAI"""
+def make_recipe_event_renderer(container) -> Callable[[str, str], None]:
+    """Cria o callback que exibe título, ingredientes e passos da receita à medida que chegam"""
+    with container:
+        with st.chat_message("assistant"):
+            titulo_box = st.empty()
+            ingredientes_box = st.empty()
+            preparo_box = st.empty()
+    itens = {'ingredientes': [], 'modo_preparo': []}
+    
+    def on_event(campo: str, valor: str) -> None:
+        if campo == 'titulo':
+            titulo_box.markdown(f"### ✨ {valor} ✨")
+        elif campo == 'ingredientes':
+            itens[campo].append(valor)
+            ingredientes_box.markdown("📝 **Ingredientes:**\n" + "\n".join(f"- {i}" for i in itens[campo]))
+        elif campo == 'modo_preparo':
+            itens[campo].append(valor)
+            preparo_box.markdown("👩‍🍳 **Modo de Preparo:**\n" + "\n".join(
+                f"{n}. {passo}" for n, passo in enumerate(itens[campo], 1)))
+    
+    return on_event
+
+def generate_new_recipe(client: ClienteOpenAI, messages: List[Dict]) -> str:
+    """
+    Gera uma nova receita estruturada, exibindo-a enquanto é gerada. A receita fica na
+    sessão (generated_recipe) e só vai para o catálogo se o usuário pedir (save_generated_recipe)
+    """
     try:
-        messages = prepare_ai_context(prompt)
-        response = call_openai_api(client, messages)
+        placeholder = st.empty()
+        receita_dict = gerar_receita(client, messages, on_event=make_recipe_event_renderer(placeholder.container()))
+        # A resposta final é exibida pelo histórico; remove a prévia para não duplicar
+        placeholder.empty()
+        if receita_dict is None:
+            return "Desculpe, não consegui gerar a receita agora. Pode tentar novamente?"
         
         try:
-            # Converte a resposta para dict para salvar no banco
-            receita_dict = json.loads(response)
-            if db.adicionar_receita(receita_dict):
-                st.success("Receita salva no banco de dados!")
+            st.session_state.generated_recipe = receita_dict
             
             # Formata a resposta em linguagem natural
             resposta = "Criei uma receita especial para você!\n\n"
@@ -586,17 +652,91 @@ def generate_new_recipe(client: OpenAI, prompt: str, db: DatabaseInterface) -> s
             
             return resposta
             
-        except json.JSONDecodeError:
-            st.error("Não foi possível salvar a receita no banco de dados.")
-            # Retorna a resposta em formato natural mesmo se falhar ao salvar
-            return "Desculpe, tive um problema ao salvar a receita, mas aqui está ela em formato texto:\n\n" + response
+        except Exception as e:
+            logger.error(f"Erro ao formatar a receita gerada: {str(e)}")
+            return "Desculpe, tive um problema ao formatar a receita, mas aqui está ela:\n\n" + json.dumps(receita_dict, ensure_ascii=False, indent=2)
             
     except Exception as e:
         return f"Desculpe, ocorreu um erro ao gerar a receita: {str(e)}"
 
-def prepare_ai_context(prompt: str) -> List[Dict]:
-    """Prepara o contexto para a chamada da IA"""
-    context = """Você é a Chef Michelle Mística, uma renomada chef especializada em gastronomia funcional com formação em nutrição funcional e fitoterapia. Sua abordagem única combina:
+def create_recipe_callback(client: ClienteOpenAI) -> None:
+    """on_click de "Criar receita completa": gera a receita estruturada do último pedido sem resultado"""
+    messages = st.session_state.pop("recipe_request", None)
+    if not messages:
+        return
+    st.session_state.messages.append({"role": "assistant", "content": generate_new_recipe(client, messages)})
+
+def save_generated_recipe(db: DatabaseInterface) -> None:
+    """on_click de "Salvar no catálogo": grava a receita gerada, só com a confirmação do usuário"""
+    receita_dict = st.session_state.pop("generated_recipe", None)
+    if not receita_dict:
+        return
+    if db.adicionar_receita(receita_dict):
+        st.success("Receita salva no banco de dados!")
+    else:
+        st.error("Não foi possível salvar a receita no banco de dados.")
+
+# Recuperação de receitas do catálogo para fundamentar a resposta da IA (RAG)
+RAG_TOP_K = 3
+RAG_SIMILARITY_THRESHOLD = 0.2
+RAG_TOKEN_BUDGET = 600
+RAG_MAX_DESCRIPTION_CHARS = 160
+CATALOG_CONTEXT_HEADER = "RECEITAS DO CATÁLOGO DA CHEF MICHELLE"
+
+def retrieve_context_recipes(db: DatabaseInterface, prompt: str, limite: int = RAG_TOP_K) -> List[Dict]:
+    """Busca no índice local as receitas mais relevantes para o pedido, já resumidas"""
+    try:
+        termos_busca = extract_search_terms(prompt)
+        resultados = coalesced_search(db, "buscar_receitas_ranqueadas", termos_busca, limite)
+        if not resultados:
+            resultados = coalesced_search(
+                db, "buscar_receitas_aproximadas", termos_busca, RAG_SIMILARITY_THRESHOLD, limite
+            )
+        resumos = [ReceitaAdapter.to_resumo(receita) for receita, _score in resultados]
+        return [r for r in resumos if r]
+    except Exception as e:
+        logger.error(f"Erro ao recuperar receitas para o contexto: {str(e)}")
+        return []
+
+def format_recipe_summary(resumo: Dict) -> str:
+    """Formata o resumo de uma receita em uma linha compacta para o contexto da IA"""
+    detalhes = ', '.join(v for v in (resumo.get('tempo_preparo'), resumo.get('porcoes'),
+                                     resumo.get('dificuldade')) if v)
+    linha = f"- {resumo['titulo']}" + (f" ({detalhes})" if detalhes else "")
+    descricao = resumo.get('descricao', '')
+    if len(descricao) > RAG_MAX_DESCRIPTION_CHARS:
+        descricao = descricao[:RAG_MAX_DESCRIPTION_CHARS].rsplit(' ', 1)[0] + "..."
+    if descricao:
+        linha += f": {descricao}"
+    ingredientes = resumo.get('preview_ingredientes') or []
+    if ingredientes:
+        restantes = resumo.get('total_ingredientes', len(ingredientes)) - len(ingredientes)
+        linha += f" Ingredientes: {'; '.join(ingredientes)}" + (f" (+{restantes})" if restantes > 0 else "")
+    return linha
+
+def build_catalog_context(resumos: List[Dict], token_budget: int = RAG_TOKEN_BUDGET) -> str:
+    """Monta o bloco de receitas do catálogo, parando antes de estourar o orçamento de tokens"""
+    if not resumos:
+        return ""
+    cabecalho = (f"{CATALOG_CONTEXT_HEADER} relacionadas ao pedido. Use-as como base quando "
+                 "fizer sentido, cite-as pelo título e responda de forma mais concisa:")
+    linhas = [cabecalho]
+    usados = contar_tokens(cabecalho, OPENAI_MODEL)
+    for resumo in resumos:
+        linha = format_recipe_summary(resumo)
+        custo = contar_tokens(linha, OPENAI_MODEL) + 1
+        if usados + custo > token_budget:
+            break
+        linhas.append(linha)
+        usados += custo
+    return '\n'.join(linhas) if len(linhas) > 1 else ""
+
+def is_grounded(messages: List[Dict]) -> bool:
+    """Indica se o contexto inclui receitas do catálogo"""
+    return any(m["role"] == "system" and m["content"].startswith(CATALOG_CONTEXT_HEADER) for m in messages)
+
+# Prompt de sistema, compactado (sem indentação e linhas em branco) uma única vez na importação
+SYSTEM_PROMPT = compactar_prompt("""Você é a Chef Michelle Mística, uma renomada chef especializada em gastronomia funcional com formação em nutrição funcional e fitoterapia. Sua abordagem única combina:
 
     FILOSOFIA CULINÁRIA:
     - Criação de receitas que são simultaneamente nutritivas E deliciosas
@@ -658,39 +798,369 @@ def prepare_ai_context(prompt: str) -> List[Dict]:
 
     🍷 Harmonização:
     [Sugestões de consumo e acompanhamentos]
+    """)
+
+def prepare_ai_context(prompt: str, context_recipes: Optional[List[Dict]] = None,
+                       history: Optional[List[Dict]] = None) -> List[Dict]:
     """
+    Prepara o contexto para a chamada da IA: prompt de sistema, receitas do catálogo
+    recuperadas (se houver) e o histórico que couber no orçamento de tokens
+    """
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    catalog_context = build_catalog_context(context_recipes or [])
+    if catalog_context:
+        messages.append({"role": "system", "content": catalog_context})
     
-    return [
-        {"role": "system", "content": context},
-        {"role": "user", "content": prompt}
-    ]
+    if history:
+        # O histórico fica com o que sobra do orçamento depois do contexto fixo e do pedido
+        orcamento = min(HISTORY_TOKEN_BUDGET, PROMPT_TOKEN_BUDGET - SYSTEM_PROMPT_TOKENS
+                        - contar_tokens(catalog_context, OPENAI_MODEL) - contar_tokens(prompt, OPENAI_MODEL))
+        messages.extend(ajustar_historico(history, max(orcamento, 0), OPENAI_MODEL))
+    
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+# Modelo e parâmetros de amostragem usados em todas as chamadas
+OPENAI_MODEL = "gpt-4o-mini-2024-07-18"
+OPENAI_PARAMS = {
+    "temperature": 0.85,
+    "max_tokens": 2500,
+    "top_p": 0.95,
+    "frequency_penalty": 0.3,
+    "presence_penalty": 0.3
+}
+
+# Respostas fundamentadas em receitas do catálogo podem ser mais curtas
+OPENAI_GROUNDED_MAX_TOKENS = 1200
+
+# Orçamento de tokens de entrada por chamada (prompt de sistema + catálogo + histórico + pedido)
+PROMPT_TOKEN_BUDGET = 4000
+# Teto para o histórico da conversa: só as últimas trocas interessam ao pedido atual
+HISTORY_TOKEN_BUDGET = 1000
+SYSTEM_PROMPT_TOKENS = contar_tokens(SYSTEM_PROMPT, OPENAI_MODEL)
+logger.info(f"Prompt de sistema: {SYSTEM_PROMPT_TOKENS} tokens")
+
+def completion_params(messages: List[Dict]) -> Dict:
+    """Parâmetros da chamada, com max_tokens reduzido quando a resposta é fundamentada no catálogo"""
+    if is_grounded(messages):
+        return {**OPENAI_PARAMS, "max_tokens": OPENAI_GROUNDED_MAX_TOKENS}
+    return OPENAI_PARAMS
+
+# Palavras que não mudam o pedido e ficam fora da chave do cache de respostas
+CACHE_KEY_IGNORED_WORDS = {'receita', 'receitas', 'tem', 'quero', 'alguma', 'algum', 'me', 'sabe', 'voce'}
+
+def normalize_prompt_key(prompt: str) -> str:
+    """Normaliza o pedido do usuário para a chave do cache ("tem receita de homus?" -> "homus")"""
+    termos = clean_search_query(extract_search_terms(prompt)).split()
+    # Mantém a ordem dos termos: "bolo de cenoura com chocolate" != "bolo de chocolate com cenoura"
+    relevantes = list(dict.fromkeys(t for t in termos if t not in CACHE_KEY_IGNORED_WORDS))
+    return ' '.join(relevantes or termos)
+
+@st.cache_resource
+def get_response_cache() -> Optional[CacheRespostas]:
+    """Retorna o cache persistente de respostas compartilhado pelo processo"""
+    try:
+        return CacheRespostas(st.secrets.get("RESPONSE_CACHE_PATH", "cache_respostas.db"))
+    except Exception as e:
+        logger.error(f"Cache de respostas indisponível: {str(e)}")
+        return None
+
+@st.cache_resource
+def get_semantic_cache() -> Optional[CacheSemantico]:
+    """Retorna o cache semântico (prompts parafraseados) compartilhado pelo processo"""
+    try:
+        # O modelo do sentence-transformers só é carregado com opt-in explícito
+        embedder = criar_embedder(secret_flag("SEMANTIC_CACHE_LOCAL_MODEL"))
+        limiar = float(st.secrets.get("SEMANTIC_CACHE_THRESHOLD", LIMIAR_SEMANTICO_PADRAO))
+        return CacheSemantico(embedder, limiar=limiar)
+    except Exception as e:
+        logger.error(f"Cache semântico indisponível: {str(e)}")
+        return None
+
+# Mensagens mais recentes do histórico que entram na chave do cache (a última troca)
+CACHE_HISTORY_MESSAGES = 2
+
+def cache_context(messages: List[Dict]) -> str:
+    """
+    Contexto da chamada na chave do cache: prompt de sistema, receitas do catálogo e a última
+    troca da conversa. Pedidos que dependem do histórico ("uma versão mais simples") só
+    reaproveitam respostas dadas depois da mesma troca; o histórico inteiro deixaria a chave
+    única a cada turno
+    """
+    sistema = [m["content"] for m in messages[:-1] if m.get("role") == "system"]
+    conversa = [(m["role"], m["content"]) for m in messages[:-1] if m.get("role") != "system"]
+    return json.dumps([sistema, conversa[-CACHE_HISTORY_MESSAGES:]], ensure_ascii=False)
+
+def response_cache_key(messages: List[Dict]) -> str:
+    """Chave do cache: pedido normalizado + contexto fixo + modelo e parâmetros"""
+    return gerar_chave(normalize_prompt_key(messages[-1]["content"]), OPENAI_MODEL,
+                       completion_params(messages), cache_context(messages))
+
+def response_cache_namespace(messages: List[Dict]) -> str:
+    """Namespace do cache semântico: só compara prompts com o mesmo contexto, modelo e parâmetros"""
+    return gerar_chave("", OPENAI_MODEL, completion_params(messages), cache_context(messages))
+
+CACHE_HITS = REGISTRO.contador("chef_cache_respostas_total", "Consultas ao cache de respostas da IA, por resultado")
+
+def get_cached_response(messages: List[Dict]) -> Optional[str]:
+    """Busca a resposta no cache persistente e, se não houver, no cache semântico"""
+    cache = get_response_cache()
+    if cache:
+        try:
+            cached = cache.obter(response_cache_key(messages))
+            if cached is not None:
+                return cached
+        except Exception as e:
+            logger.error(f"Erro ao ler o cache de respostas: {str(e)}")
+    
+    semantic_cache = get_semantic_cache()
+    if semantic_cache:
+        try:
+            cached = semantic_cache.buscar(messages[-1]["content"], response_cache_namespace(messages))
+            logger.info(f"Cache semântico: {semantic_cache.metricas()}")
+            return cached
+        except Exception as e:
+            logger.error(f"Erro ao ler o cache semântico: {str(e)}")
+    return None
 
-def call_openai_api(client: OpenAI, messages: List[Dict]) -> str:
-    """Faz a chamada à API da OpenAI"""
+def store_cached_response(messages: List[Dict], response: str) -> None:
+    """Grava a resposta no cache persistente e no cache semântico"""
+    cache = get_response_cache()
+    if cache:
+        try:
+            cache.gravar(response_cache_key(messages), response)
+        except Exception as e:
+            logger.error(f"Erro ao gravar o cache de respostas: {str(e)}")
+    
+    semantic_cache = get_semantic_cache()
+    if semantic_cache:
+        try:
+            semantic_cache.gravar(messages[-1]["content"], response, response_cache_namespace(messages))
+        except Exception as e:
+            logger.error(f"Erro ao gravar o cache semântico: {str(e)}")
+
+@timed
+def call_openai_api_stream(client: ClienteOpenAI, messages: List[Dict]) -> Iterator[str]:
+    """Faz a chamada à API da OpenAI em modo streaming, gerando os trechos de texto à medida que chegam"""
     try:
+        inicio = time.perf_counter()
+        stream = client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            stream=True,
+            **completion_params(messages)
+        )
+        trechos = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                trechos.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+        # O streaming não traz o uso de tokens; registra a contagem local
+        registrar_uso(contar_tokens_mensagens(messages, OPENAI_MODEL),
+                      contar_tokens(''.join(trechos), OPENAI_MODEL),
+                      time.perf_counter() - inicio, estimado=True)
+    except Exception as e:
+        logger.error(f"Erro detalhado na chamada da API (streaming): {str(e)}")
+        raise Exception(f"Erro na chamada da API: {str(e)}")
+
+@timed
+@rastreado(nome="render.streaming")
+def render_streaming_response(trechos: Iterator[str]) -> str:
+    """Exibe a resposta da IA token a token e retorna o texto completo"""
+    placeholder = st.empty()
+    with placeholder.container():
+        with st.chat_message("assistant"):
+            response = st.write_stream(trechos)
+    # A resposta final é exibida pelo histórico; remove a prévia para não duplicar
+    placeholder.empty()
+    return response if isinstance(response, str) else ''.join(map(str, response))
+
+def _complete_and_cache(client: ClienteOpenAI, messages: List[Dict],
+                        render: Optional[Callable[[Iterator[str]], str]] = None) -> str:
+    """Faz a chamada (em streaming quando há quem exiba os trechos), registra o uso de tokens e grava a resposta no cache"""
+    if render:
+        content = render(call_openai_api_stream(client, messages))
+    else:
+        inicio = time.perf_counter()
         response = client.chat.completions.create(
-            model="gpt-4o-mini-2024-07-18",
+            model=OPENAI_MODEL,
             messages=messages,
-            temperature=0.85,
-            max_tokens=2500,
-            top_p=0.95,
-            frequency_penalty=0.3,
-            presence_penalty=0.3
+            **completion_params(messages)
+        )
+        if response.usage:
+            registrar_uso(response.usage.prompt_tokens, response.usage.completion_tokens,
+                          time.perf_counter() - inicio)
+        content = response.choices[0].message.content or ""
+    store_cached_response(messages, content)
+    return content
+
+@timed
+@rastreado(nome="llm")
+def call_openai_api(client: ClienteOpenAI, messages: List[Dict],
+                    render: Optional[Callable[[Iterator[str]], str]] = None) -> str:
+    """
+    Faz a chamada à API da OpenAI (respostas repetidas ou parafraseadas vêm do cache).
+    Com `render`, a resposta é gerada em streaming e os trechos são exibidos por ele
+    """
+    if rastreamento_ativo():
+        span_atual().set_attributes({"llm.modelo": OPENAI_MODEL,
+                                     "llm.tokens_prompt": contar_tokens_mensagens(messages, OPENAI_MODEL)})
+    cached = get_cached_response(messages)
+    resultado_cache = "acerto" if cached is not None else "falta"
+    span_atual().set_attribute("llm.cache", resultado_cache)
+    if metricas_habilitadas():
+        CACHE_HITS.inc(resultado=resultado_cache)
+    if cached is not None:
+        return cached
+    
+    try:
+        # Pedidos idênticos simultâneos aguardam a mesma chamada em vez de repeti-la
+        resposta: str = get_single_flights()["llm"].executar(
+            response_cache_key(messages), _complete_and_cache, client, messages, render
         )
-        return response.choices[0].message.content
+        return resposta
     except Exception as e:
         logger.error(f"Erro detalhado na chamada da API: {str(e)}")
         raise Exception(f"Erro na chamada da API: {str(e)}")
 
+@st.cache_resource
+def get_single_flights() -> Dict[str, SingleFlight]:
+    """Grupos de coalescência compartilhados por todas as sessões (buscas no banco e chamadas à IA)"""
+    return {"search": SingleFlight("busca"), "llm": SingleFlight("llm")}
+
+def coalesced_search(db: DatabaseInterface, operation: str, query: str, *args):
+    """Executa a busca no banco, compartilhando o resultado entre buscas idênticas simultâneas"""
+    chave = (operation, ' '.join(normalizar_consulta(query or "")), args)
+    return get_single_flights()["search"].executar(chave, getattr(db, operation), query, *args)
+
+@st.cache_resource
+def init_metrics() -> Optional[ThreadingHTTPServer]:
+    """Liga as métricas (METRICS_ENABLED) e sobe o endpoint do Prometheus (METRICS_PORT), uma vez por processo"""
+    try:
+        if secret_flag("METRICS_ENABLED", metricas_habilitadas()):
+            habilitar_metricas()
+        porta = st.secrets.get("METRICS_PORT") or os.getenv("METRICS_PORT")
+        if metricas_habilitadas() and porta:
+            return iniciar_servidor_metricas(int(porta), st.secrets.get("METRICS_HOST", "127.0.0.1"))
+    except Exception as e:
+        logger.error(f"Erro ao iniciar as métricas: {str(e)}")
+    return None
+
+@st.cache_resource
+def init_tracing() -> bool:
+    """Liga o rastreamento por etapa (TRACING_EXPORTER: console, arquivo ou otel), uma vez por processo"""
+    try:
+        exportador = st.secrets.get("TRACING_EXPORTER")
+        if exportador:
+            return configurar_rastreamento(exportador, st.secrets.get("TRACING_FILE"))
+    except Exception as e:
+        logger.error(f"Erro ao iniciar o rastreamento: {str(e)}")
+    return rastreamento_ativo()
+
+def is_admin() -> bool:
+    """Painel de administração liberado com ?admin=<ADMIN_TOKEN> na URL"""
+    token = st.secrets.get("ADMIN_TOKEN")
+    informado = st.query_params.get("admin")
+    return bool(token) and bool(informado) and hmac.compare_digest(str(informado), str(token))
+
+def render_metrics_panel() -> None:
+    """Tempos das funções instrumentadas, das mais custosas no total"""
+    with st.sidebar.expander("📈 Métricas de desempenho"):
+        if not metricas_habilitadas():
+            st.info("Métricas desligadas (defina METRICS_ENABLED)")
+            return
+        linhas = resumo_funcoes()
+        if linhas:
+            st.dataframe(linhas, use_container_width=True, hide_index=True)
+        else:
+            st.write("Nenhuma medição ainda.")
+        st.download_button("Exportar (Prometheus)", REGISTRO.exportar_prometheus(),
+                           file_name="metricas.prom", mime="text/plain")
+
+# Valores de PROFILING_MODE que desligam o perfilamento
+PROFILING_OFF = ("", "0", "false", "no", "nao", "não", "off", "none")
+
+@st.cache_resource
+def configured_profiling_mode() -> Optional[str]:
+    """PROFILING_MODE (secret ou env), validado uma vez por processo"""
+    modo = st.secrets.get("PROFILING_MODE") or os.getenv("PROFILING_MODE") or ""
+    modo = str(modo).strip().lower()
+    if modo in PROFILING_OFF:
+        return None
+    if modo not in PROFILING_MODES:
+        logger.error(f"PROFILING_MODE desconhecido: {modo!r} (use um de {PROFILING_MODES}); "
+                      f"usando {PROFILING_MODES[0]}")
+        return PROFILING_MODES[0]
+    return modo
+
+def profiling_mode() -> Optional[str]:
+    """
+    Modo do profiler para este rerun: PROFILING_MODE (secret ou env) perfila todos os reruns;
+    ?profile=<modo> perfila um único rerun (callback e script), apenas para administradores
+    """
+    modo = configured_profiling_mode()
+    if modo:
+        return modo
+    pedido = st.query_params.get("profile")
+    if pedido and is_admin():
+        # Remove o parâmetro para que os próximos reruns não sejam perfilados; o pedido vale até
+        # o fim deste rerun (o callback do campo de mensagem roda antes do script)
+        del st.query_params["profile"]
+        if pedido not in PROFILING_MODES:
+            pedido = PROFILING_MODES[0]
+        st.session_state.profile_request = pedido
+    return st.session_state.get("profile_request")
+
+def process_user_input_callback(client: Optional[ClienteOpenAI], db: DatabaseInterface) -> None:
+    """
+    on_change do campo de mensagem. O Streamlit executa o callback antes do script, fora do
+    perfil do run(): quando o rerun é perfilado, o turno do chat ganha um perfil próprio
+    """
+    modo = profiling_mode()
+    if not modo:
+        process_user_input(client, db)
+        return
+    with PerfilExecucao(st.secrets.get("PROFILING_DIR", PROFILING_DIR_DEFAULT), modo,
+                        rotulo="callback") as perfil:
+        process_user_input(client, db)
+    st.session_state.callback_profile = perfil
+
+def render_profile_panel(perfis: List[PerfilExecucao]) -> None:
+    """Funções mais lentas do último rerun perfilado (callback e script) e os arquivos gerados"""
+    with st.sidebar.expander("⏱️ Perfil do último rerun", expanded=True):
+        for perfil in perfis:
+            st.write(f"{perfil.nome}: {perfil.duracao * 1000:.0f} ms ({perfil.modo})")
+            st.dataframe(perfil.funcoes_mais_lentas(), use_container_width=True, hide_index=True)
+            for caminho in perfil.arquivos:
+                if os.path.exists(caminho):
+                    nome = os.path.basename(caminho)
+                    with open(caminho, "rb") as f:
+                        st.download_button(f"Baixar {nome}", f.read(), file_name=nome,
+                                           key=f"perfil_{caminho}")
+        st.caption("Abra o .speedscope.json ou o .collapsed.txt em https://www.speedscope.app")
+
+def render_admin_panel() -> None:
+    """Painéis de diagnóstico na barra lateral (apenas para administradores)"""
+    st.sidebar.header("🛠️ Administração")
+    render_metrics_panel()
+
 def init_app(db: DatabaseInterface) -> None:
     st.session_state.db = db
 
+@st.cache_resource
 def get_database() -> DatabaseInterface:
+    """Retorna o banco compartilhado por todas as sessões e reruns do processo"""
     db_type = st.secrets.get("DATABASE_TYPE", "supabase")
     if db_type == "sqlite":
         from database import SQLiteDB
-        return SQLiteDB()
-    return SupabaseDB()  # Usando o alias SupabaseDB
+        return SQLiteDB(st.secrets.get("SQLITE_PATH", "receitas_local.db"))
+    if db_type == "supabase_fake":
+        # Supabase local (SQLite) para testes de carga e desenvolvimento sem rede
+        from supabase_fake import ClienteSupabaseFake
+        cliente = ClienteSupabaseFake(st.secrets.get("SUPABASE_FAKE_PATH", ":memory:"),
+                                      latencia=float(st.secrets.get("SUPABASE_FAKE_LATENCY", 0.0)))
+        return SupabaseDB(cliente=cliente)
+    return SupabaseDB.shared()  # Usando o alias SupabaseDB
 
 def main():
     """Função principal do aplicativo"""
@@ -698,6 +1168,10 @@ def main():
     if os.path.exists(".env"):
         load_dotenv()
     
+    # Liga as métricas e os traces (se configurados) antes de qualquer chamada instrumentada
+    init_metrics()
+    init_tracing()
+    
     # Inicializa o cliente OpenAI
     client = init_openai_client()
     if not client:
@@ -721,25 +1195,55 @@ def main():
     render_message_history()
     
     # Campo de entrada do usuário
-    st.text_input("Digite sua mensagem:", key="user_input", on_change=lambda: process_user_input(client, db))
+    st.text_input("Digite sua mensagem:", key="user_input", on_change=process_user_input_callback,
+                  args=(client, db))
+    
+    # Ações explícitas sobre a última resposta: criar a receita estruturada e salvá-la no catálogo
+    if st.session_state.get("recipe_request"):
+        st.button("✨ Criar receita completa", on_click=create_recipe_callback, args=(client,))
+    if st.session_state.get("generated_recipe"):
+        st.button("💾 Salvar receita no catálogo", on_click=save_generated_recipe, args=(db,))
     
     # Área de busca (colapsada por padrão)
     with st.expander("🔍 Buscar no banco de receitas"):
         busca = st.text_input("Digite sua busca:", key="busca")
         
         if busca:
-            # Usa o método direto de busca
-            receitas = db.buscar_receitas(busca)
+            # Lista apenas os resumos; a receita completa é buscada em "Ver receita completa"
+            receitas = coalesced_search(db, "buscar_resumos", busca)
             if receitas:
                 st.write(f"Encontradas {len(receitas)} receitas!")
                 for receita in receitas:
-                    render_recipe_preview(receita)
+                    render_recipe_preview(receita, db, key_prefix="busca")
             else:
                 st.info("Nenhuma receita encontrada. Que tal me perguntar diretamente?")
     
     # Botão para exportar histórico
     if st.session_state.messages:
         export_history()
+    
+    if is_admin():
+        render_admin_panel()
+
+def run():
+    """Executa um rerun do app, perfilando o main() quando pedido (ver profiling_mode)"""
+    modo = profiling_mode()
+    if modo:
+        try:
+            with PerfilExecucao(st.secrets.get("PROFILING_DIR", PROFILING_DIR_DEFAULT),
+                                modo) as perfil:
+                main()
+        finally:
+            # O pedido de ?profile= vale só para este rerun, mesmo se o script for interrompido
+            st.session_state.pop("profile_request", None)
+        # Perfil do callback deste rerun (se houve mensagem), seguido do perfil do script
+        callback = st.session_state.pop("callback_profile", None)
+        st.session_state.last_profiles = [p for p in (callback, perfil) if p]
+    else:
+        main()
+    
+    if is_admin() and st.session_state.get("last_profiles"):
+        render_profile_panel(st.session_state.last_profiles)
 
 if __name__ == "__main__":
-    main()
+    run()
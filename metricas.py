@@ -0,0 +1,281 @@
+import bisect
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import (Any, Callable, Dict, Generator, List, Optional, Sequence, Tuple, Type, TypeVar,
+                    Union, cast, overload)
+
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) dos buckets de latência: de buscas em memória a gerações da IA
+BUCKETS_PADRAO = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                  0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Desligadas por padrão: o @timed só confere esta flag antes de chamar a função original
+_habilitadas = os.getenv("METRICS_ENABLED", "").lower() in ("1", "true", "sim", "yes")
+
+Rotulos = Tuple[Tuple[str, str], ...]
+
+
+def metricas_habilitadas() -> bool:
+    return _habilitadas
+
+
+def habilitar_metricas(ativas: bool = True) -> None:
+    global _habilitadas
+    _habilitadas = ativas
+
+
+def _formatar_rotulos(rotulos: Rotulos, extra: str = "") -> str:
+    pares = [f'{chave}="{_escapar(valor)}"' for chave, valor in rotulos]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_numero(valor: float) -> str:
+    return repr(float(valor)) if valor != int(valor) else str(int(valor))
+
+
+class Contador:
+    """Contador monotônico, com uma série por combinação de rótulos"""
+
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str):
+        self.nome = nome
+        self.ajuda = ajuda
+        self._valores: Dict[Rotulos, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, valor: float = 1.0, **rotulos: str) -> None:
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def valor(self, **rotulos: str) -> float:
+        return self._valores.get(tuple(sorted(rotulos.items())), 0.0)
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            valores = sorted(self._valores.items())
+        return [f"{self.nome}{_formatar_rotulos(r)} {_formatar_numero(v)}" for r, v in valores]
+
+
+class Histograma:
+    """Histograma com buckets fixos (contagens, soma e total por combinação de rótulos)"""
+
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, buckets: Sequence[float] = BUCKETS_PADRAO):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.buckets = tuple(sorted(buckets))
+        # rótulos -> [contagem por bucket (+Inf no fim), soma, total]
+        self._series: Dict[Rotulos, list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, **rotulos: str) -> None:
+        chave = tuple(sorted(rotulos.items()))
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def series(self) -> Dict[Rotulos, Tuple[List[int], float, int]]:
+        with self._lock:
+            return {r: (list(s[0]), s[1], s[2]) for r, s in self._series.items()}
+
+    def quantil(self, q: float, **rotulos: str) -> Optional[float]:
+        """Estimativa do quantil por interpolação linear no bucket (como o histogram_quantile)"""
+        serie = self.series().get(tuple(sorted(rotulos.items())))
+        if not serie or not serie[2]:
+            return None
+        contagens, _, total = serie
+        alvo = q * total
+        acumulado = 0
+        for i, contagem in enumerate(contagens):
+            if acumulado + contagem >= alvo and contagem:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                inferior = self.buckets[i - 1] if i else 0.0
+                return inferior + (self.buckets[i] - inferior) * (alvo - acumulado) / contagem
+            acumulado += contagem
+        return self.buckets[-1]
+
+    def exportar(self) -> List[str]:
+        linhas = []
+        for rotulos, (contagens, soma, total) in sorted(self.series().items()):
+            acumulado = 0
+            for limite, contagem in zip(self.buckets, contagens):
+                acumulado += contagem
+                le = f'le="{limite}"'
+                linhas.append(f"{self.nome}_bucket{_formatar_rotulos(rotulos, le)} {acumulado}")
+            le = 'le="+Inf"'
+            linhas.append(f"{self.nome}_bucket{_formatar_rotulos(rotulos, le)} {total}")
+            linhas.append(f"{self.nome}_sum{_formatar_rotulos(rotulos)} {_formatar_numero(soma)}")
+            linhas.append(f"{self.nome}_count{_formatar_rotulos(rotulos)} {total}")
+        return linhas
+
+
+Metrica = Union[Contador, Histograma]
+M = TypeVar('M', Contador, Histograma)
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+class RegistroMetricas:
+    """Registro das métricas do processo, exportadas no formato de texto do Prometheus"""
+
+    def __init__(self) -> None:
+        self._metricas: Dict[str, Metrica] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica: M) -> M:
+        with self._lock:
+            existente = self._metricas.setdefault(metrica.nome, metrica)
+        if not isinstance(existente, type(metrica)):
+            raise ValueError(f"Métrica {metrica.nome} já registrada como {existente.tipo}")
+        return existente
+
+    def contador(self, nome: str, ajuda: str) -> Contador:
+        return self._registrar(Contador(nome, ajuda))
+
+    def histograma(self, nome: str, ajuda: str,
+                   buckets: Sequence[float] = BUCKETS_PADRAO) -> Histograma:
+        return self._registrar(Histograma(nome, ajuda, buckets))
+
+    def exportar_prometheus(self) -> str:
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in metricas:
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+REGISTRO = RegistroMetricas()
+
+DURACAO_FUNCOES = REGISTRO.histograma("chef_funcao_duracao_segundos",
+                                      "Duração das funções instrumentadas com @timed")
+ERROS_FUNCOES = REGISTRO.contador("chef_funcao_erros_total",
+                                  "Exceções lançadas pelas funções instrumentadas")
+
+
+@overload
+def timed(funcao: F) -> F: ...
+
+
+@overload
+def timed(*, nome: Optional[str] = None) -> Callable[[F], F]: ...
+
+
+def timed(funcao: Optional[F] = None, *, nome: Optional[str] = None) -> Union[F, Callable[[F], F]]:
+    """
+    Mede a duração de cada chamada em chef_funcao_duracao_segundos{funcao=...}. Use como
+    @timed ou @timed(nome="..."). Em geradores, mede até o fim da iteração.
+    Com as métricas desligadas, o custo é só a verificação da flag.
+    """
+    def decorar(f: F) -> F:
+        rotulo = nome or f.__qualname__
+
+        if inspect.isgeneratorfunction(f):
+            @functools.wraps(f)
+            def gerador(*args: Any, **kwargs: Any) -> Generator[Any, Any, Any]:
+                if not _habilitadas:
+                    return (yield from f(*args, **kwargs))
+                inicio = time.perf_counter()
+                try:
+                    return (yield from f(*args, **kwargs))
+                except Exception:
+                    ERROS_FUNCOES.inc(funcao=rotulo)
+                    raise
+                finally:
+                    DURACAO_FUNCOES.observar(time.perf_counter() - inicio, funcao=rotulo)
+            return cast(F, gerador)
+
+        @functools.wraps(f)
+        def cronometrada(*args: Any, **kwargs: Any) -> Any:
+            if not _habilitadas:
+                return f(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            except Exception:
+                ERROS_FUNCOES.inc(funcao=rotulo)
+                raise
+            finally:
+                DURACAO_FUNCOES.observar(time.perf_counter() - inicio, funcao=rotulo)
+        return cast(F, cronometrada)
+
+    return decorar(funcao) if funcao is not None else decorar
+
+
+def resumo_funcoes() -> List[Dict]:
+    """Resumo por função instrumentada (para o painel de administração), das mais lentas"""
+    linhas = []
+    for rotulos, (_, soma, total) in DURACAO_FUNCOES.series().items():
+        funcao = dict(rotulos).get("funcao", "")
+        p50 = DURACAO_FUNCOES.quantil(0.5, funcao=funcao)
+        p95 = DURACAO_FUNCOES.quantil(0.95, funcao=funcao)
+        linhas.append({
+            "funcao": funcao,
+            "chamadas": total,
+            "erros": int(ERROS_FUNCOES.valor(funcao=funcao)),
+            "total_s": round(soma, 3),
+            "media_ms": round(soma / total * 1000, 2) if total else 0.0,
+            "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 2) if p95 is not None else None
+        })
+    return sorted(linhas, key=lambda l: l["total_s"], reverse=True)
+
+
+class _ServidorMetricas(ThreadingHTTPServer):
+    """Servidor do endpoint /metrics, com o registro exportado pelos handlers"""
+
+    daemon_threads = True
+
+    def __init__(self, endereco: Tuple[str, int], handler: Type[BaseHTTPRequestHandler],
+                 registro: RegistroMetricas):
+        super().__init__(endereco, handler)
+        self.registro = registro
+
+
+class _HandlerMetricas(BaseHTTPRequestHandler):
+    server: _ServidorMetricas
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0].rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        corpo = self.server.registro.exportar_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+def iniciar_servidor_metricas(porta: int, host: str = "127.0.0.1",
+                              registro: RegistroMetricas = REGISTRO) -> ThreadingHTTPServer:
+    """Sobe o endpoint /metrics (sidecar do Prometheus) em uma thread daemon"""
+    servidor = _ServidorMetricas((host, porta), _HandlerMetricas, registro)
+    threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+    logger.info(f"Métricas do Prometheus em http://{host}:{servidor.server_address[1]}/metrics")
+    return servidor
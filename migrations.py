@@ -129,19 +129,18 @@ def migrar_dados():
     # Cria as tabelas se não existirem
     criar_tabelas(db)
     
-    # Migra cada receita
+    # Migra as receitas em lotes (um insert de múltiplas linhas por lote)
     total = len(receitas)
-    sucesso = 0
+    print(f"Migrando {total} receitas em lotes...")
+    relatorio = db.adicionar_receitas_em_lote(receitas)
     
-    for i, receita in enumerate(receitas, 1):
-        print(f"Migrando receita {i}/{total}: {receita.get('titulo', 'Sem título')}")
-        if db.adicionar_receita(receita):
-            sucesso += 1
+    for falha in relatorio['falhas']:
+        print(f"✗ Receita {falha['indice'] + 1}/{total} '{falha['titulo']}': {falha['erro']}")
         
     print(f"\nMigração concluída!")
     print(f"Total de receitas: {total}")
-    print(f"Migradas com sucesso: {sucesso}")
-    print(f"Falhas: {total - sucesso}")
+    print(f"Migradas com sucesso: {relatorio['sucesso']}")
+    print(f"Falhas: {len(relatorio['falhas'])}")
 
 if __name__ == "__main__":
     migrar_dados() 
\ No newline at end of file
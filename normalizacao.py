@@ -0,0 +1,73 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Tuple
+
+_RE_TOKEN = re.compile(r'\w+')
+
+# Sufixos de plural em português (já sem acentos), do mais específico ao mais geral
+_SUFIXOS_PLURAL = (
+    ('oes', 'ao'),
+    ('aes', 'ao'),
+    ('ais', 'al'),
+    ('eis', 'el'),
+    ('ois', 'ol'),
+    ('ns', 'm'),
+    ('res', 'r'),
+    ('zes', 'z'),
+    ('les', 'l'),
+)
+
+# Radical mínimo antes de -res/-zes/-les ("tres" não é plural de "tr")
+_RADICAL_MINIMO_ES = 2
+
+# Palavras terminadas em -s que não são plurais (já sem acentos)
+_INVARIAVEIS = frozenset({
+    'tres', 'pires', 'lapis', 'tenis', 'onibus', 'virus', 'bonus', 'atlas', 'oasis',
+    'simples', 'ananas', 'cais', 'mais', 'menos', 'biceps'
+})
+
+# Palavras sem valor de busca, já normalizadas (sem acentos e minúsculas)
+STOP_WORDS = frozenset({
+    'o', 'que', 'os', 'as', 'um', 'uns', 'uma', 'umas', 'com', 'para',
+    'por', 'em', 'no', 'na', 'nos', 'nas', 'do', 'da', 'dos', 'das',
+    'posso', 'pode', 'fazer', 'como', 'onde', 'quando', 'qual', 'quais',
+    'aonde', 'porque', 'usar', 'uso', 'de', 'e', 'ou', 'mas',
+    'porem', 'entao', 'assim', 'pois'
+})
+
+
+@lru_cache(maxsize=4096)
+def dobrar(texto: str) -> str:
+    """Remove acentos e diferenças de caixa (NFKD + remoção de marcas + casefold)"""
+    if not texto:
+        return ""
+    if texto.isascii():
+        return texto.casefold()
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+def radical(token: str) -> str:
+    """Stemming leve: reduz plurais comuns do português ao singular"""
+    if len(token) <= 3 or token.isdigit() or token in _INVARIAVEIS:
+        return token
+    for sufixo, substituto in _SUFIXOS_PLURAL:
+        if token.endswith(sufixo) and len(token) > len(sufixo):
+            if sufixo[0] not in 'aeiou' and len(token) - len(sufixo) < _RADICAL_MINIMO_ES:
+                return token
+            return token[:-len(sufixo)] + substituto
+    if token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Pipeline completo usado na indexação: dobra, quebra em palavras e reduz ao radical"""
+    return [radical(token) for token in _RE_TOKEN.findall(dobrar(texto))]
+
+
+@lru_cache(maxsize=4096)
+def normalizar_consulta(query: str) -> Tuple[str, ...]:
+    """Mesmo pipeline da indexação, memoizado por query distinta"""
+    return tuple(tokenizar(query))
@@ -0,0 +1,95 @@
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+try:
+    import tiktoken  # dependência opcional: contagem exata de tokens
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# O app deixa o log raiz em ERROR: o registro de uso tem o próprio logger, em INFO
+logger_uso = logging.getLogger(f"{__name__}.uso")
+logger_uso.setLevel(logging.INFO)
+
+MODELO_PADRAO = "gpt-4o-mini"
+
+# Sem o tiktoken, estima ~4 caracteres por token (boa aproximação para português)
+CARACTERES_POR_TOKEN = 4
+
+# Custo fixo do formato de chat: por mensagem e para iniciar a resposta
+TOKENS_POR_MENSAGEM = 4
+TOKENS_RESPOSTA = 3
+
+_RE_ESPACOS = re.compile(r'[ \t]+')
+
+
+@lru_cache(maxsize=8)
+def _codificador(modelo: str) -> Any:
+    """Codificador do tiktoken para o modelo, ou None se o tiktoken não estiver instalado"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(modelo)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+@lru_cache(maxsize=1024)
+def contar_tokens(texto: str, modelo: str = MODELO_PADRAO) -> int:
+    """Conta os tokens de um texto (memoizado: textos fixos são contados uma única vez)"""
+    if not texto:
+        return 0
+    codificador = _codificador(modelo)
+    if codificador is None:
+        return (len(texto) + CARACTERES_POR_TOKEN - 1) // CARACTERES_POR_TOKEN
+    return len(codificador.encode(texto))
+
+
+def contar_tokens_mensagens(mensagens: List[Dict], modelo: str = MODELO_PADRAO) -> int:
+    """Conta os tokens de uma lista de mensagens no formato de chat"""
+    return TOKENS_RESPOSTA + sum(
+        TOKENS_POR_MENSAGEM + contar_tokens(m.get("content") or "", modelo) for m in mensagens
+    )
+
+
+def compactar_prompt(texto: str) -> str:
+    """Remove indentação, espaços repetidos e linhas em branco de um prompt fixo"""
+    linhas = (_RE_ESPACOS.sub(' ', linha).strip() for linha in texto.splitlines())
+    return '\n'.join(linha for linha in linhas if linha)
+
+
+def ajustar_historico(historico: List[Dict], orcamento: int,
+                      modelo: str = MODELO_PADRAO) -> List[Dict]:
+    """
+    Mantém as mensagens mais recentes do histórico que cabem no orçamento de tokens,
+    descartando as mais antigas. Só considera mensagens de texto do usuário e da assistente.
+    """
+    selecionadas = []
+    usados = 0
+    for mensagem in reversed(historico):
+        conteudo = mensagem.get("content")
+        if mensagem.get("role") not in ("user", "assistant") or not isinstance(conteudo, str):
+            continue
+        custo = TOKENS_POR_MENSAGEM + contar_tokens(conteudo, modelo)
+        if usados + custo > orcamento:
+            break
+        selecionadas.append({"role": mensagem["role"], "content": conteudo})
+        usados += custo
+
+    descartadas = len(historico) - len(selecionadas)
+    if descartadas and historico:
+        logger.info(f"Histórico ajustado ao orçamento de {orcamento} tokens: {descartadas} mensagens descartadas")
+    return list(reversed(selecionadas))
+
+
+def registrar_uso(prompt_tokens: Optional[int], completion_tokens: Optional[int],
+                  duracao: float, estimado: bool = False) -> None:
+    """Registra no log os tokens de entrada e saída e a duração de uma chamada"""
+    origem = "estimados" if estimado else "da API"
+    logger_uso.info(
+        f"Uso de tokens ({origem}): prompt={prompt_tokens} completion={completion_tokens} "
+        f"duração={duracao:.2f}s"
+    )
@@ -0,0 +1,192 @@
+import cProfile
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, DefaultDict, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODOS = ("amostragem", "cprofile")
+DIRETORIO_PADRAO = "perfis"
+
+# Intervalo entre amostras das pilhas (o GIL troca de thread a cada ~5ms por padrão)
+INTERVALO_AMOSTRAGEM = 0.002
+
+# Quadro da pilha: (função, arquivo, linha da definição)
+Quadro = Tuple[str, str, int]
+
+
+def _nome_quadro(quadro: Quadro) -> str:
+    funcao, arquivo, linha = quadro
+    return f"{funcao} ({os.path.basename(arquivo)}:{linha})"
+
+
+class AmostradorPilhas:
+    """
+    Profiler por amostragem: uma thread lê a pilha da thread perfilada a cada intervalo
+    (como o pyinstrument e o py-spy) e acumula o tempo de parede por pilha completa,
+    sem o custo por chamada do cProfile.
+    """
+
+    def __init__(self, intervalo: float = INTERVALO_AMOSTRAGEM):
+        self.intervalo = intervalo
+        self.pilhas: DefaultDict[Tuple[Quadro, ...], float] = defaultdict(float)
+        self.duracao = 0.0
+        self._inicio = 0.0
+        self._alvo = 0
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        self._alvo = threading.get_ident()
+        self._inicio = time.perf_counter()
+        self._thread = threading.Thread(target=self._amostrar, name="amostrador-pilhas",
+                                        daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self._thread:
+            self._thread.join()
+        self.duracao = time.perf_counter() - self._inicio
+
+    def _amostrar(self) -> None:
+        anterior = time.perf_counter()
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self._alvo)
+            agora = time.perf_counter()
+            # Cada amostra vale o tempo real desde a anterior (o intervalo pode atrasar pelo GIL);
+            # sem o quadro, o intervalo é descartado em vez de somado à próxima amostra
+            decorrido, anterior = agora - anterior, agora
+            if quadro is None:
+                continue
+            pilha: List[Quadro] = []
+            while quadro is not None:
+                codigo = quadro.f_code
+                pilha.append((codigo.co_name, codigo.co_filename, codigo.co_firstlineno))
+                quadro = quadro.f_back
+            self.pilhas[tuple(reversed(pilha))] += decorrido
+
+    def funcoes(self) -> List[Dict]:
+        """Tempo próprio (no topo da pilha) e total (em qualquer nível) por função"""
+        proprio: DefaultDict[Quadro, float] = defaultdict(float)
+        total: DefaultDict[Quadro, float] = defaultdict(float)
+        for pilha, segundos in self.pilhas.items():
+            proprio[pilha[-1]] += segundos
+            for quadro in set(pilha):
+                total[quadro] += segundos
+        return [{
+            "funcao": _nome_quadro(quadro),
+            "chamadas": None,
+            "proprio_ms": round(proprio[quadro] * 1000, 2),
+            "total_ms": round(segundos * 1000, 2)
+        } for quadro, segundos in total.items()]
+
+    def para_collapsed(self) -> str:
+        """Formato de pilhas colapsadas (flamegraph.pl / speedscope): "a;b;c <microssegundos>" """
+        linhas = []
+        for pilha, segundos in sorted(self.pilhas.items()):
+            valor = round(segundos * 1e6)
+            if valor:
+                linhas.append(";".join(_nome_quadro(q) for q in pilha) + f" {valor}")
+        return "\n".join(linhas) + "\n"
+
+    def para_speedscope(self, nome: str) -> Dict:
+        """Perfil "sampled" no formato de arquivo do speedscope (https://www.speedscope.app)"""
+        indices: Dict[Quadro, int] = {}
+        amostras: List[List[int]] = []
+        pesos: List[float] = []
+        for pilha, segundos in self.pilhas.items():
+            amostras.append([indices.setdefault(q, len(indices)) for q in pilha])
+            pesos.append(segundos)
+        quadros = [{"name": funcao, "file": arquivo, "line": linha}
+                   for funcao, arquivo, linha in indices]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": nome,
+            "exporter": "chef_virtual.perfilamento",
+            "shared": {"frames": quadros},
+            "profiles": [{
+                "type": "sampled", "name": nome, "unit": "seconds",
+                "startValue": 0, "endValue": sum(pesos), "samples": amostras, "weights": pesos
+            }]
+        }
+
+
+class PerfilExecucao:
+    """Perfila um bloco (um rerun do app) e grava os arquivos ao sair"""
+
+    def __init__(self, diretorio: str = DIRETORIO_PADRAO, modo: str = "amostragem",
+                 rotulo: str = "rerun"):
+        if modo not in MODOS:
+            raise ValueError(f"Modo de perfilamento desconhecido: {modo} (use um de {MODOS})")
+        self.diretorio = diretorio
+        self.modo = modo
+        self.nome = f"{rotulo}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        self.arquivos: List[str] = []
+        self.duracao = 0.0
+        self._funcoes: List[Dict] = []
+        self._inicio = 0.0
+        # Um dos dois, conforme o modo; ambos são descartados ao gravar o perfil
+        self._amostrador: Optional[AmostradorPilhas] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+        if modo == "amostragem":
+            self._amostrador = AmostradorPilhas()
+        else:
+            self._cprofile = cProfile.Profile()
+
+    def __enter__(self) -> 'PerfilExecucao':
+        self._inicio = time.perf_counter()
+        if self._amostrador:
+            self._amostrador.iniciar()
+        elif self._cprofile:
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        # Interrupções do script (ex.: st.stop) também encerram o perfil
+        if self._amostrador:
+            self._amostrador.parar()
+        elif self._cprofile:
+            self._cprofile.disable()
+        self.duracao = time.perf_counter() - self._inicio
+        try:
+            self._gravar()
+        except Exception as e:
+            logger.error(f"Erro ao gravar o perfil {self.nome}: {str(e)}")
+        # Mantém só o resumo (o perfil pode ficar guardado na sessão)
+        self._amostrador = None
+        self._cprofile = None
+
+    def _gravar(self) -> None:
+        os.makedirs(self.diretorio, exist_ok=True)
+        base = os.path.join(self.diretorio, self.nome)
+        if self._amostrador:
+            self._funcoes = self._amostrador.funcoes()
+            with open(f"{base}.collapsed.txt", "w", encoding="utf-8") as f:
+                f.write(self._amostrador.para_collapsed())
+            with open(f"{base}.speedscope.json", "w", encoding="utf-8") as f:
+                json.dump(self._amostrador.para_speedscope(self.nome), f)
+            self.arquivos = [f"{base}.collapsed.txt", f"{base}.speedscope.json"]
+        elif self._cprofile:
+            # O cProfile não guarda pilhas completas: grava o .pstats (snakeviz, python -m pstats)
+            estatisticas = pstats.Stats(self._cprofile)
+            estatisticas.dump_stats(f"{base}.pstats")
+            registros = estatisticas.stats.items()  # type: ignore[attr-defined]
+            self._funcoes = [{
+                "funcao": _nome_quadro((funcao, arquivo, linha)),
+                "chamadas": chamadas,
+                "proprio_ms": round(proprio * 1000, 2),
+                "total_ms": round(total * 1000, 2)
+            } for (arquivo, linha, funcao), (_, chamadas, proprio, total, _) in registros]
+            self.arquivos = [f"{base}.pstats"]
+
+    def funcoes_mais_lentas(self, limite: int = 20, ordem: str = "proprio_ms") -> List[Dict]:
+        """Funções do rerun ordenadas por tempo próprio (ou total), das mais lentas"""
+        return sorted(self._funcoes, key=lambda f: f[ordem], reverse=True)[:limite]
@@ -0,0 +1,234 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import (Any, Callable, ContextManager, Dict, List, Optional, TextIO, TypeVar, Union,
+                    cast, overload)
+
+try:
+    # Dependência opcional: exporta pelo SDK configurado
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+# Exportadores aceitos em TRACING_EXPORTER ("" ou "none" desliga o rastreamento)
+EXPORTADORES = ("console", "arquivo", "otel")
+CAMINHO_PADRAO = "traces.jsonl"
+
+_span_atual: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar("span_atual",
+                                                                              default=None)
+
+
+class _SpanNulo:
+    """Span que não registra nada (rastreamento desligado)"""
+
+    def __enter__(self) -> '_SpanNulo':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def set_attribute(self, chave: str, valor: Any) -> None:
+        pass
+
+    def set_attributes(self, atributos: Dict[str, Any]) -> None:
+        pass
+
+
+SPAN_NULO = _SpanNulo()
+
+
+class Span:
+    """Span no modelo do OpenTelemetry: nome, ids do trace, início/fim, atributos e status"""
+
+    def __init__(self, nome: str, atributos: Dict[str, Any], exportador: 'Exportador'):
+        pai = _span_atual.get()
+        self.nome = nome
+        self.pai = pai
+        self.trace_id: str = pai.trace_id if pai else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.atributos = dict(atributos)
+        self.filhos: List['Span'] = []
+        self.status = "ok"
+        self.inicio_ns = 0
+        self.fim_ns = 0
+        self._exportador = exportador
+        self._token: Optional[contextvars.Token[Optional[Span]]] = None
+
+    @property
+    def duracao_ms(self) -> float:
+        return (self.fim_ns - self.inicio_ns) / 1e6
+
+    def set_attribute(self, chave: str, valor: Any) -> None:
+        self.atributos[chave] = valor
+
+    def set_attributes(self, atributos: Dict[str, Any]) -> None:
+        self.atributos.update(atributos)
+
+    def __enter__(self) -> 'Span':
+        self.inicio_ns = time.time_ns()
+        self._token = _span_atual.set(self)
+        return self
+
+    def __exit__(self, tipo: Optional[type], erro: Optional[BaseException], tb: Any) -> None:
+        self.fim_ns = time.time_ns()
+        if self._token is not None:
+            _span_atual.reset(self._token)
+        if tipo is not None:
+            self.status = "erro"
+            self.atributos["erro.tipo"] = tipo.__name__
+        if self.pai:
+            self.pai.filhos.append(self)
+        try:
+            self._exportador.exportar(self)
+        except Exception as e:
+            logger.error(f"Erro ao exportar span {self.nome}: {str(e)}")
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.nome,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.pai.span_id if self.pai else None,
+            "start_time_unix_nano": self.inicio_ns,
+            "end_time_unix_nano": self.fim_ns,
+            "duration_ms": round(self.duracao_ms, 3),
+            "status": self.status,
+            "attributes": self.atributos
+        }
+
+
+class Exportador:
+    def exportar(self, span: Span) -> None:
+        raise NotImplementedError
+
+
+class ExportadorConsole(Exportador):
+    """Ao fim de cada trace, escreve a árvore de spans com as durações"""
+
+    def __init__(self, saida: Optional[TextIO] = None):
+        self.saida = saida
+        self._lock = threading.Lock()
+
+    def exportar(self, span: Span) -> None:
+        if span.pai is not None:
+            return
+        linhas = []
+
+        def visitar(atual: Span, nivel: int) -> None:
+            atributos = " ".join(f"{k}={v}" for k, v in atual.atributos.items())
+            marca = " !" if atual.status == "erro" else ""
+            linha = f"{'  ' * nivel}{atual.nome} {atual.duracao_ms:.1f}ms{marca} {atributos}"
+            linhas.append(linha.rstrip())
+            for filho in sorted(atual.filhos, key=lambda s: s.inicio_ns):
+                visitar(filho, nivel + 1)
+
+        visitar(span, 0)
+        saida = self.saida or sys.stderr
+        with self._lock:
+            saida.write(f"[trace {span.trace_id}]\n" + "\n".join(linhas) + "\n")
+            saida.flush()
+
+
+class ExportadorArquivo(Exportador):
+    """Grava um span por linha (JSON Lines), com os campos do OTLP/JSON"""
+
+    def __init__(self, caminho: str = CAMINHO_PADRAO):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+
+    def exportar(self, span: Span) -> None:
+        linha = json.dumps(span.para_dict(), ensure_ascii=False, default=str)
+        with self._lock, open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(linha + "\n")
+
+
+# None: desligado; "otel": delega ao OpenTelemetry; senão, o exportador local
+_exportador: Optional[Any] = None
+
+
+def configurar_rastreamento(exportador: Optional[str], caminho: Optional[str] = None) -> bool:
+    """Liga o rastreamento com o exportador pedido; retorna False se ficou desligado"""
+    global _exportador
+    exportador = (exportador or "").strip().lower()
+    if exportador in ("", "none"):
+        _exportador = None
+    elif exportador == "console":
+        _exportador = ExportadorConsole()
+    elif exportador == "arquivo":
+        _exportador = ExportadorArquivo(caminho or CAMINHO_PADRAO)
+    elif exportador == "otel":
+        if otel_trace is None:
+            logger.error("TRACING_EXPORTER=otel, mas o opentelemetry não está instalado; "
+                         "rastreamento desligado")
+            _exportador = None
+        else:
+            _exportador = "otel"
+    else:
+        logger.error(f"Exportador de traces desconhecido: {exportador} (use um de {EXPORTADORES})")
+        _exportador = None
+    return _exportador is not None
+
+
+def rastreamento_ativo() -> bool:
+    return _exportador is not None
+
+
+def span(nome: str, **atributos: Any) -> ContextManager[Any]:
+    """Context manager de um span filho do span atual (no-op com o rastreamento desligado)"""
+    if _exportador is None:
+        return SPAN_NULO
+    if _exportador == "otel":
+        tracer = otel_trace.get_tracer("chef_virtual")
+        return cast(ContextManager[Any], tracer.start_as_current_span(nome, attributes=atributos))
+    return Span(nome, atributos, _exportador)
+
+
+def span_atual() -> Any:
+    """Span em andamento no contexto atual (ou um span nulo)"""
+    if _exportador is None:
+        return SPAN_NULO
+    if _exportador == "otel":
+        return otel_trace.get_current_span()
+    return _span_atual.get() or SPAN_NULO
+
+
+@overload
+def rastreado(funcao: F) -> F: ...
+
+
+@overload
+def rastreado(*, nome: Optional[str] = None) -> Callable[[F], F]: ...
+
+
+def rastreado(funcao: Optional[F] = None, *,
+              nome: Optional[str] = None) -> Union[F, Callable[[F], F]]:
+    """Executa a função dentro de um span (use como @rastreado ou @rastreado(nome="..."))"""
+    def decorar(f: F) -> F:
+        rotulo = nome or f.__qualname__
+
+        @functools.wraps(f)
+        def envolvida(*args: Any, **kwargs: Any) -> Any:
+            if _exportador is None:
+                return f(*args, **kwargs)
+            with span(rotulo):
+                return f(*args, **kwargs)
+        return cast(F, envolvida)
+
+    return decorar(funcao) if funcao is not None else decorar
+
+
+def registrar_retentativa(retry_state: Any) -> None:
+    """Callback `after` do tenacity: anota no span atual quantas tentativas falharam"""
+    span_atual().set_attribute("db.retentativas", retry_state.attempt_number)
+
+
+configurar_rastreamento(os.getenv("TRACING_EXPORTER"), os.getenv("TRACING_FILE"))
@@ -0,0 +1,163 @@
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Schema da receita gerada pela IA, no mesmo formato aceito por ReceitaAdapter.to_db_format
+SCHEMA_RECEITA = {
+    "type": "object",
+    "properties": {
+        "titulo": {"type": "string"},
+        "descricao": {"type": "string"},
+        "ingredientes": {"type": "array", "items": {"type": "string"}},
+        "modo_preparo": {"type": "array", "items": {"type": "string"}},
+        "tempo_preparo": {"type": "string"},
+        "porcoes": {"type": "string"},
+        "dificuldade": {"type": "string"},
+        "utensilios": {"type": "string"},
+        "harmonizacao": {"type": "string"},
+        "informacoes_nutricionais": {
+            "type": "object",
+            "properties": {
+                campo: {"type": "number"}
+                for campo in ("calorias", "proteinas", "carboidratos", "gorduras", "fibras")
+            },
+            "required": ["calorias", "proteinas", "carboidratos", "gorduras", "fibras"],
+            "additionalProperties": False
+        },
+        "beneficios_funcionais": {"type": "array", "items": {"type": "string"}},
+        "dicas": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": [
+        "titulo", "descricao", "ingredientes", "modo_preparo", "tempo_preparo", "porcoes",
+        "dificuldade", "utensilios", "harmonizacao", "informacoes_nutricionais",
+        "beneficios_funcionais", "dicas"
+    ],
+    "additionalProperties": False
+}
+
+# Parâmetro response_format para as saídas estruturadas da API
+RESPONSE_FORMAT_RECEITA = {
+    "type": "json_schema",
+    "json_schema": {"name": "receita", "strict": True, "schema": SCHEMA_RECEITA}
+}
+
+INSTRUCAO_JSON = (
+    "Responda apenas com a receita em JSON, seguindo o schema 'receita'. "
+    "Ingredientes com quantidades e modo de preparo passo a passo, um item por elemento."
+)
+
+CAMPOS_OBRIGATORIOS_NAO_VAZIOS = ('titulo', 'ingredientes', 'modo_preparo')
+
+_TIPOS_JSON = {'string': str, 'array': list, 'object': dict}
+_INICIO_TIPO = {'"': 'string', '[': 'array', '{': 'object'}
+
+
+class ReceitaInvalida(Exception):
+    """A resposta da IA não segue o schema da receita"""
+
+
+class ParserReceitaIncremental:
+    """
+    Lê o JSON da receita à medida que os trechos chegam do stream. Cada campo de texto
+    e cada item das listas (ingredientes, modo de preparo...) vira um evento (campo, valor)
+    assim que termina de chegar, e violações do schema interrompem a leitura na hora.
+    """
+
+    def __init__(self, schema: Dict = SCHEMA_RECEITA):
+        self._tipos = {campo: prop['type'] for campo, prop in schema['properties'].items()}
+        self._obrigatorios = schema['required']
+        self._texto = ""
+        self._pos = 0
+        self._pilha: List[str] = []
+        self._em_string = False
+        self._escape = False
+        self._inicio_string = 0
+        self._esperando_chave = False
+        self._esperando_valor = False
+        self._chave: Optional[str] = None
+
+    def alimentar(self, trecho: str) -> List[Tuple[str, str]]:
+        """Processa um novo trecho e retorna os eventos (campo, valor) completados por ele"""
+        self._texto += trecho
+        eventos: List[Tuple[str, str]] = []
+        texto = self._texto
+        for i in range(self._pos, len(texto)):
+            c = texto[i]
+            if self._em_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._em_string = False
+                    self._fechar_string(json.loads(texto[self._inicio_string:i + 1]), eventos)
+                continue
+
+            if c in ' \t\r\n':
+                continue
+            if not self._pilha:
+                if c != '{':
+                    raise ReceitaInvalida(f"A resposta não começa com um objeto JSON: {texto[:40]!r}")
+                self._pilha.append('{')
+                self._esperando_chave = True
+                continue
+
+            profundidade = len(self._pilha)
+            if profundidade == 1 and self._esperando_valor:
+                self._validar_inicio_valor(c)
+            elif profundidade == 2 and self._pilha[-1] == '[' and c not in '",]':
+                raise ReceitaInvalida(f"Item não textual na lista '{self._chave}'")
+
+            if c == '"':
+                self._em_string = True
+                self._inicio_string = i
+            elif c in '{[':
+                self._pilha.append(c)
+            elif c in '}]':
+                self._pilha.pop()
+            elif c == ':' and profundidade == 1:
+                self._esperando_valor = True
+            elif c == ',' and profundidade == 1:
+                self._esperando_chave = True
+        self._pos = len(texto)
+        return eventos
+
+    def _validar_inicio_valor(self, c: str) -> None:
+        """Confere, pelo primeiro caractere, se o valor do campo tem o tipo do schema"""
+        self._esperando_valor = False
+        tipo = _INICIO_TIPO.get(c)
+        if tipo != self._tipos[self._chave]:
+            raise ReceitaInvalida(
+                f"Campo '{self._chave}' deveria ser {self._tipos[self._chave]}, começou com {c!r}"
+            )
+
+    def _fechar_string(self, valor: str, eventos: List[Tuple[str, str]]) -> None:
+        profundidade = len(self._pilha)
+        if profundidade == 1 and self._esperando_chave:
+            if valor not in self._tipos:
+                raise ReceitaInvalida(f"Campo desconhecido na receita: '{valor}'")
+            self._chave = valor
+            self._esperando_chave = False
+        elif profundidade == 1 or (profundidade == 2 and self._pilha[-1] == '['):
+            if self._chave is not None:
+                eventos.append((self._chave, valor))
+
+    def finalizar(self) -> Dict:
+        """Valida a receita completa e a retorna como dicionário"""
+        try:
+            receita: Dict = json.loads(self._texto)
+        except json.JSONDecodeError as e:
+            raise ReceitaInvalida(f"JSON incompleto ou inválido: {e}")
+
+        faltantes = [campo for campo in self._obrigatorios if campo not in receita]
+        if faltantes:
+            raise ReceitaInvalida(f"Campos obrigatórios ausentes: {', '.join(faltantes)}")
+        for campo, tipo in self._tipos.items():
+            if campo in receita and not isinstance(receita[campo], _TIPOS_JSON.get(tipo, object)):
+                raise ReceitaInvalida(f"Campo '{campo}' não é do tipo {tipo}")
+        vazios = [campo for campo in CAMPOS_OBRIGATORIOS_NAO_VAZIOS if not receita[campo]]
+        if vazios:
+            raise ReceitaInvalida(f"Campos obrigatórios vazios: {', '.join(vazios)}")
+        return receita
@@ -0,0 +1,235 @@
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+# Nomes de tabela e coluna aceitos (evita injeção no SQL e nos caminhos JSON)
+_RE_IDENTIFICADOR = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# Operadores do PostgREST suportados em filter() e or_()
+_OPERADORES = {
+    'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<=',
+    'like': 'like', 'ilike': 'ilike'
+}
+
+
+def _identificador(nome: str) -> str:
+    if not _RE_IDENTIFICADOR.match(nome):
+        raise ValueError(f"Identificador inválido: {nome!r}")
+    return nome
+
+
+def _padrao_like(padrao: str, flags: int = 0) -> 're.Pattern':
+    """Converte um padrão LIKE (% e _) em expressão regular"""
+    partes = (re.escape(c) if c not in '%_' else ('.*' if c == '%' else '.') for c in padrao)
+    return re.compile('^' + ''.join(partes) + '$', flags | re.DOTALL)
+
+
+def _like(valor: Any, padrao: str) -> bool:
+    return valor is not None and bool(_padrao_like(padrao).match(str(valor)))
+
+
+def _ilike(valor: Any, padrao: str) -> bool:
+    # Como o ILIKE do Postgres: sem diferenciar maiúsculas também fora do ASCII (ex.: "PÃO" e "pão")
+    return valor is not None and bool(_padrao_like(padrao, re.IGNORECASE).match(str(valor)))
+
+
+class RespostaFake:
+    """Resposta no formato do supabase-py (APIResponse): os registros ficam em .data"""
+
+    def __init__(self, data: List[Dict], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class ConsultaFake:
+    """Subconjunto do query builder do supabase-py (PostgREST), executado no SQLite"""
+
+    def __init__(self, cliente: 'ClienteSupabaseFake', tabela: str):
+        self._cliente = cliente
+        self._tabela = _identificador(tabela)
+        self._operacao = 'select'
+        self._colunas: Optional[List[str]] = None
+        self._linhas: List[Dict] = []
+        self._on_conflict: Optional[str] = None
+        self._filtros: List[Tuple[str, List[Any]]] = []
+        self._limite: Optional[int] = None
+
+    # Operações
+    def select(self, colunas: str = '*') -> 'ConsultaFake':
+        self._operacao = 'select'
+        colunas = colunas.strip()
+        if colunas != '*':
+            self._colunas = [_identificador(c.strip()) for c in colunas.split(',') if c.strip()]
+        return self
+
+    def insert(self, linhas: Union[Dict, List[Dict]]) -> 'ConsultaFake':
+        self._operacao = 'insert'
+        self._linhas = [linhas] if isinstance(linhas, dict) else list(linhas)
+        return self
+
+    def upsert(self, linhas: Union[Dict, List[Dict]], on_conflict: str = 'id') -> 'ConsultaFake':
+        self.insert(linhas)
+        self._operacao = 'upsert'
+        self._on_conflict = on_conflict
+        return self
+
+    def delete(self) -> 'ConsultaFake':
+        self._operacao = 'delete'
+        return self
+
+    # Filtros
+    def filter(self, coluna: str, operador: str, valor: Any) -> 'ConsultaFake':
+        self._filtros.append(self._condicao(coluna, operador, valor))
+        return self
+
+    def eq(self, coluna: str, valor: Any) -> 'ConsultaFake':
+        return self.filter(coluna, 'eq', valor)
+
+    def neq(self, coluna: str, valor: Any) -> 'ConsultaFake':
+        return self.filter(coluna, 'neq', valor)
+
+    def gt(self, coluna: str, valor: Any) -> 'ConsultaFake':
+        return self.filter(coluna, 'gt', valor)
+
+    def gte(self, coluna: str, valor: Any) -> 'ConsultaFake':
+        return self.filter(coluna, 'gte', valor)
+
+    def lt(self, coluna: str, valor: Any) -> 'ConsultaFake':
+        return self.filter(coluna, 'lt', valor)
+
+    def lte(self, coluna: str, valor: Any) -> 'ConsultaFake':
+        return self.filter(coluna, 'lte', valor)
+
+    def like(self, coluna: str, padrao: str) -> 'ConsultaFake':
+        return self.filter(coluna, 'like', padrao)
+
+    def ilike(self, coluna: str, padrao: str) -> 'ConsultaFake':
+        return self.filter(coluna, 'ilike', padrao)
+
+    def or_(self, filtros: str) -> 'ConsultaFake':
+        """Filtro OR no formato do PostgREST: "coluna.operador.valor,coluna.operador.valor" """
+        condicoes = []
+        for filtro in filtros.split(','):
+            coluna, operador, valor = filtro.split('.', 2)
+            condicoes.append(self._condicao(coluna, operador, valor))
+        sql = '(' + ' or '.join(c for c, _ in condicoes) + ')'
+        self._filtros.append((sql, [p for _, params in condicoes for p in params]))
+        return self
+
+    def limit(self, quantidade: int) -> 'ConsultaFake':
+        self._limite = quantidade
+        return self
+
+    def _condicao(self, coluna: str, operador: str, valor: Any) -> Tuple[str, List[Any]]:
+        if operador not in _OPERADORES:
+            raise ValueError(f"Operador não suportado: {operador}")
+        campo = f"json_extract(dados, '$.{_identificador(coluna)}')"
+        if operador in ('like', 'ilike'):
+            return f"{operador}_fake({campo}, ?)", [valor]
+        return f"{campo} {_OPERADORES[operador]} ?", [valor]
+
+    def execute(self) -> RespostaFake:
+        self._cliente._simular_latencia()
+        with self._cliente._lock, self._cliente._conexao as conexao:
+            self._cliente._garantir_tabela(self._tabela)
+            if self._operacao in ('insert', 'upsert'):
+                return RespostaFake(self._gravar(conexao))
+
+            where = ' and '.join(c for c, _ in self._filtros) or '1'
+            params = [p for _, ps in self._filtros for p in ps]
+            if self._operacao == 'delete':
+                linhas = conexao.execute(
+                    f'select dados from "{self._tabela}" where {where}', params
+                ).fetchall()
+                conexao.execute(f'delete from "{self._tabela}" where {where}', params)
+                return RespostaFake([json.loads(l[0]) for l in linhas])
+
+            sql = f'select dados from "{self._tabela}" where {where} order by seq'
+            if self._limite is not None:
+                sql += f' limit {int(self._limite)}'
+            linhas = [json.loads(l[0]) for l in conexao.execute(sql, params)]
+            if self._colunas:
+                linhas = [{c: linha.get(c) for c in self._colunas} for linha in linhas]
+            return RespostaFake(linhas)
+
+    def _gravar(self, conexao: sqlite3.Connection) -> List[Dict]:
+        """
+        Insere as linhas, preenchendo id e created_at como os defaults da tabela no Supabase.
+        No upsert de um id existente, como no PostgREST, só as colunas enviadas mudam
+        """
+        if self._on_conflict not in (None, 'id'):
+            raise ValueError("O fake só suporta on_conflict='id'")
+        gravadas = []
+        for linha in self._linhas:
+            existente = None
+            if self._operacao == 'upsert' and linha.get('id') is not None:
+                existente = conexao.execute(
+                    f'select dados from "{self._tabela}" where id = ?', (linha['id'],)
+                ).fetchone()
+            if existente:
+                registro = {**json.loads(existente[0]), **linha}
+            else:
+                registro = {
+                    'id': str(uuid.uuid4()),
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                    **linha
+                }
+            dados = json.dumps(registro, ensure_ascii=False)
+            if self._operacao == 'upsert':
+                conexao.execute(
+                    f'insert into "{self._tabela}" (id, dados) values (?, ?) '
+                    'on conflict(id) do update set dados = excluded.dados',
+                    (registro['id'], dados)
+                )
+            else:
+                conexao.execute(f'insert into "{self._tabela}" (id, dados) values (?, ?)',
+                                (registro['id'], dados))
+            gravadas.append(registro)
+        return gravadas
+
+
+class ClienteSupabaseFake:
+    """
+    Substituto local do cliente supabase-py para testes e benchmarks sem rede.
+    Guarda cada tabela no SQLite (registros em JSON) e, opcionalmente, simula a
+    latência de rede em cada execute().
+    """
+
+    def __init__(self, caminho: str = ':memory:', latencia: float = 0.0, variacao: float = 0.0):
+        self.caminho = caminho
+        self.latencia = latencia
+        self.variacao = variacao
+        # Identifica o "projeto" (usado como chave do índice em memória do ReceitasDB)
+        self.supabase_url = f"fake-supabase://{uuid.uuid4().hex}"
+        self.execucoes = 0
+        self._lock = threading.Lock()
+        self._tabelas: Set[str] = set()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.create_function('like_fake', 2, _like, deterministic=True)
+        self._conexao.create_function('ilike_fake', 2, _ilike, deterministic=True)
+
+    def table(self, nome: str) -> ConsultaFake:
+        return ConsultaFake(self, nome)
+
+    def _garantir_tabela(self, nome: str) -> None:
+        if nome not in self._tabelas:
+            self._conexao.execute(
+                f'create table if not exists "{nome}" '
+                '(seq integer primary key autoincrement, id text unique not null, dados text not null)'
+            )
+            self._tabelas.add(nome)
+
+    def _simular_latencia(self) -> None:
+        self.execucoes += 1
+        atraso = self.latencia + (random.uniform(0, self.variacao) if self.variacao else 0.0)
+        if atraso > 0:
+            time.sleep(atraso)
+
+    def fechar(self) -> None:
+        self._conexao.close()
@@ -0,0 +1,41 @@
+import pytest
+from cache_respostas import CacheRespostas, gerar_chave
+
+@pytest.fixture
+def cache(tmp_path):
+    """Fixture que cria um cache de respostas temporário"""
+    cache = CacheRespostas(str(tmp_path / "cache.db"), max_entradas=3)
+    yield cache
+    cache.fechar()
+
+def test_gravar_e_obter(cache):
+    """Testa que a resposta gravada é devolvida pela mesma chave"""
+    chave = gerar_chave("homus", "modelo", {"temperature": 0.85})
+    assert cache.obter(chave) is None
+    cache.gravar(chave, "Receita de homus")
+    assert cache.obter(chave) == "Receita de homus"
+    assert (cache.acertos, cache.falhas) == (1, 1)
+
+def test_chave_depende_do_modelo_e_parametros():
+    """Testa que modelo, parâmetros e contexto fazem parte da chave"""
+    base = gerar_chave("homus", "modelo", {"temperature": 0.85})
+    assert base == gerar_chave("homus", "modelo", {"temperature": 0.85})
+    assert base != gerar_chave("homus", "outro", {"temperature": 0.85})
+    assert base != gerar_chave("homus", "modelo", {"temperature": 0.2})
+    assert base != gerar_chave("homus", "modelo", {"temperature": 0.85}, contexto="sistema")
+
+def test_ttl(tmp_path):
+    """Testa que respostas expiradas não são devolvidas"""
+    cache = CacheRespostas(str(tmp_path / "cache.db"), ttl=-1)
+    cache.gravar("chave", "resposta")
+    assert cache.obter("chave") is None
+    cache.fechar()
+
+def test_remocao_lru(cache):
+    """Testa que as entradas menos acessadas são removidas ao exceder o limite"""
+    for chave in ("a", "b", "c"):
+        cache.gravar(chave, chave)
+    cache.obter("a")
+    cache.gravar("d", "d")
+    assert cache.obter("b") is None
+    assert [cache.obter(chave) for chave in ("a", "c", "d")] == ["a", "c", "d"]
@@ -0,0 +1,64 @@
+import pytest
+from cache_semantico import CacheSemantico, EmbedderHash, criar_embedder
+
+@pytest.fixture
+def cache():
+    """Fixture com o cache semântico usando o embedding por hashing (sem rede)"""
+    return CacheSemantico(EmbedderHash(), limiar=0.85, capacidade=2)
+
+def test_embedder_hash_deterministico():
+    """Testa que o embedding é estável e normalizado"""
+    embedder = EmbedderHash()
+    vetor = embedder("Receita de homus")
+    assert (vetor == embedder("Receita de homus")).all()
+    assert abs(float(vetor @ vetor) - 1.0) < 1e-5
+
+def test_acerto_por_parafrase(cache):
+    """Testa que prompts parafraseados reaproveitam a resposta"""
+    cache.gravar("receita de homus", "Homus da Chef")
+    assert cache.buscar("Tem receita de homus?") == "Homus da Chef"
+    assert cache.buscar("risoto de gorgonzola") is None
+    metricas = cache.metricas()
+    assert (metricas["consultas"], metricas["acertos"], metricas["falhas"]) == (2, 1, 1)
+    assert metricas["taxa_acerto"] == 0.5
+
+def test_namespace_separa_contextos(cache):
+    """Testa que respostas de outro contexto/modelo não são devolvidas"""
+    cache.gravar("receita de homus", "Homus da Chef", namespace="a")
+    assert cache.buscar("receita de homus", namespace="b") is None
+    assert cache.buscar("receita de homus", namespace="a") == "Homus da Chef"
+
+def test_remocao_lru(cache):
+    """Testa que o prompt menos usado é removido quando o cache enche"""
+    cache.gravar("receita de homus", "homus")
+    cache.gravar("bolo de chocolate", "bolo")
+    cache.buscar("receita de homus")
+    cache.gravar("risoto de gorgonzola", "risoto")
+    assert len(cache) == 2
+    assert cache.metricas()["remocoes"] == 1
+    assert cache.buscar("bolo de chocolate") is None
+    assert cache.buscar("receita de homus") == "homus"
+
+@pytest.mark.parametrize("gravado,consultado", [
+    ("pão sem glúten", "pão com glúten"),
+    ("bolo vegano de chocolate", "bolo de chocolate"),
+    ("torta de frango low carb", "torta de frango"),
+    ("brownie sem açúcar", "brownie"),
+])
+def test_negacao_e_dieta_nao_reaproveitam(gravado, consultado):
+    """Testa que negações e restrições alimentares diferentes nunca dão acerto"""
+    cache = CacheSemantico(EmbedderHash(), limiar=0.5)
+    cache.gravar(gravado, "resposta")
+    assert cache.buscar(consultado) is None
+    assert cache.buscar(gravado) == "resposta"
+
+def test_criar_embedder_usa_hashing_por_padrao():
+    """Testa que o modelo local só é carregado com opt-in explícito"""
+    assert isinstance(criar_embedder(), EmbedderHash)
+
+def test_ingrediente_a_mais_nao_reaproveita():
+    """Testa que, com o embedding por hashing, um ingrediente a mais no pedido não dá acerto"""
+    cache = CacheSemantico(EmbedderHash())
+    cache.gravar("frango ao molho de mostarda", "Frango com mostarda")
+    assert cache.buscar("frango ao molho de mostarda e mel") is None
+    assert cache.buscar("Tem receita de frango ao molho de mostarda?") == "Frango com mostarda"
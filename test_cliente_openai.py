@@ -0,0 +1,69 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import pytest
+from cliente_openai import ClienteOpenAI
+
+def resposta_chat(conteudo):
+    """Corpo de uma resposta de chat.completions com o conteúdo informado"""
+    return {
+        "id": "chatcmpl-teste", "object": "chat.completion", "created": 0, "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": conteudo}}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}
+    }
+
+@pytest.fixture
+def servidor():
+    """Transporte simulado que registra o pico de requisições simultâneas"""
+    estado = {"ativas": 0, "pico": 0}
+
+    async def responder(request):
+        estado["ativas"] += 1
+        estado["pico"] = max(estado["pico"], estado["ativas"])
+        await asyncio.sleep(0.05)
+        estado["ativas"] -= 1
+        corpo = json.loads(request.content)
+        if corpo.get("stream"):
+            eventos = "".join(
+                "data: " + json.dumps({
+                    "id": "chatcmpl-teste", "object": "chat.completion.chunk", "created": 0,
+                    "model": "gpt-4o-mini",
+                    "choices": [{"index": 0, "delta": {"content": trecho}, "finish_reason": None}]
+                }) + "\n\n"
+                for trecho in ("Olá", ", ", "chef")
+            ) + "data: [DONE]\n\n"
+            return httpx.Response(200, text=eventos, headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json=resposta_chat(corpo["messages"][-1]["content"]))
+
+    estado["transport"] = httpx.MockTransport(responder)
+    return estado
+
+def test_chamada_sincrona_e_streaming(servidor):
+    """Testa a interface síncrona sobre o cliente assíncrono, com e sem streaming"""
+    cliente = ClienteOpenAI("sk-teste", transport=servidor["transport"])
+    try:
+        mensagens = [{"role": "user", "content": "bolo"}]
+        resposta = cliente.chat.completions.create(model="gpt-4o-mini", messages=mensagens)
+        assert resposta.choices[0].message.content == "bolo"
+        assert resposta.usage.completion_tokens == 2
+
+        stream = cliente.chat.completions.create(model="gpt-4o-mini", messages=mensagens, stream=True)
+        assert "".join(c.choices[0].delta.content for c in stream) == "Olá, chef"
+    finally:
+        cliente.fechar()
+
+def test_limite_de_geracoes_simultaneas(servidor):
+    """Testa que o semáforo limita as chamadas em andamento"""
+    cliente = ClienteOpenAI("sk-teste", max_simultaneas=2, transport=servidor["transport"])
+    try:
+        def chamar(i):
+            return cliente.criar(model="gpt-4o-mini", messages=[{"role": "user", "content": str(i)}])
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            respostas = list(executor.map(chamar, range(6)))
+        assert [r.choices[0].message.content for r in respostas] == [str(i) for i in range(6)]
+        assert servidor["pico"] == 2
+    finally:
+        cliente.fechar()
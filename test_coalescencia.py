@@ -0,0 +1,72 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from coalescencia import SingleFlight
+
+def test_chamadas_simultaneas_compartilham_resultado():
+    """Testa que chamadas concorrentes com a mesma chave executam a função uma única vez"""
+    grupo = SingleFlight()
+    chamadas = []
+    liberar = threading.Event()
+
+    def buscar(query):
+        chamadas.append(query)
+        liberar.wait(2)
+        return [query.upper()]
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futuros = [executor.submit(grupo.executar, "bolo", buscar, "bolo") for _ in range(5)]
+        while grupo.compartilhadas < 4:
+            time.sleep(0.01)
+        liberar.set()
+        resultados = [f.result() for f in futuros]
+
+    assert chamadas == ["bolo"]
+    assert all(r == ["BOLO"] for r in resultados)
+    assert grupo.execucoes == 1 and grupo.compartilhadas == 4
+    assert grupo.em_andamento() == 0
+
+def test_excecao_propagada_e_nova_execucao():
+    """Testa que a exceção chega a todos e que a chave é liberada após a execução"""
+    grupo = SingleFlight()
+
+    def falhar():
+        raise ValueError("falhou")
+
+    with pytest.raises(ValueError):
+        grupo.executar("chave", falhar)
+    assert grupo.executar("chave", lambda: 42) == 42
+    assert grupo.executar("outra", lambda: 7) == 7
+    assert grupo.execucoes == 3
+
+def test_interrupcao_do_lider_nao_chega_a_quem_aguarda():
+    """Testa que uma BaseException do líder (ex.: st.stop) faz quem aguarda executar a função"""
+    class Interrupcao(BaseException):
+        pass
+
+    grupo = SingleFlight()
+    liberar = threading.Event()
+    chamadas = []
+
+    def buscar(query):
+        chamadas.append(query)
+        if len(chamadas) == 1:
+            liberar.wait(2)
+            raise Interrupcao()
+        return [query.upper()]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        lider = executor.submit(grupo.executar, "bolo", buscar, "bolo")
+        while not chamadas:
+            time.sleep(0.01)
+        seguidor = executor.submit(grupo.executar, "bolo", buscar, "bolo")
+        while grupo.compartilhadas < 1:
+            time.sleep(0.01)
+        liberar.set()
+        with pytest.raises(Interrupcao):
+            lider.result()
+        assert seguidor.result() == ["BOLO"]
+
+    assert chamadas == ["bolo", "bolo"]
+    assert grupo.em_andamento() == 0
@@ -1,13 +1,16 @@
 import pytest
 import os
 from database_supabase import ReceitasDB, DatabaseError
+from supabase_fake import ClienteSupabaseFake
 import streamlit as st
 
 @pytest.fixture
 def test_db():
-    """Fixture que cria uma instância de teste do ReceitasDB"""
-    db = ReceitasDB()
+    """Fixture que cria uma instância de teste do ReceitasDB sobre o Supabase local (fake)"""
+    cliente = ClienteSupabaseFake()
+    db = ReceitasDB(cliente=cliente)
     yield db
+    cliente.fechar()
 
 @pytest.fixture(autouse=True)
 def clean_db(test_db):
@@ -116,4 +119,97 @@ def test_buscar_receita_por_id(test_db):
     receita_id = receitas[0]["id"]
     receita_por_id = test_db.buscar_receita_por_id(receita_id)
     assert receita_por_id is not None
-    assert receita_por_id["titulo"] == "TESTE BUSCA ID" 
\ No newline at end of file
+    assert receita_por_id["titulo"] == "TESTE BUSCA ID" 
+
+def test_supabase_fake_query_builder():
+    """Testa o subconjunto do query builder do supabase-py usado pelo ReceitasDB"""
+    cliente = ClienteSupabaseFake()
+    tabela = lambda: cliente.table('receitas')
+    tabela().insert([{"titulo": "PÃO DE QUEIJO", "ingredientes": "Polvilho\nQueijo"},
+                     {"titulo": "BOLO", "ingredientes": "Farinha"}]).execute()
+
+    assert len(tabela().select('*').ilike('titulo', '%pão%').execute().data) == 1
+    assert tabela().select('*').filter('titulo', 'like', '%pão%').execute().data == []
+    resumo = tabela().select('id,titulo').or_('titulo.ilike.%bolo%,ingredientes.ilike.%queijo%').execute()
+    assert sorted(r["titulo"] for r in resumo.data) == ["BOLO", "PÃO DE QUEIJO"]
+    assert set(resumo.data[0]) == {"id", "titulo"}
+
+    receita_id = resumo.data[0]["id"]
+    original = tabela().select('*').eq('id', receita_id).execute().data[0]
+    tabela().upsert({"id": receita_id, "titulo": "BOLO NOVO"}, on_conflict='id').execute()
+    # Como no PostgREST, o upsert só altera as colunas enviadas
+    atualizada = tabela().select('*').eq('id', receita_id).execute().data[0]
+    assert atualizada == {**original, "titulo": "BOLO NOVO"}
+    assert len(tabela().select('*').limit(1).execute().data) == 1
+
+    tabela().delete().gte('created_at', '2000-01-01').execute()
+    assert tabela().select('*').execute().data == []
+    cliente.fechar()
+
+def test_busca_ranqueada_repete_falhas_transitorias(test_db, tmp_path, monkeypatch):
+    """Testa que a busca do chat repete a chamada ao Supabase e anota as tentativas no span"""
+    import json
+    from tenacity import wait_none
+    from rastreamento import configurar_rastreamento
+
+    assert test_db.adicionar_receita({"titulo": "Bolo de Cenoura", "ingredientes": ["Cenoura"]})
+    monkeypatch.setattr(ReceitasDB._ranquear.retry, "wait", wait_none())
+
+    # O índice e a busca remota falham na primeira tentativa
+    falhas = []
+    table = test_db.supabase.table
+    def table_instavel(nome):
+        if len(falhas) < 2:
+            falhas.append(nome)
+            raise ConnectionError("instável")
+        return table(nome)
+    monkeypatch.setattr(test_db.supabase, "table", table_instavel)
+
+    caminho = tmp_path / "traces.jsonl"
+    configurar_rastreamento("arquivo", str(caminho))
+    try:
+        resultados = test_db.buscar_receitas_ranqueadas("cenoura")
+    finally:
+        configurar_rastreamento(None)
+
+    assert [r["titulo"] for r, _ in resultados] == ["BOLO DE CENOURA"]
+    spans = [json.loads(linha) for linha in caminho.read_text(encoding="utf-8").splitlines()]
+    busca = next(s for s in spans if s["name"] == "db.buscar_receitas_ranqueadas")
+    assert busca["attributes"]["db.retentativas"] == 1
+
+def test_busca_remota_usa_a_query_limpa(test_db, monkeypatch):
+    """Testa que, sem o índice em memória, o Supabase é consultado com os termos da query limpa"""
+    assert test_db.adicionar_receita({"titulo": "Homus de Beterraba", "ingredientes": ["Grão de bico"]})
+
+    def sem_indice():
+        raise ConnectionError("índice indisponível")
+    monkeypatch.setattr(test_db, "obter_indice", sem_indice)
+
+    assert [r["titulo"] for r in test_db.buscar_receitas_por_texto("como fazer homus?")] == ["HOMUS DE BETERRABA"]
+    resultados = test_db.buscar_receitas_ranqueadas("homus com beterraba")
+    assert [r["titulo"] for r, _ in resultados] == ["HOMUS DE BETERRABA"]
+
+def test_buscas_com_supabase_fora_do_ar_falham_rapido(test_db, monkeypatch):
+    """Testa que, com o Supabase fora do ar, cada busca tenta poucas vezes e sem esperas longas"""
+    import time
+    from database_supabase import TENTATIVAS_BUSCA
+
+    chamadas = []
+    def fora_do_ar(nome):
+        chamadas.append(nome)
+        raise ConnectionError("fora do ar")
+    monkeypatch.setattr(test_db.supabase, "table", fora_do_ar)
+
+    buscas = [
+        lambda: test_db.buscar_receitas("bolo"),
+        lambda: test_db.buscar_receitas_ranqueadas("bolo"),
+        lambda: test_db.buscar_receitas_aproximadas("bolo"),
+        lambda: test_db.buscar_receitas_por_texto("bolo"),
+        lambda: test_db.buscar_resumos("bolo"),
+    ]
+    inicio = time.perf_counter()
+    for buscar in buscas:
+        chamadas.clear()
+        assert buscar() == []
+        assert len(chamadas) >= TENTATIVAS_BUSCA
+    assert time.perf_counter() - inicio < 2.0
@@ -0,0 +1,130 @@
+import pytest
+from database import SQLiteDB
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Fixture que cria um banco SQLite temporário"""
+    db = SQLiteDB(str(tmp_path / "receitas_teste.db"))
+    yield db
+    db.fechar()
+
+@pytest.fixture
+def receitas_teste():
+    """Fixture com receitas no formato do chat"""
+    return [
+        {
+            "titulo": "Pão de Queijo Mineiro",
+            "ingredientes": ["Polvilho", "Queijo", "Ovo"],
+            "modo_preparo": ["Misture tudo", "Asse"],
+            "dicas": ["Use queijo meia cura"]
+        },
+        {
+            "titulo": "Bolo de Limão",
+            "descricao": "Bolo fofinho e cítrico",
+            "ingredientes": ["Farinha", "Açúcar", "Limões"],
+            "modo_preparo": ["Misture", "Asse"],
+            "informacoes_nutricionais": {"calorias": 250}
+        }
+    ]
+
+def test_adicionar_e_buscar_por_id(test_db, receitas_teste):
+    """Testa a adição e a busca por ID com todas as colunas do Supabase"""
+    assert test_db.adicionar_receita(receitas_teste[1]) == True
+
+    receitas = test_db.buscar_receitas("BOLO")
+    assert len(receitas) == 1
+    receita = test_db.buscar_receita_por_id(receitas[0]["id"])
+    assert receita["titulo"] == "BOLO DE LIMÃO"
+    assert receita["ingredientes"] == ["Farinha", "Açúcar", "Limões"]
+    assert receita["informacoes_nutricionais"]["calorias"] == 250.0
+
+def test_buscar_receitas_fts(test_db, receitas_teste):
+    """Testa a busca FTS5 sem acentos, por prefixo e com fallback de campos"""
+    for receita in receitas_teste:
+        test_db.adicionar_receita(receita)
+
+    assert [r["titulo"] for r in test_db.buscar_receitas("limao")] == ["BOLO DE LIMÃO"]
+    assert [r["titulo"] for r in test_db.buscar_receitas("QUEIJ")] == ["PÃO DE QUEIJO MINEIRO"]
+    # "polvilho" só aparece nos ingredientes
+    assert [r["titulo"] for r in test_db.buscar_receitas("polvilho")] == ["PÃO DE QUEIJO MINEIRO"]
+    assert len(test_db.buscar_receitas("")) == 2
+
+def test_buscar_receitas_ranqueadas(test_db, receitas_teste):
+    """Testa o ranqueamento BM25 do FTS5"""
+    for receita in receitas_teste:
+        test_db.adicionar_receita(receita)
+
+    resultados = test_db.buscar_receitas_ranqueadas("queijo limão")
+    assert len(resultados) == 2
+    assert all(score > 0 for _, score in resultados)
+    assert test_db.buscar_receitas_ranqueadas("queijo", limite=1)[0][0]["titulo"] == "PÃO DE QUEIJO MINEIRO"
+
+def test_buscar_receitas_aproximadas(test_db, receitas_teste):
+    """Testa a busca tolerante a erros de digitação e a invalidação do índice"""
+    test_db.adicionar_receita(receitas_teste[0])
+    assert test_db.buscar_receitas_aproximadas("limao") == []
+
+    test_db.adicionar_receita(receitas_teste[1])
+    resultados = test_db.buscar_receitas_aproximadas("limaoo")
+    assert [r["titulo"] for r, _ in resultados] == ["BOLO DE LIMÃO"]
+
+def test_limpar_banco(test_db, receitas_teste):
+    """Testa a limpeza do banco"""
+    test_db.adicionar_receita(receitas_teste[0])
+    assert test_db.limpar_banco() == True
+    assert test_db.exportar_receitas() == []
+
+def test_buscar_resumos(test_db, receitas_teste):
+    """Testa o modo de listagem com apenas as colunas da prévia"""
+    for receita in receitas_teste:
+        test_db.adicionar_receita(receita)
+
+    resumos = test_db.buscar_resumos("limão")
+    assert len(resumos) == 1
+    assert resumos[0]["titulo"] == "BOLO DE LIMÃO"
+    assert resumos[0]["preview_ingredientes"] == ["Farinha", "Açúcar", "Limões"]
+    assert resumos[0]["total_ingredientes"] == 3
+    assert "modo_preparo" not in resumos[0]
+
+    # Sem resultado exato, cai na busca aproximada
+    assert [r["titulo"] for r in test_db.buscar_resumos("polvilio")] == ["PÃO DE QUEIJO MINEIRO"]
+
+def test_adicionar_receitas_em_lote(test_db, receitas_teste):
+    """Testa a inserção em lote com relatório de falhas por linha"""
+    receitas = receitas_teste + [{"titulo": ""}] + receitas_teste
+    relatorio = test_db.adicionar_receitas_em_lote(receitas, batch_size=2)
+
+    assert relatorio["total"] == 5
+    assert relatorio["sucesso"] == 4
+    assert [f["indice"] for f in relatorio["falhas"]] == [2]
+    assert len(test_db.exportar_receitas()) == 4
+    assert len(test_db.buscar_receitas("limao")) == 2
+
+def test_busca_fts_com_radicais(test_db, receitas_teste):
+    """Testa que singular e plural se encontram, como no índice em memória"""
+    for receita in receitas_teste:
+        test_db.adicionar_receita(receita)
+
+    # "limões" acha o título "Limão"; "ovos" acha o ingrediente "Ovo"
+    assert [r["titulo"] for r in test_db.buscar_receitas("limões")] == ["BOLO DE LIMÃO"]
+    assert [r["titulo"] for r in test_db.buscar_receitas("ovos")] == ["PÃO DE QUEIJO MINEIRO"]
+    assert len(test_db.buscar_receitas_ranqueadas("pães")) == 1
+
+    # Remoções e atualizações usam os mesmos radicais no índice
+    assert test_db.limpar_banco() == True
+    assert test_db.buscar_receitas("limões") == []
+
+def test_pool_de_conexoes_limitado(tmp_path, receitas_teste):
+    """Testa que as conexões são reaproveitadas entre threads (uma por rerun no Streamlit)"""
+    import threading
+    db = SQLiteDB(str(tmp_path / "pool.db"), tamanho_pool=2)
+    db.adicionar_receita(receitas_teste[1])
+
+    for _ in range(10):
+        thread = threading.Thread(target=db.buscar_receitas, args=("limao",))
+        thread.start()
+        thread.join()
+
+    assert db._abertas <= 2
+    db.fechar()
+    assert db._abertas == 0
@@ -0,0 +1,82 @@
+import os
+import pytest
+from database import SQLiteDB
+from import_md import import_recipes, parse_markdown_recipe
+
+RECEITA_MD = """# Focaccia Caprese
+
+## Ingredientes
+- Farinha de trigo (500g)
+- Água morna (420ml)
+
+## Modo de preparo
+1. Misture tudo.
+
+2. Asse por 25 min.
+"""
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Fixture que cria um banco SQLite temporário"""
+    db = SQLiteDB(str(tmp_path / "receitas_teste.db"))
+    yield db
+    db.fechar()
+
+def test_parse_markdown_recipe():
+    """Testa a conversão do Markdown para o formato de receita"""
+    receita = parse_markdown_recipe(RECEITA_MD)
+    assert receita["titulo"] == "Focaccia Caprese"
+    assert receita["ingredientes"] == "Farinha de trigo (500g)\nÁgua morna (420ml)"
+    assert receita["modo_preparo"] == "Misture tudo.\nAsse por 25 min."
+
+def test_importacao_incremental(tmp_path, test_db):
+    """Testa que só arquivos novos ou alterados são importados, sem duplicar receitas"""
+    pasta = tmp_path / "receitas"
+    pasta.mkdir()
+    manifesto = str(tmp_path / "manifesto.json")
+    arquivo = pasta / "focaccia.md"
+    arquivo.write_text(RECEITA_MD, encoding="utf-8")
+
+    import_recipes(str(pasta), manifesto, test_db)
+    assert len(test_db.exportar_receitas()) == 1
+
+    # Sem alterações: nada é regravado
+    import_recipes(str(pasta), manifesto, test_db)
+    assert len(test_db.exportar_receitas()) == 1
+
+    # Conteúdo alterado: a mesma receita é atualizada
+    arquivo.write_text(RECEITA_MD.replace("Focaccia Caprese", "Focaccia de Tomate"), encoding="utf-8")
+    import_recipes(str(pasta), manifesto, test_db)
+    receitas = test_db.exportar_receitas()
+    assert [r["titulo"] for r in receitas] == ["FOCACCIA DE TOMATE"]
+
+def test_importacao_paralela(tmp_path, test_db):
+    """Testa o modo paralelo com pool de processos"""
+    pasta = tmp_path / "receitas"
+    pasta.mkdir()
+    for i in range(130):
+        (pasta / f"receita_{i}.md").write_text(RECEITA_MD.replace("Caprese", str(i)), encoding="utf-8")
+
+    import_recipes(str(pasta), str(tmp_path / "manifesto.json"), test_db, workers=2, batch_size=50)
+    assert len(test_db.exportar_receitas()) == 130
+
+def test_arquivo_sem_titulo_nao_e_reprocessado(tmp_path, test_db, monkeypatch):
+    """Testa que um arquivo sem título entra no manifesto e só é lido de novo se mudar"""
+    import import_md
+    pasta = tmp_path / "receitas"
+    pasta.mkdir()
+    manifesto = str(tmp_path / "manifesto.json")
+    arquivo = pasta / "rascunho.md"
+    arquivo.write_text("## Ingredientes\n- Farinha\n", encoding="utf-8")
+
+    import_recipes(str(pasta), manifesto, test_db)
+    assert "rascunho.md" in import_md.load_manifest(manifesto)
+
+    # Com o mtime alterado, o hash igual evita um novo parse
+    lidos = []
+    parse = import_md.parse_markdown_recipe
+    monkeypatch.setattr(import_md, "parse_markdown_recipe", lambda texto: lidos.append(texto) or parse(texto))
+    os.utime(arquivo, (1, 1))
+    import_recipes(str(pasta), manifesto, test_db)
+    assert lidos == []
+    assert test_db.exportar_receitas() == []
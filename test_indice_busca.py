@@ -0,0 +1,103 @@
+import pytest
+from indice_busca import IndiceInvertido, obter_indice, invalidar_indice
+
+@pytest.fixture
+def receitas():
+    """Fixture com um pequeno catálogo no formato do chat"""
+    return [
+        {
+            "id": "1",
+            "titulo": "PÃO DE QUEIJO MINEIRO",
+            "descricao": "Clássico da cozinha mineira",
+            "ingredientes": ["Polvilho", "Queijo", "Ovo"]
+        },
+        {
+            "id": "2",
+            "titulo": "BRIGADEIRO DE CHOCOLATE",
+            "descricao": "Doce de festa",
+            "ingredientes": ["Leite condensado", "Chocolate em pó"]
+        },
+        {
+            "id": "3",
+            "titulo": "BOLO SIMPLES",
+            "descricao": "Acompanha bem um chocolate quente",
+            "ingredientes": ["Farinha", "Açúcar", "Ovos"]
+        }
+    ]
+
+def test_busca_por_titulo(receitas):
+    """Testa a busca pelo título, com prefixo e sem diferenciar maiúsculas"""
+    indice = IndiceInvertido(receitas)
+    resultados = indice.buscar("queijo")
+    assert [r["id"] for r in resultados] == ["1"]
+    assert [r["id"] for r in indice.buscar("BRIGAD")] == ["2"]
+
+def test_busca_prioriza_campos_em_ordem(receitas):
+    """Testa que o título tem prioridade sobre ingredientes e descrição"""
+    indice = IndiceInvertido(receitas)
+    # "chocolate" aparece no título da 2 e na descrição da 3
+    assert [r["id"] for r in indice.buscar("chocolate")] == ["2"]
+    # "ovo" só aparece nos ingredientes
+    assert [r["id"] for r in indice.buscar("ovo")] == ["1", "3"]
+    # "festa" só aparece na descrição
+    assert [r["id"] for r in indice.buscar("festa")] == ["2"]
+
+def test_busca_vazia_retorna_tudo(receitas):
+    """Testa que a query vazia retorna o catálogo inteiro"""
+    indice = IndiceInvertido(receitas)
+    assert len(indice.buscar("")) == 3
+    assert indice.buscar("inexistente") == []
+
+def test_indice_compartilhado_e_invalidacao(receitas):
+    """Testa que o índice é reaproveitado até ser invalidado"""
+    chamadas = []
+
+    def carregar():
+        chamadas.append(1)
+        return receitas
+
+    invalidar_indice("teste")
+    assert obter_indice("teste", carregar) is obter_indice("teste", carregar)
+    assert len(chamadas) == 1
+
+    invalidar_indice("teste")
+    obter_indice("teste", carregar)
+    assert len(chamadas) == 2
+
+def test_ranqueamento_bm25(receitas):
+    """Testa que o ranqueamento pontua todos os campos e prioriza o título"""
+    indice = IndiceInvertido(receitas)
+    resultados = indice.ranquear("chocolate")
+    # Título pesa mais que descrição
+    assert [r["id"] for r, _ in resultados] == ["2", "3"]
+    assert resultados[0][1] > resultados[1][1] > 0
+
+def test_ranqueamento_limite(receitas):
+    """Testa que o top-k respeita o limite pedido"""
+    indice = IndiceInvertido(receitas)
+    assert len(indice.ranquear("ovo chocolate queijo", limite=2)) == 2
+    assert indice.ranquear("", limite=2) == []
+    assert indice.ranquear("chocolate", limite=0) == []
+
+def test_busca_ignora_acentos_e_plurais():
+    """Testa que indexação e consulta compartilham a mesma normalização"""
+    indice = IndiceInvertido([
+        {"id": "1", "titulo": "MOLHO DE LIMÃO", "ingredientes": ["Limões sicilianos"]},
+        {"id": "2", "titulo": "HOMUS DE GRÃO DE BICO", "ingredientes": ["Grãos cozidos"]}
+    ])
+    assert [r["id"] for r in indice.buscar("limao")] == ["1"]
+    assert [r["id"] for r in indice.buscar("Limões")] == ["1"]
+    assert [r["id"] for r in indice.buscar("grao de bico")] == ["2"]
+    assert [r["id"] for r, _ in indice.ranquear("GRAOS")] == ["2"]
+
+def test_busca_aproximada_por_trigramas():
+    """Testa a busca tolerante a erros de digitação e o limiar configurável"""
+    indice = IndiceInvertido([
+        {"id": "1", "titulo": "FOCACCIA CAPRESE", "ingredientes": ["Farinha de trigo (500g)"]},
+        {"id": "2", "titulo": "RISOTO DE PERA", "ingredientes": ["Queijo gorgonzola (50g)"]}
+    ])
+    assert [r["id"] for r, _ in indice.aproximadas("focacia")] == ["1"]
+    resultados = indice.aproximadas("gorgonzolla")
+    assert [r["id"] for r, _ in resultados] == ["2"]
+    assert 0.3 <= resultados[0][1] < 1.0
+    assert indice.aproximadas("gorgonzolla", limiar=0.95) == []
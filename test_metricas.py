@@ -0,0 +1,77 @@
+import urllib.request
+import pytest
+import metricas
+from metricas import (DURACAO_FUNCOES, ERROS_FUNCOES, RegistroMetricas, habilitar_metricas,
+                      iniciar_servidor_metricas, timed)
+
+@pytest.fixture
+def habilitadas():
+    """Liga as métricas durante o teste e restaura o estado anterior"""
+    anterior = metricas.metricas_habilitadas()
+    habilitar_metricas(True)
+    yield
+    habilitar_metricas(anterior)
+
+def test_timed_registra_duracao_e_erros(habilitadas):
+    """Testa que o @timed mede funções e geradores e conta as exceções"""
+    @timed(nome="teste_soma")
+    def somar(a, b):
+        return a + b
+
+    @timed(nome="teste_falha")
+    def falhar():
+        raise ValueError("falha")
+
+    @timed(nome="teste_gerador")
+    def gerar():
+        yield from range(3)
+
+    assert somar(1, 2) == 3
+    assert list(gerar()) == [0, 1, 2]
+    with pytest.raises(ValueError):
+        falhar()
+
+    series = DURACAO_FUNCOES.series()
+    assert series[(("funcao", "teste_soma"),)][2] == 1
+    assert series[(("funcao", "teste_gerador"),)][2] == 1
+    assert ERROS_FUNCOES.valor(funcao="teste_falha") == 1
+
+def test_timed_desligado_nao_mede():
+    """Testa que, com as métricas desligadas, a função é chamada sem registrar nada"""
+    habilitar_metricas(False)
+
+    @timed(nome="teste_desligado")
+    def dobrar(x):
+        return x * 2
+
+    assert dobrar(4) == 8
+    assert (("funcao", "teste_desligado"),) not in DURACAO_FUNCOES.series()
+
+def test_exportacao_prometheus_e_sidecar():
+    """Testa o formato de texto do Prometheus, o quantil estimado e o endpoint /metrics"""
+    registro = RegistroMetricas()
+    buscas = registro.contador("chef_buscas_total", "Buscas realizadas")
+    latencia = registro.histograma("chef_latencia_segundos", "Latência", buckets=(0.1, 1.0))
+    buscas.inc(tipo="chat")
+    buscas.inc(2, tipo="chat")
+    for valor in (0.05, 0.5, 0.5, 2.0):
+        latencia.observar(valor, etapa="busca")
+
+    texto = registro.exportar_prometheus()
+    assert "# TYPE chef_buscas_total counter" in texto
+    assert 'chef_buscas_total{tipo="chat"} 3' in texto
+    assert 'chef_latencia_segundos_bucket{etapa="busca",le="0.1"} 1' in texto
+    assert 'chef_latencia_segundos_bucket{etapa="busca",le="1.0"} 3' in texto
+    assert 'chef_latencia_segundos_bucket{etapa="busca",le="+Inf"} 4' in texto
+    assert 'chef_latencia_segundos_count{etapa="busca"} 4' in texto
+    assert 0.1 < latencia.quantil(0.5, etapa="busca") <= 1.0
+
+    servidor = iniciar_servidor_metricas(0, registro=registro)
+    try:
+        url = f"http://127.0.0.1:{servidor.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as resposta:
+            assert resposta.headers["Content-Type"].startswith("text/plain")
+            assert resposta.read().decode("utf-8") == texto
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
@@ -0,0 +1,49 @@
+import time
+import pytest
+from benchmarks.mock_openai import RECEITA_PADRAO, RESPOSTA_PADRAO, ServidorOpenAIMock
+from cliente_openai import ClienteOpenAI
+from receita_estruturada import RESPONSE_FORMAT_RECEITA, ParserReceitaIncremental
+
+@pytest.fixture
+def mock():
+    """Servidor mock com primeiro token em 0,2s e 200 tokens/s"""
+    with ServidorOpenAIMock(latencia=0.2, tokens_por_segundo=200) as servidor:
+        yield servidor
+
+@pytest.fixture
+def cliente(mock):
+    """Cliente do app apontado para o servidor mock"""
+    cliente = ClienteOpenAI(api_key="sk-teste", base_url=mock.base_url, http2=False)
+    yield cliente
+    cliente.fechar()
+
+def test_resposta_completa_e_uso(mock, cliente):
+    """Testa a resposta sem streaming: texto canônico, uso de tokens e tempo total"""
+    inicio = time.perf_counter()
+    resposta = cliente.chat.completions.create(
+        model="gpt-4o-mini", messages=[{"role": "user", "content": "Olá"}]
+    )
+    assert time.perf_counter() - inicio >= 0.2
+    assert resposta.choices[0].message.content == RESPOSTA_PADRAO
+    assert resposta.usage.completion_tokens > 0
+    assert mock.requisicoes == 1
+
+def test_stream_estruturado_com_ttft(cliente):
+    """Testa o stream SSE da receita em JSON, medindo o tempo até o primeiro token"""
+    inicio = time.perf_counter()
+    stream = cliente.chat.completions.create(
+        model="gpt-4o-mini", messages=[{"role": "user", "content": "homus"}],
+        stream=True, response_format=RESPONSE_FORMAT_RECEITA
+    )
+    parser = ParserReceitaIncremental()
+    primeiro_token = None
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            primeiro_token = primeiro_token or time.perf_counter() - inicio
+            parser.alimentar(chunk.choices[0].delta.content)
+    total = time.perf_counter() - inicio
+
+    assert parser.finalizar() == RECEITA_PADRAO
+    assert 0.2 <= primeiro_token < total
+    # Mais de 50 tokens a 200 tokens/s: a geração leva pelo menos 0,25s após o primeiro
+    assert total - primeiro_token >= 0.25
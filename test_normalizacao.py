@@ -0,0 +1,29 @@
+import pytest
+from normalizacao import dobrar, normalizar_consulta, radical, tokenizar
+
+def test_dobrar_remove_acentos_e_caixa():
+    """Testa a remoção de acentos, cedilha e diferenças de caixa"""
+    assert dobrar("Limão") == "limao"
+    assert dobrar("PÃO DE QUEIJO") == "pao de queijo"
+    assert dobrar("Maçã açaí") == "maca acai"
+    assert dobrar("homus") == "homus"
+    assert dobrar("") == ""
+
+@pytest.mark.parametrize("plural, singular", [
+    ("limoes", "limao"), ("paes", "pao"), ("flores", "flor"), ("colheres", "colher"),
+    ("nozes", "noz"), ("ovos", "ovo"), ("graos", "grao"), ("vegetais", "vegetal"),
+    ("pasteis", "pastel"), ("folhas", "folha"),
+])
+def test_radical_reduz_plurais(plural, singular):
+    """Testa a redução dos plurais comuns ao singular"""
+    assert radical(plural) == singular
+
+@pytest.mark.parametrize("palavra", ["tres", "pires", "lapis", "onibus", "tenis", "simples", "mes"])
+def test_radical_preserva_palavras_invariaveis(palavra):
+    """Testa que palavras terminadas em -s que não são plurais não perdem letras"""
+    assert radical(palavra) == palavra
+
+def test_consulta_e_indexacao_usam_o_mesmo_pipeline():
+    """Testa que a consulta memoizada gera os mesmos tokens da indexação"""
+    assert tokenizar("Três Limões e um lápis") == ["tres", "limao", "e", "um", "lapis"]
+    assert normalizar_consulta("três limões") == ("tres", "limao")
@@ -0,0 +1,38 @@
+from orcamento_tokens import ajustar_historico, compactar_prompt, contar_tokens, contar_tokens_mensagens
+
+def test_compactar_prompt():
+    """Testa a remoção de indentação, espaços repetidos e linhas em branco"""
+    prompt = """Você é a Chef.
+
+    ESPECIALIDADES:
+    -   Gastronomia    funcional
+
+    """
+    assert compactar_prompt(prompt) == "Você é a Chef.\nESPECIALIDADES:\n- Gastronomia funcional"
+
+def test_contar_tokens():
+    """Testa que a contagem cresce com o texto e inclui o custo das mensagens"""
+    assert contar_tokens("") == 0
+    assert 0 < contar_tokens("bolo") < contar_tokens("bolo de cenoura com cobertura de chocolate")
+    mensagens = [{"role": "user", "content": "bolo"}]
+    assert contar_tokens_mensagens(mensagens) > contar_tokens("bolo")
+
+def test_ajustar_historico_mantem_as_mais_recentes():
+    """Testa que o histórico descarta as mensagens mais antigas para caber no orçamento"""
+    historico = [
+        {"role": "user", "content": "receita de pão " * 200},
+        {"role": "assistant", "content": "Aqui está o pão"},
+        {"role": "user", "content": "e de bolo?"},
+        {"role": "system", "content": "ignorada"}
+    ]
+    ajustado = ajustar_historico(historico, orcamento=50)
+    assert [m["content"] for m in ajustado] == ["Aqui está o pão", "e de bolo?"]
+    assert ajustar_historico(historico, orcamento=0) == []
+
+def test_registrar_uso_aparece_com_log_raiz_em_error(caplog, monkeypatch):
+    """Testa que o uso de tokens é registrado mesmo com o log raiz em ERROR (como no app)"""
+    import logging
+    from orcamento_tokens import registrar_uso
+    monkeypatch.setattr(logging.getLogger(), "level", logging.ERROR)
+    registrar_uso(120, 30, 1.5)
+    assert "prompt=120 completion=30" in caplog.text
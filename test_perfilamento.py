@@ -0,0 +1,65 @@
+import json
+import time
+import pytest
+from perfilamento import AmostradorPilhas, PerfilExecucao
+
+def formatar_receitas(n):
+    """Trabalho de CPU que deve aparecer no topo do perfil"""
+    fim = time.perf_counter() + 0.15
+    texto = ""
+    while time.perf_counter() < fim:
+        texto = "".join(f"- ingrediente {i}\n" for i in range(n))
+    return texto
+
+def test_amostragem_grava_collapsed_e_speedscope(tmp_path):
+    """Testa os arquivos de pilhas colapsadas e do speedscope e o ranking das funções"""
+    with PerfilExecucao(str(tmp_path), "amostragem") as perfil:
+        formatar_receitas(200)
+
+    collapsed, speedscope = perfil.arquivos
+    assert collapsed.endswith(".collapsed.txt") and speedscope.endswith(".speedscope.json")
+    with open(collapsed, encoding="utf-8") as f:
+        linhas = f.read().splitlines()
+    assert any("test_amostragem_grava_collapsed_e_speedscope" in l and "formatar_receitas" in l for l in linhas)
+    assert all(int(l.rsplit(" ", 1)[1]) > 0 for l in linhas)
+
+    with open(speedscope, encoding="utf-8") as f:
+        dados = json.load(f)
+    perfil_ss = dados["profiles"][0]
+    assert perfil_ss["type"] == "sampled"
+    assert len(perfil_ss["samples"]) == len(perfil_ss["weights"])
+    assert 0.1 < perfil_ss["endValue"] <= perfil.duracao + 0.01
+
+    nomes = [f["funcao"] for f in perfil.funcoes_mais_lentas(limite=1000, ordem="total_ms")]
+    assert any(n.startswith("formatar_receitas ") for n in nomes)
+
+def test_cprofile_conta_chamadas(tmp_path):
+    """Testa o modo cProfile: arquivo .pstats e número de chamadas por função"""
+    def ajustar(valor):
+        return valor * 2
+
+    with PerfilExecucao(str(tmp_path), "cprofile") as perfil:
+        for i in range(50):
+            ajustar(i)
+
+    assert perfil.arquivos[0].endswith(".pstats")
+    funcoes = {f["funcao"].split(" ")[0]: f for f in perfil.funcoes_mais_lentas(limite=100)}
+    assert funcoes["ajustar"]["chamadas"] == 50
+
+def test_modo_invalido():
+    """Testa que um modo desconhecido é recusado"""
+    with pytest.raises(ValueError):
+        PerfilExecucao(modo="perf")
+
+def test_amostragem_descarta_intervalo_sem_quadro():
+    """Testa que o tempo sem a pilha da thread alvo não é somado à amostra seguinte"""
+    amostrador = AmostradorPilhas(intervalo=0.001)
+    amostrador.iniciar()
+    # Thread inexistente: as amostras deste trecho não encontram o quadro
+    alvo, amostrador._alvo = amostrador._alvo, -1
+    time.sleep(0.2)
+    amostrador._alvo = alvo
+    time.sleep(0.05)
+    amostrador.parar()
+
+    assert 0 < sum(amostrador.pilhas.values()) < 0.15
@@ -0,0 +1,76 @@
+import json
+import pytest
+from tenacity import retry, stop_after_attempt, wait_none
+from rastreamento import (SPAN_NULO, configurar_rastreamento, rastreado,
+                          registrar_retentativa, span, span_atual)
+
+@pytest.fixture
+def arquivo(tmp_path):
+    """Liga o exportador em arquivo durante o teste e desliga ao final"""
+    caminho = tmp_path / "traces.jsonl"
+    configurar_rastreamento("arquivo", str(caminho))
+    yield caminho
+    configurar_rastreamento(None)
+
+def ler_spans(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return {s["name"]: s for s in map(json.loads, f)}
+
+def test_spans_aninhados_no_arquivo(arquivo):
+    """Testa a hierarquia, os atributos e o status de erro dos spans exportados"""
+    @rastreado(nome="busca")
+    def buscar():
+        span_atual().set_attribute("busca.resultados", 3)
+        return ["homus"]
+
+    with span("chat.turno") as turno:
+        with span("classificar"):
+            turno.set_attribute("mensagem.tipo", "recipe_search")
+        buscar()
+        with pytest.raises(ValueError):
+            with span("llm"):
+                raise ValueError("timeout")
+
+    spans = ler_spans(arquivo)
+    raiz = spans["chat.turno"]
+    assert raiz["parent_span_id"] is None
+    assert raiz["attributes"] == {"mensagem.tipo": "recipe_search"}
+    for nome in ("classificar", "busca", "llm"):
+        assert spans[nome]["parent_span_id"] == raiz["span_id"]
+        assert spans[nome]["trace_id"] == raiz["trace_id"]
+    assert spans["busca"]["attributes"]["busca.resultados"] == 3
+    assert spans["llm"]["status"] == "erro"
+    assert raiz["duration_ms"] >= spans["busca"]["duration_ms"]
+
+def test_retentativas_do_tenacity(arquivo):
+    """Testa que o callback after do tenacity anota as tentativas que falharam"""
+    tentativas = []
+
+    @rastreado(nome="db.buscar_receitas")
+    @retry(stop=stop_after_attempt(3), wait=wait_none(), after=registrar_retentativa)
+    def buscar():
+        tentativas.append(1)
+        if len(tentativas) < 3:
+            raise ConnectionError("instável")
+        return []
+
+    buscar()
+    assert ler_spans(arquivo)["db.buscar_receitas"]["attributes"]["db.retentativas"] == 2
+
+def test_desligado_e_console(capsys):
+    """Testa o span nulo com o rastreamento desligado e a árvore do exportador de console"""
+    configurar_rastreamento(None)
+    assert span("busca") is SPAN_NULO
+    assert span_atual() is SPAN_NULO
+
+    configurar_rastreamento("console")
+    try:
+        with span("chat.turno"):
+            with span("busca") as etapa:
+                etapa.set_attribute("busca.resultados", 2)
+    finally:
+        configurar_rastreamento(None)
+    linhas = capsys.readouterr().err.splitlines()
+    assert linhas[0].startswith("[trace ")
+    assert linhas[1].startswith("chat.turno ")
+    assert linhas[2].startswith("  busca ") and linhas[2].endswith("busca.resultados=2")
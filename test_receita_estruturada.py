@@ -0,0 +1,63 @@
+import json
+import pytest
+from receita_estruturada import ParserReceitaIncremental, ReceitaInvalida
+
+@pytest.fixture
+def receita():
+    """Fixture com uma receita completa no formato do schema"""
+    return {
+        "titulo": "Homus de Beterraba",
+        "descricao": "Pasta \"rosa\" e cremosa",
+        "ingredientes": ["1 beterraba cozida", "1 xícara de grão de bico"],
+        "modo_preparo": ["Bata tudo", "Sirva gelado"],
+        "tempo_preparo": "15 minutos",
+        "porcoes": "4",
+        "dificuldade": "Fácil",
+        "utensilios": "Processador",
+        "harmonizacao": "Pão sírio",
+        "informacoes_nutricionais": {"calorias": 120, "proteinas": 5, "carboidratos": 15,
+                                     "gorduras": 4, "fibras": 3.5},
+        "beneficios_funcionais": ["Rico em nitratos"],
+        "dicas": ["Use tahine"]
+    }
+
+def alimentar_em_trechos(parser, texto, tamanho=7):
+    """Alimenta o parser em trechos pequenos, como chegam do stream"""
+    eventos = []
+    for i in range(0, len(texto), tamanho):
+        eventos.extend(parser.alimentar(texto[i:i + tamanho]))
+    return eventos
+
+def test_parser_emite_itens_a_medida_que_chegam(receita):
+    """Testa que cada campo e item de lista vira um evento e a receita final é validada"""
+    parser = ParserReceitaIncremental()
+    eventos = alimentar_em_trechos(parser, json.dumps(receita, ensure_ascii=False))
+    assert ("titulo", "Homus de Beterraba") in eventos
+    assert ("descricao", 'Pasta "rosa" e cremosa') in eventos
+    assert [v for c, v in eventos if c == "ingredientes"] == receita["ingredientes"]
+    assert [v for c, v in eventos if c == "modo_preparo"] == receita["modo_preparo"]
+    assert parser.finalizar() == receita
+
+def test_parser_falha_cedo_em_violacoes():
+    """Testa que violações do schema interrompem a leitura antes do fim da resposta"""
+    with pytest.raises(ReceitaInvalida):
+        ParserReceitaIncremental().alimentar("```json\n{")
+    with pytest.raises(ReceitaInvalida):
+        ParserReceitaIncremental().alimentar('{"titulo": "Bolo", "calorias_totais": ')
+    with pytest.raises(ReceitaInvalida):
+        ParserReceitaIncremental().alimentar('{"ingredientes": "farinha"')
+    with pytest.raises(ReceitaInvalida):
+        ParserReceitaIncremental().alimentar('{"ingredientes": ["farinha", 2')
+
+def test_finalizar_valida_campos_obrigatorios(receita):
+    """Testa que a receita completa precisa ter todos os campos e listas não vazias"""
+    receita["modo_preparo"] = []
+    parser = ParserReceitaIncremental()
+    parser.alimentar(json.dumps(receita))
+    with pytest.raises(ReceitaInvalida):
+        parser.finalizar()
+
+    parser = ParserReceitaIncremental()
+    parser.alimentar('{"titulo": "Bolo"')
+    with pytest.raises(ReceitaInvalida):
+        parser.finalizar()